@@ -0,0 +1,106 @@
+"""
+Сравнение стандартной сериализации ответов и orjson на GET /exchangeRates.
+
+Запуск: python -m benchmarks.json_serialization [--rows 10000] [--requests 50]
+
+Эндпоинт вызывается через ASGI без сети и без БД: репозиторий отдает заранее
+построенные курсы. Замеряются два режима - рендер тела при каждом запросе
+(промах кэша ответов) и отдача уже готового тела из ResponseCache.
+"""
+import argparse
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from decimal import Decimal
+from itertools import permutations, product
+from string import ascii_uppercase
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from httpx import ASGITransport, AsyncClient
+
+from src.core.config import settings
+from src.core.dependencies import get_read_exchange_rate_service
+from src.main import app
+from src.services.exchange_rate_service import ExchangeRateService
+from src.services.rate_broadcast import RateBroadcaster
+from src.services.rate_cache import RateCache
+from src.services.response_cache import ResponseCache
+from src.services.single_flight import SingleFlight
+
+
+class UncachedResponses(ResponseCache):
+    """Кэш ответов, который рендерит тело на каждый запрос."""
+
+    async def get_or_render(
+            self, key: str, version: str, render: Callable[[], Awaitable[bytes]],
+    ) -> bytes:
+        return await render()
+
+
+def make_rates(rows: int) -> list[SimpleNamespace]:
+    codes = ("".join(letters) for letters in product(ascii_uppercase, repeat=3))
+    currencies = [
+        SimpleNamespace(id=index, code=code, name=f"Валюта {code}", sign="¤")
+        for index, code in zip(range(1, 120), codes, strict=False)
+    ]
+    return [
+        SimpleNamespace(
+            id=rate_id,
+            base_currency_id=base.id,
+            target_currency_id=target.id,
+            base_currency=base,
+            target_currency=target,
+            rate=(Decimal(rate_id % 997 + 1) / Decimal(7)).quantize(Decimal("0.000001")),
+        )
+        for rate_id, (base, target) in enumerate(permutations(currencies, 2), start=1)
+        if rate_id <= rows
+    ]
+
+
+async def measure(service: ExchangeRateService, requests: int) -> float:
+    """Возвращает пропускную способность эндпоинта в запросах в секунду."""
+    app.dependency_overrides[get_read_exchange_rate_service] = lambda: service
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        await client.get("/exchangeRates")
+        started = time.perf_counter()
+        for _ in range(requests):
+            response = await client.get("/exchangeRates")
+            response.raise_for_status()
+        elapsed = time.perf_counter() - started
+    del app.dependency_overrides[get_read_exchange_rate_service]
+    return requests / elapsed
+
+
+async def main(rows: int, requests: int) -> None:
+    rates = make_rates(rows)
+    repository = AsyncMock()
+    repository.get_all_exchange_rates.return_value = rates
+    rate_cache = RateCache(max_staleness=3600)
+
+    print(f"GET /exchangeRates, курсов: {len(rates)}, запросов: {requests}")
+    for fast in (False, True):
+        settings.fast_json_response = fast
+        for cached in (False, True):
+            service = ExchangeRateService(
+                repository=repository,
+                history_repository=AsyncMock(),
+                rollup_repository=AsyncMock(),
+                currency_service=AsyncMock(),
+                rate_cache=rate_cache,
+                rate_broadcaster=RateBroadcaster(queue_size=10),
+                response_cache=ResponseCache() if cached else UncachedResponses(),
+                rate_lookups=SingleFlight("exchange_rate"),
+            )
+            throughput = await measure(service, requests)
+            mode = "orjson  " if fast else "pydantic"
+            cache = "готовое тело" if cached else "рендер на запрос"
+            print(f"{mode} | {cache:16} | {throughput:8.1f} req/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.requests))
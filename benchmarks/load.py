@@ -0,0 +1,220 @@
+"""
+Нагрузочный замер горячих эндпоинтов: /exchange, /exchangeRate/{pair}, /exchangeRates.
+
+Запуск: python -m benchmarks.load [--requests 2000] [--concurrency 32] [--output result.json]
+        [--baseline baseline.json] [--max-regression 10]
+
+По умолчанию приложение вызывается через ASGI без сети: БД - временный файл SQLite,
+заполненный benchmarks.seed. С --database-url запросы идут в указанную БД (например,
+локальный PostgreSQL после alembic upgrade head), с --base-url - в уже запущенный сервер
+по HTTP; его БД должна быть заполнена benchmarks.seed с теми же --currencies, --pairs
+и --seed.
+
+Для каждого эндпоинта выводятся RPS и задержки p50/p95/p99. Результат сохраняется в JSON;
+с --baseline он сравнивается с прошлым результатом, и команда завершается с кодом 1,
+если RPS упал или p95 вырос больше чем на --max-regression процентов.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import AsyncIterator, Callable
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from benchmarks.seed import Dataset, add_dataset_arguments, make_dataset, seed_database
+from src.core.db.session import get_read_session, get_session
+from src.main import app
+
+UrlFactory = Callable[[random.Random], str]
+
+
+@dataclass
+class EndpointResult:
+    requests: int
+    errors: int
+    rps: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+
+def make_endpoints(dataset: Dataset) -> dict[str, UrlFactory]:
+    """Генераторы URL запросов: случайные пары из набора данных, в том числе кросс-курсы."""
+    pairs = dataset.code_pairs()
+    codes = dataset.codes
+
+    def exchange(generator: random.Random) -> str:
+        base, target = generator.sample(codes, 2)
+        return f"/exchange?from={base}&to={target}&amount={generator.randint(1, 10_000)}"
+
+    def exchange_rate(generator: random.Random) -> str:
+        base, target = generator.choice(pairs)
+        return f"/exchangeRate/{base}{target}"
+
+    def exchange_rates(_: random.Random) -> str:
+        return "/exchangeRates"
+
+    return {"exchange": exchange, "exchangeRate": exchange_rate, "exchangeRates": exchange_rates}
+
+
+async def run_endpoint(
+        client: AsyncClient, make_url: UrlFactory, requests: int, concurrency: int, seed: int,
+) -> EndpointResult:
+    """Выполняет requests запросов concurrency параллельными клиентами."""
+    generator = random.Random(seed)
+    urls = iter([make_url(generator) for _ in range(requests)])
+    latencies: list[float] = []
+    errors = 0
+
+    async def worker() -> None:
+        nonlocal errors
+        for url in urls:
+            started = time.perf_counter()
+            response = await client.get(url)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return EndpointResult(
+        requests=len(latencies),
+        errors=errors,
+        rps=round(len(latencies) / elapsed, 1),
+        p50_ms=round(percentiles[49] * 1000, 3),
+        p95_ms=round(percentiles[94] * 1000, 3),
+        p99_ms=round(percentiles[98] * 1000, 3),
+    )
+
+
+def use_engine(engine: AsyncEngine) -> None:
+    """Подменяет сессии приложения сессиями engine."""
+    sessions = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+
+    async def session() -> AsyncIterator[AsyncSession]:
+        async with sessions() as db_session:
+            yield db_session
+
+    app.dependency_overrides[get_session] = session
+    app.dependency_overrides[get_read_session] = session
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    dataset = make_dataset(args.currencies, args.pairs, args.seed)
+    endpoints = make_endpoints(dataset)
+    selected = args.endpoints or list(endpoints)
+
+    engine = None
+    if args.base_url:
+        client = AsyncClient(base_url=args.base_url)
+        target = args.base_url
+    else:
+        database_url = args.database_url or (
+            f"sqlite+aiosqlite:///{tempfile.mkdtemp(prefix='currency-bench-')}/bench.db"
+        )
+        engine = create_async_engine(database_url)
+        await seed_database(engine, dataset)
+        use_engine(engine)
+        client = AsyncClient(transport=ASGITransport(app=app), base_url="http://bench")
+        target = engine.dialect.name
+
+    results = {}
+    try:
+        async with client:
+            for name in selected:
+                await run_endpoint(client, endpoints[name], args.warmup, args.concurrency, args.seed)
+                results[name] = await run_endpoint(
+                    client, endpoints[name], args.requests, args.concurrency, args.seed,
+                )
+                print_result(name, results[name])
+    finally:
+        app.dependency_overrides.clear()
+        if engine is not None:
+            await engine.dispose()
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(UTC).isoformat(timespec="seconds"),
+            "target": target,
+            "python": platform.python_version(),
+            "currencies": len(dataset.codes),
+            "pairs": len(dataset.pairs),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "endpoints": {name: asdict(result) for name, result in results.items()},
+    }
+
+
+def print_result(name: str, result: EndpointResult) -> None:
+    print(
+        f"{name:14} | {result.rps:9.1f} req/s | p50 {result.p50_ms:8.2f} мс | "
+        f"p95 {result.p95_ms:8.2f} мс | p99 {result.p99_ms:8.2f} мс | ошибок {result.errors}",
+    )
+
+
+def compare(report: dict[str, Any], baseline: dict[str, Any], max_regression: float) -> list[str]:
+    """Сравнивает результат с базовым. Возвращает описания регрессий больше max_regression %."""
+    regressions = []
+    for name, current in report["endpoints"].items():
+        previous = baseline["endpoints"].get(name)
+        if previous is None:
+            continue
+        rps_change = (current["rps"] - previous["rps"]) / previous["rps"] * 100
+        p95_change = (current["p95_ms"] - previous["p95_ms"]) / previous["p95_ms"] * 100
+        print(f"{name:14} | RPS {rps_change:+7.1f}% | p95 {p95_change:+7.1f}%")
+        if rps_change < -max_regression:
+            regressions.append(f"{name}: RPS {previous['rps']} -> {current['rps']}")
+        if p95_change > max_regression:
+            regressions.append(f"{name}: p95 {previous['p95_ms']} -> {current['p95_ms']} мс")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--database-url", help="БД для запуска приложения через ASGI")
+    target.add_argument("--base-url", help="Адрес запущенного сервера")
+    add_dataset_arguments(parser)
+    parser.add_argument(
+        "--endpoints", nargs="+", choices=["exchange", "exchangeRate", "exchangeRates"],
+    )
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--max-regression", type=float, default=10.0)
+    args = parser.parse_args()
+
+    # Журнал запросов не входит в замер и не должен смешиваться с отчетом.
+    logging.disable(logging.INFO)
+    report = asyncio.run(run(args))
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.baseline:
+        regressions = compare(report, json.loads(args.baseline.read_text()), args.max_regression)
+        for regression in regressions:
+            print(f"Регрессия: {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
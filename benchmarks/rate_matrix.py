@@ -0,0 +1,73 @@
+"""
+Время построения матрицы эффективных курсов.
+
+Запуск: python -m benchmarks.rate_matrix [--currencies 200] [--repeat 20]
+
+У каждой валюты есть курсы к USD и EUR, остальные пары считаются кросс-курсами.
+Замеряются полное построение (структура маршрутов и значения) и пересчет после
+изменения значения курса, когда набор пар не меняется.
+"""
+import argparse
+import time
+from collections.abc import Callable
+from decimal import Decimal
+from itertools import product
+from string import ascii_uppercase
+from types import SimpleNamespace
+
+from src.services.rate_cache import RateSnapshot
+from src.services.rate_matrix import RateMatrix
+
+
+def make_rates(currencies: int) -> list[SimpleNamespace]:
+    codes = ["USD", "EUR"] + [
+        "".join(letters) for letters in product(ascii_uppercase, repeat=3)
+        if "".join(letters) not in ("USD", "EUR")
+    ]
+    items = [
+        SimpleNamespace(id=index, code=code, name=f"Валюта {code}", sign="¤")
+        for index, code in enumerate(codes[:currencies], start=1)
+    ]
+    usd, eur = items[0], items[1]
+    rates = [SimpleNamespace(base_currency=usd, target_currency=eur, rate=Decimal("0.900000"))]
+    for position, currency in enumerate(items[2:], start=1):
+        rate = (Decimal(position % 997 + 1) / Decimal(7)).quantize(Decimal("0.000001"))
+        rates.append(SimpleNamespace(base_currency=usd, target_currency=currency, rate=rate))
+        rates.append(SimpleNamespace(base_currency=currency, target_currency=eur, rate=1 / rate))
+    for rate in rates:
+        rate.base_currency_id = rate.base_currency.id
+        rate.target_currency_id = rate.target_currency.id
+    return rates
+
+
+def measure(build: Callable[[], object], repeat: int) -> float:
+    """Возвращает медианное время вызова в миллисекундах."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        build()
+        timings.append((time.perf_counter() - started) * 1000)
+    return sorted(timings)[len(timings) // 2]
+
+
+def main(currencies: int, repeat: int) -> None:
+    rates = make_rates(currencies)
+    snapshot = RateSnapshot.from_exchange_rates(rates)
+    snapshot.graph.precompute()
+    matrix = RateMatrix.build(snapshot)
+
+    changed = rates[0]
+    changed.rate = Decimal("0.950000")
+    updated = snapshot.with_rates([changed])
+
+    print(f"Матрица {len(matrix.codes)} x {len(matrix.codes)}, курсов: {len(rates)}")
+    print(f"полное построение    | {measure(lambda: RateMatrix.build(snapshot), repeat):7.2f} мс")
+    print(f"изменение курса      | {measure(lambda: RateMatrix.build(updated, matrix), repeat):7.2f} мс")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--currencies", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    main(args.currencies, args.repeat)
@@ -0,0 +1,115 @@
+"""
+Заполнение БД тестовыми валютами и курсами для нагрузочных замеров.
+
+Запуск: python -m benchmarks.seed --database-url URL [--currencies 200] [--pairs 1000] [--seed 1]
+
+Набор данных детерминирован: одинаковые параметры дают одинаковые валюты и курсы, поэтому
+запросы нагрузки можно строить без обращения к БД (make_dataset). Каждая валюта связана
+курсом с USD, остальные пары выбираются случайно, так что между любыми двумя валютами
+есть маршрут конвертации не длиннее двух переходов.
+
+Для SQLite схема создается по моделям. В PostgreSQL схема должна быть создана миграциями
+(alembic upgrade head); существующие валюты, курсы и их история удаляются, поэтому
+используйте отдельную базу.
+"""
+import argparse
+import asyncio
+import random
+from dataclasses import dataclass
+from decimal import Decimal
+from itertools import product
+from string import ascii_uppercase
+
+from sqlalchemy import delete, insert, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from src.core.db.base import Base
+from src.models.currency import Currency
+from src.models.exchange_rate import ExchangeRate
+from src.models.exchange_rate_history import ExchangeRateHistory
+from src.models.exchange_rate_ohlc import ExchangeRateOhlc
+
+
+@dataclass(frozen=True)
+class Dataset:
+    codes: list[str]
+    pairs: list[tuple[int, int, Decimal]]
+
+    def code_pairs(self) -> list[tuple[str, str]]:
+        """Пары кодов валют, для которых хранится курс."""
+        return [(self.codes[base - 1], self.codes[target - 1]) for base, target, _ in self.pairs]
+
+
+def make_dataset(currencies: int, pairs: int, seed: int) -> Dataset:
+    """
+    Строит набор валют и курсов.
+
+    Валюты получают id 1..currencies, первая - USD. pairs - общее число курсов, не меньше
+    currencies - 1 (по курсу к USD у каждой валюты).
+    """
+    generator = random.Random(seed)
+    codes = ["USD"] + [
+        code for code in ("".join(letters) for letters in product(ascii_uppercase, repeat=3))
+        if code != "USD"
+    ][:currencies - 1]
+
+    def random_rate() -> Decimal:
+        return Decimal(generator.uniform(0.01, 500)).quantize(Decimal("0.000001"))
+
+    rates = {(1, currency_id): random_rate() for currency_id in range(2, currencies + 1)}
+    all_pairs = currencies * (currencies - 1)
+    while len(rates) < min(pairs, all_pairs // 2):
+        base, target = generator.sample(range(1, currencies + 1), 2)
+        if (base, target) not in rates and (target, base) not in rates:
+            rates[(base, target)] = random_rate()
+
+    return Dataset(codes=codes, pairs=[(base, target, rate) for (base, target), rate in rates.items()])
+
+
+async def seed_database(engine: AsyncEngine, dataset: Dataset) -> None:
+    """Записывает набор данных в БД, предварительно удалив существующие валюты и курсы."""
+    async with engine.begin() as connection:
+        if connection.dialect.name == "sqlite":
+            await connection.run_sync(Base.metadata.create_all)
+
+        for model in (ExchangeRateOhlc, ExchangeRateHistory, ExchangeRate, Currency):
+            await connection.execute(delete(model))
+
+        await connection.execute(insert(Currency), [
+            {"id": currency_id, "code": code, "name": f"Currency {code}", "sign": "¤"}
+            for currency_id, code in enumerate(dataset.codes, start=1)
+        ])
+        await connection.execute(insert(ExchangeRate), [
+            {"id": rate_id, "base_currency_id": base, "target_currency_id": target, "rate": rate}
+            for rate_id, (base, target, rate) in enumerate(dataset.pairs, start=1)
+        ])
+
+        if connection.dialect.name == "postgresql":
+            # id вставлены явно, последовательности нужно сдвинуть для последующих INSERT.
+            for table in ("currency", "exchange_rate"):
+                await connection.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))",
+                ))
+
+
+async def main(args: argparse.Namespace) -> None:
+    dataset = make_dataset(args.currencies, args.pairs, args.seed)
+    engine = create_async_engine(args.database_url)
+    try:
+        await seed_database(engine, dataset)
+    finally:
+        await engine.dispose()
+    print(f"Записано валют: {len(dataset.codes)}, курсов: {len(dataset.pairs)}")
+
+
+def add_dataset_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--currencies", type=int, default=200)
+    parser.add_argument("--pairs", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", required=True)
+    add_dataset_arguments(parser)
+    asyncio.run(main(parser.parse_args()))
@@ -3,8 +3,14 @@ from fastapi import APIRouter
 from src.api.currencies import router as currencies_router
 from src.api.exchange import router as exchange_router
 from src.api.exchange_rate import router as exchange_rates_router
+from src.api.health import router as health_router
+from src.api.metrics import router as metrics_router
+from src.api.rate_stream import router as rate_stream_router
 
 main_router = APIRouter()
 main_router.include_router(currencies_router, tags=["Currencies"])
 main_router.include_router(exchange_rates_router, tags=["Exchange Rates"])
 main_router.include_router(exchange_router, tags=["Exchange"])
+main_router.include_router(rate_stream_router, tags=["Rate Updates"])
+main_router.include_router(metrics_router, tags=["Metrics"])
+main_router.include_router(health_router, tags=["Health"])
@@ -0,0 +1,80 @@
+import csv
+import io
+import json
+from typing import Any
+
+from fastapi import Request
+
+from src.exceptions.exceptions import InvalidBatchError
+
+NDJSON_CONTENT_TYPES = {"application/x-ndjson", "application/jsonl", "application/x-jsonlines"}
+CSV_CONTENT_TYPES = {"text/csv", "application/csv"}
+
+INVALID_JSON_MESSAGE = "Тело запроса должно быть корректным JSON."
+NOT_ARRAY_MESSAGE = "Тело запроса должно быть JSON-массивом."
+INVALID_NDJSON_LINE_MESSAGE = "Некорректный JSON в строке NDJSON после элемента {index}."
+INVALID_CSV_MESSAGE = "Тело запроса должно быть корректным CSV в кодировке UTF-8 с заголовком."
+BATCH_TOO_LARGE_MESSAGE = "Пакет не может содержать больше {limit} элементов."
+
+
+async def read_batch_items(request: Request, max_items: int) -> list[Any]:
+    """
+    Читает элементы пакета из тела запроса.
+
+    Формат определяется по Content-Type: NDJSON читается построчно из потока,
+    CSV - как таблица с заголовком, все остальное - как JSON-массив.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+
+    raw_items: list[Any]
+    if content_type in NDJSON_CONTENT_TYPES:
+        raw_items = []
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            raw_items.extend(_parse_ndjson_lines(lines, len(raw_items)))
+            _check_batch_size(raw_items, max_items)
+        raw_items.extend(_parse_ndjson_lines([buffer], len(raw_items)))
+    elif content_type in CSV_CONTENT_TYPES:
+        raw_items = _parse_csv(await request.body())
+    else:
+        try:
+            raw_items = json.loads(await request.body())
+        except ValueError as err:
+            raise InvalidBatchError(INVALID_JSON_MESSAGE) from err
+        if not isinstance(raw_items, list):
+            raise InvalidBatchError(NOT_ARRAY_MESSAGE)
+
+    _check_batch_size(raw_items, max_items)
+    return raw_items
+
+
+def _parse_ndjson_lines(lines: list[bytes], offset: int) -> list[Any]:
+    items = []
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            items.append(json.loads(line))
+        except ValueError as err:
+            raise InvalidBatchError(
+                INVALID_NDJSON_LINE_MESSAGE.format(index=offset + len(items)),
+            ) from err
+    return items
+
+
+def _parse_csv(body: bytes) -> list[Any]:
+    try:
+        reader = csv.DictReader(io.StringIO(body.decode("utf-8-sig")))
+        return [
+            {key.strip(): value.strip() for key, value in row.items() if key is not None}
+            for row in reader
+        ]
+    except (UnicodeDecodeError, csv.Error) as err:
+        raise InvalidBatchError(INVALID_CSV_MESSAGE) from err
+
+
+def _check_batch_size(raw_items: list[Any], max_items: int) -> None:
+    if len(raw_items) > max_items:
+        raise InvalidBatchError(BATCH_TOO_LARGE_MESSAGE.format(limit=max_items))
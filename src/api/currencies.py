@@ -1,11 +1,14 @@
 import logging
 from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, Form, Path
+from fastapi import APIRouter, Depends, Form, Path, Query, Response
 from starlette import status
 
-from src.core.dependencies import get_currency_service
+from src.api.responses import NEXT_CURSOR_HEADER, FastJSONResponse
+from src.core.config import settings
+from src.core.dependencies import get_currency_service, get_read_currency_service
 from src.schemas.currency import CurrencyScheme
+from src.schemas.encoders import encode_currency
 from src.services.currency_service import CurrencyService
 
 log = logging.getLogger(__name__)
@@ -14,17 +17,39 @@ router = APIRouter()
 
 
 @router.get("/currencies", response_model=list[CurrencyScheme])
-async def get_currencies(service: Annotated[CurrencyService,Depends(get_currency_service)]) -> Any:
+async def get_currencies(
+        response: Response,
+        service: Annotated[CurrencyService, Depends(get_read_currency_service)],
+        limit: Annotated[int | None, Query(ge=1, le=settings.pagination_max_limit)] = None,
+        cursor: Annotated[int | None, Query(ge=0)] = None,
+) -> Any:
+    """
+    Список валют.
+
+    Без параметров возвращает все валюты. С limit или cursor возвращает одну страницу
+    в порядке id; курсор следующей страницы передается в заголовке X-Next-Cursor.
+    """
     log.info("Запрос на получение списка всех валют. Method: GET. Path: /currencies")
-    return await service.get_all_currencies()
+    if limit is None and cursor is None:
+        return Response(content=await service.get_all_currencies_json(), media_type="application/json")
+
+    page = await service.get_currencies_page(cursor, limit or settings.pagination_default_limit)
+    if page.next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = str(page.next_cursor)
+
+    if settings.fast_json_response:
+        return FastJSONResponse(
+            [encode_currency(currency) for currency in page.items], headers=dict(response.headers),
+        )
+    return list(page.items)
 
 
 @router.get("/currency/{code}", response_model=CurrencyScheme)
 async def get_currency_by_code(
         code: Annotated[str, Path(pattern="^[a-zA-Z]{3}$")],
-        service: Annotated[CurrencyService, Depends(get_currency_service)],
+        service: Annotated[CurrencyService, Depends(get_read_currency_service)],
 ) -> Any:
-    log.info(f"Запрос на получение одной валюты по коду. Method: GET. Path: /currency/{code}")
+    log.info("Запрос на получение одной валюты по коду. Method: GET. Path: /currency/%s", code)
     return await service.get_currency_by_code(code)
 
 
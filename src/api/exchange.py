@@ -1,12 +1,20 @@
 import logging
+from datetime import datetime
 from decimal import Decimal
 from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
+from pydantic import ValidationError
 
-from src.core.dependencies import get_exchange_rate_service
+from src.api.batch import read_batch_items
+from src.api.http_cache import conditional_response
+from src.api.responses import FastJSONResponse
+from src.core.config import settings
+from src.core.dependencies import get_read_exchange_rate_service
 from src.exceptions.exceptions import SameCurrencyConversionError
-from src.schemas.exchange_rate import ExchangeCurrencyResponse
+from src.exceptions.handlers import format_validation_error
+from src.schemas.encoders import encode_exchange_result
+from src.schemas.exchange_rate import ExchangeBatchItem, ExchangeBatchResult, ExchangeCurrencyResponse
 from src.services.exchange_rate_service import ExchangeRateService
 
 log = logging.getLogger(__name__)
@@ -19,15 +27,70 @@ async def exchange_currencies(
         base_currency: Annotated[str, Query(alias="from", pattern="^[a-zA-Z]{3}$")],
         target_currency: Annotated[str, Query(alias="to", pattern="^[a-zA-Z]{3}$")],
         amount: Annotated[Decimal, Query(gt=0, max_digits=18, decimal_places=2)],
-        service: Annotated[ExchangeRateService, Depends(get_exchange_rate_service)],
+        request: Request,
+        response: Response,
+        service: Annotated[ExchangeRateService, Depends(get_read_exchange_rate_service)],
+        at: Annotated[datetime | None, Query()] = None,
 ) -> Any:
+    """
+    Конвертация суммы из одной валюты в другую.
 
+    Без параметра at используются текущие курсы. С at (ISO 8601, без часового пояса - UTC)
+    конвертация выполняется по курсам, действовавшим на этот момент.
+    """
     base_currency_upper = base_currency.upper()
     target_currency_upper = target_currency.upper()
 
     if base_currency_upper == target_currency_upper:
         raise SameCurrencyConversionError
 
-    log.info(f"Запрос на конвертацию валют {base_currency_upper}/{target_currency_upper}. "
-             f"Количество: {amount}.")
-    return await service.exchange_currencies(base_currency_upper, target_currency_upper, amount)
+    log.info("Запрос на конвертацию валют %s/%s. "
+             "Количество: %s.", base_currency_upper, target_currency_upper, amount)
+
+    # Ответ на прошлый момент не зависит от текущей версии курсов.
+    snapshot = None
+    if at is None:
+        snapshot = await service.get_rates_snapshot()
+        not_modified = conditional_response(request, response, snapshot.version)
+        if not_modified is not None:
+            return not_modified
+
+    result = await service.exchange_currencies(
+        base_currency_upper, target_currency_upper, amount, at, snapshot=snapshot,
+    )
+    if settings.fast_json_response:
+        return FastJSONResponse(encode_exchange_result(result), headers=dict(response.headers))
+    return result
+
+
+@router.post("/exchange/batch", response_model=list[ExchangeBatchResult])
+async def exchange_currencies_batch(
+        request: Request,
+        service: Annotated[ExchangeRateService, Depends(get_read_exchange_rate_service)],
+) -> Any:
+    """
+    Пакетная конвертация валют.
+
+    Принимает JSON-массив или NDJSON (по одному объекту {from, to, amount} в строке)
+    и возвращает результаты в порядке элементов запроса. Ошибка отдельного элемента
+    не прерывает пакет: вместо result у такого элемента заполняется message.
+    """
+    raw_items = await read_batch_items(request, settings.exchange_batch_max_items)
+    log.info("Запрос на пакетную конвертацию валют. Method: POST. Path: /exchange/batch. "
+             "Элементов: %s.", len(raw_items))
+
+    results: list[ExchangeBatchResult | None] = [None] * len(raw_items)
+    valid_items: list[tuple[int, ExchangeBatchItem]] = []
+
+    for index, raw_item in enumerate(raw_items):
+        try:
+            valid_items.append((index, ExchangeBatchItem.model_validate(raw_item)))
+        except ValidationError as err:
+            results[index] = ExchangeBatchResult(message=format_validation_error(err.errors()[0]))
+
+    converted = await service.exchange_currencies_batch([item for _, item in valid_items])
+    for (index, _), result in zip(valid_items, converted, strict=True):
+        results[index] = result
+
+    return results
+
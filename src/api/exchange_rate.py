@@ -1,12 +1,39 @@
 import logging
+from datetime import datetime
 from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, Form, Path
+from fastapi import APIRouter, Depends, Form, Path, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from starlette import status
 
-from src.core.dependencies import get_exchange_rate_service
-from src.schemas.exchange_rate import ExchangeRateCreate, ExchangeRateSchema, ExchangeRateUpdate
-from src.services.exchange_rate_service import ExchangeRateService
+from src.api.batch import read_batch_items
+from src.api.http_cache import conditional_response
+from src.api.responses import NEXT_CURSOR_HEADER, FastJSONResponse
+from src.core.config import settings
+from src.core.dependencies import (
+    get_exchange_rate_exporter,
+    get_exchange_rate_service,
+    get_read_exchange_rate_service,
+)
+from src.exceptions.exceptions import SameCurrencyConversionError
+from src.exceptions.handlers import format_validation_error
+from src.repositories.exchange_rate_rollup_repository import OhlcResolution
+from src.schemas.currency import CurrencyScheme
+from src.schemas.encoders import encode_exchange_rate
+from src.schemas.exchange_rate import (
+    BulkRowError,
+    ExchangeRateCreate,
+    ExchangeRateHistoryResponse,
+    ExchangeRateOhlcResponse,
+    ExchangeRatesBulkResult,
+    ExchangeRateSchema,
+    ExchangeRateUpdate,
+    OhlcBar,
+    RateHistoryPoint,
+)
+from src.services.exchange_rate_export import ExchangeRateExporter, ExportFormat
+from src.services.exchange_rate_service import SAME_CURRENCY_MESSAGE, ExchangeRateService
 
 log = logging.getLogger(__name__)
 router = APIRouter()
@@ -14,22 +41,181 @@ router = APIRouter()
 
 @router.get("/exchangeRates", response_model=list[ExchangeRateSchema])
 async def get_exchange_rates(
-        service: Annotated[ExchangeRateService, Depends(get_exchange_rate_service)],
+        request: Request,
+        response: Response,
+        service: Annotated[ExchangeRateService, Depends(get_read_exchange_rate_service)],
+        limit: Annotated[int | None, Query(ge=1, le=settings.pagination_max_limit)] = None,
+        cursor: Annotated[int | None, Query(ge=0)] = None,
+        base: Annotated[str | None, Query(pattern="^[a-zA-Z]{3}$")] = None,
+        target: Annotated[str | None, Query(pattern="^[a-zA-Z]{3}$")] = None,
 ) -> Any:
-    all_exchange_rates = await service.get_all_exchange_rates()
-    return list(all_exchange_rates)
+    """
+    Список обменных курсов.
+
+    Без параметров возвращает все курсы. С любым из параметров limit, cursor, base, target
+    возвращает одну страницу курсов в порядке id; курсор следующей страницы передается
+    в заголовке X-Next-Cursor, на последней странице заголовка нет. ETag есть только
+    у полного списка: страницы читаются из БД, а не из снимка, по которому считается версия.
+    """
+    if limit is None and cursor is None and base is None and target is None:
+        snapshot = await service.get_rates_snapshot()
+        not_modified = conditional_response(request, response, snapshot.version)
+        if not_modified is not None:
+            return not_modified
+
+        body = await service.get_all_exchange_rates_json(snapshot)
+        return Response(content=body, media_type="application/json", headers=dict(response.headers))
+
+    log.info("Запрос страницы обменных курсов. Method: GET. Path: /exchangeRates. "
+             "Курсор: %s, лимит: %s, base: %s, target: %s.", cursor, limit, base, target)
+    page = await service.get_exchange_rates_page(
+        cursor,
+        limit or settings.pagination_default_limit,
+        base_code=base.upper() if base else None,
+        target_code=target.upper() if target else None,
+    )
+    if page.next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = str(page.next_cursor)
+
+    if settings.fast_json_response:
+        return FastJSONResponse(
+            [encode_exchange_rate(exchange_rate) for exchange_rate in page.items],
+            headers=dict(response.headers),
+        )
+    return list(page.items)
+
+
+@router.get("/exchangeRates/matrix")
+async def get_rate_matrix(
+        request: Request,
+        response: Response,
+        service: Annotated[ExchangeRateService, Depends(get_read_exchange_rate_service)],
+) -> Response:
+    """
+    Матрица эффективных курсов между всеми валютами.
+
+    Возвращает {"version", "currencies", "rates"}: rates[i][j] - прямой, обратный или
+    кросс-курс currencies[i] -> currencies[j] (число с плавающей точкой), null - маршрута нет.
+    """
+    log.info("Запрос матрицы обменных курсов. Method: GET. Path: /exchangeRates/matrix")
+    version = await service.get_rates_version()
+    not_modified = conditional_response(request, response, version)
+    if not_modified is not None:
+        return not_modified
+
+    body = await service.get_rate_matrix_json(version)
+    return Response(content=body, media_type="application/json", headers=dict(response.headers))
+
+
+@router.get("/exchangeRates/export", response_class=StreamingResponse)
+async def export_exchange_rates(
+        exporter: Annotated[ExchangeRateExporter, Depends(get_exchange_rate_exporter)],
+        export_format: Annotated[ExportFormat, Query(alias="format")] = ExportFormat.NDJSON,
+) -> StreamingResponse:
+    """
+    Потоковая выгрузка всех курсов.
+
+    format=ndjson - по объекту курса на строку, format=csv - колонки id, baseCurrencyCode,
+    targetCurrencyCode, rate (формат POST /exchangeRates/bulk). Строки читаются серверным
+    курсором и отправляются по мере получения.
+    """
+    log.info("Запрос на выгрузку обменных курсов. Method: GET. Path: /exchangeRates/export. "
+             "Формат: %s.", export_format)
+    return StreamingResponse(
+        exporter.export(export_format),
+        media_type=export_format.media_type,
+        headers={"Content-Disposition": f'attachment; filename="exchange_rates.{export_format}"'},
+    )
 
 
 @router.get("/exchangeRate/{code_pair}", response_model=ExchangeRateSchema)
 async def exchange_rate_by_code_pair(
         code_pair: Annotated[str, Path(pattern="^[a-zA-Z]{6}$")],
-        service: Annotated[ExchangeRateService,Depends(get_exchange_rate_service)],
+        request: Request,
+        response: Response,
+        service: Annotated[ExchangeRateService, Depends(get_read_exchange_rate_service)],
 ) -> Any:
-    log.info(f"Запрос на получение обменного курса по валютной паре. "
-             f"Method: GET. Path: /exchangeRate/{code_pair}")
+    log.info("Запрос на получение обменного курса по валютной паре. "
+             "Method: GET. Path: /exchangeRate/%s", code_pair)
 
     base_currency, target_currency = service.parse_codes(code_pair)
-    return await service.get_exchange_rate_by_codes(base_currency, target_currency)
+    snapshot = await service.get_rates_snapshot()
+    not_modified = conditional_response(request, response, snapshot.version)
+    if not_modified is not None:
+        return not_modified
+
+    exchange_rate = service.get_exchange_rate_from_snapshot(snapshot, base_currency, target_currency)
+    if settings.fast_json_response:
+        return FastJSONResponse(encode_exchange_rate(exchange_rate), headers=dict(response.headers))
+    return exchange_rate
+
+
+@router.get("/exchangeRate/{code_pair}/history", response_model=ExchangeRateHistoryResponse)
+async def exchange_rate_history(
+        code_pair: Annotated[str, Path(pattern="^[a-zA-Z]{6}$")],
+        service: Annotated[ExchangeRateService, Depends(get_read_exchange_rate_service)],
+        date_from: Annotated[datetime | None, Query(alias="from")] = None,
+        date_to: Annotated[datetime | None, Query(alias="to")] = None,
+        limit: Annotated[int | None, Query(ge=1, le=settings.pagination_max_limit)] = None,
+) -> Any:
+    """
+    История курса валютной пары.
+
+    Возвращает значения курса с моментами, с которых они действуют, в порядке времени,
+    не больше limit значений. Время без часового пояса считается UTC.
+    """
+    log.info("Запрос истории обменного курса. Method: GET. Path: /exchangeRate/%s/history. "
+             "Период: %s - %s.", code_pair, date_from, date_to)
+
+    base_currency, target_currency = service.parse_codes(code_pair)
+    exchange_rate, history = await service.get_exchange_rate_history(
+        base_currency,
+        target_currency,
+        date_from,
+        date_to,
+        limit or settings.pagination_max_limit,
+    )
+    return ExchangeRateHistoryResponse(
+        base_currency=CurrencyScheme.model_validate(exchange_rate.base_currency),
+        target_currency=CurrencyScheme.model_validate(exchange_rate.target_currency),
+        history=[RateHistoryPoint.model_validate(point) for point in history],
+    )
+
+
+@router.get("/exchangeRate/{code_pair}/ohlc", response_model=ExchangeRateOhlcResponse)
+async def exchange_rate_ohlc(
+        code_pair: Annotated[str, Path(pattern="^[a-zA-Z]{6}$")],
+        service: Annotated[ExchangeRateService, Depends(get_read_exchange_rate_service)],
+        resolution: OhlcResolution = OhlcResolution.HOUR,
+        date_from: Annotated[datetime | None, Query(alias="from")] = None,
+        date_to: Annotated[datetime | None, Query(alias="to")] = None,
+        limit: Annotated[int | None, Query(ge=1, le=settings.pagination_max_limit)] = None,
+) -> Any:
+    """
+    Агрегаты курса валютной пары (open-high-low-close).
+
+    resolution - длительность интервала: 1m, 1h или 1d. Интервалы выровнены по UTC
+    и возвращаются в порядке времени, не больше limit. Время без часового пояса
+    считается UTC.
+    """
+    log.info("Запрос агрегатов обменного курса. Method: GET. Path: /exchangeRate/%s/ohlc. "
+             "Интервал: %s. Период: %s - %s.", code_pair, resolution, date_from, date_to)
+
+    base_currency, target_currency = service.parse_codes(code_pair)
+    exchange_rate, bars = await service.get_exchange_rate_ohlc(
+        base_currency,
+        target_currency,
+        resolution,
+        date_from,
+        date_to,
+        limit or settings.pagination_max_limit,
+    )
+    return ExchangeRateOhlcResponse(
+        base_currency=CurrencyScheme.model_validate(exchange_rate.base_currency),
+        target_currency=CurrencyScheme.model_validate(exchange_rate.target_currency),
+        resolution=resolution,
+        bars=[OhlcBar.model_validate(bar) for bar in bars],
+    )
 
 
 @router.post("/exchangeRates", response_model=ExchangeRateSchema, status_code=status.HTTP_201_CREATED)
@@ -47,6 +233,39 @@ async def update_exchange_rate(
         rate_form: Annotated[ExchangeRateUpdate, Form()],
         service: Annotated[ExchangeRateService, Depends(get_exchange_rate_service)],
 ) -> Any:
-    log.info(f"Запрос на обновление обменного курса. Method: PATCH. Path: /exchangeRate/{code_pair}")
+    log.info("Запрос на обновление обменного курса. Method: PATCH. Path: /exchangeRate/%s", code_pair)
     base_currency, target_currency = service.parse_codes(code_pair)
     return await service.update_exchange_rate(base_currency, target_currency, rate_form)
+
+
+@router.post("/exchangeRates/bulk", response_model=ExchangeRatesBulkResult)
+async def bulk_upsert_exchange_rates(
+        request: Request,
+        service: Annotated[ExchangeRateService, Depends(get_exchange_rate_service)],
+) -> Any:
+    """
+    Пакетная загрузка курсов.
+
+    Принимает JSON-массив, NDJSON или CSV с полями baseCurrencyCode, targetCurrencyCode
+    и rate. Существующие пары обновляются, новые создаются. Возвращает количество
+    вставленных, обновленных и отклоненных строк с причинами отклонения.
+    """
+    raw_items = await read_batch_items(request, settings.exchange_rates_bulk_max_items)
+    log.info("Запрос на пакетную загрузку курсов. Method: POST. Path: /exchangeRates/bulk. "
+             "Строк: %s.", len(raw_items))
+
+    valid_items: list[tuple[int, ExchangeRateCreate]] = []
+    errors: list[BulkRowError] = []
+
+    for index, raw_item in enumerate(raw_items):
+        try:
+            valid_items.append((index, ExchangeRateCreate.model_validate(raw_item)))
+        except ValidationError as err:
+            errors.append(BulkRowError(index=index, message=format_validation_error(err.errors()[0])))
+        except SameCurrencyConversionError:
+            errors.append(BulkRowError(index=index, message=SAME_CURRENCY_MESSAGE))
+
+    result = await service.bulk_upsert_exchange_rates(valid_items)
+    result.errors = sorted([*errors, *result.errors], key=lambda error: error.index)
+    result.rejected = len(result.errors)
+    return result
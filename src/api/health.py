@@ -0,0 +1,54 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Response, status
+
+from src.core.db.probe import DatabaseProbe
+from src.core.dependencies import get_database_probe
+from src.core.lifecycle import lifecycle
+from src.schemas.health import (
+    CacheStatus,
+    DatabaseStatus,
+    LivenessResponse,
+    PoolStatusSchema,
+    ReadinessResponse,
+)
+from src.services.currency_registry import currency_registry
+from src.services.rate_cache import rate_cache
+
+router = APIRouter(prefix="/health")
+
+
+@router.get("/live", response_model=LivenessResponse)
+async def liveness() -> LivenessResponse:
+    """Процесс жив и обрабатывает запросы. БД не проверяется."""
+    return LivenessResponse()
+
+
+@router.get(
+    "/ready",
+    response_model=ReadinessResponse,
+    responses={status.HTTP_503_SERVICE_UNAVAILABLE: {"model": ReadinessResponse}},
+)
+async def readiness(
+        response: Response,
+        probe: Annotated[DatabaseProbe, Depends(get_database_probe)],
+) -> ReadinessResponse:
+    """
+    Готовность принимать трафик.
+
+    Воркер готов, если прогрев при старте завершен, остановка не началась и БД отвечает
+    на SELECT 1. Проверка БД кэшируется на HEALTH_CHECK_INTERVAL секунд. Состояние пула
+    и кэшей отдается для диагностики и на готовность не влияет. Неготовый воркер отвечает 503.
+    """
+    result = await probe.check()
+    ready = lifecycle.ready and result.ok
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+
+    return ReadinessResponse(
+        ready=ready,
+        started=lifecycle.ready,
+        database=DatabaseStatus.model_validate(result),
+        pool=PoolStatusSchema.model_validate(probe.pool_status()),
+        caches=CacheStatus(rate_snapshot=rate_cache.is_loaded, currency_registry=currency_registry.is_loaded),
+    )
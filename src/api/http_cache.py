@@ -0,0 +1,49 @@
+from starlette import status
+from starlette.requests import Request
+from starlette.responses import Response
+
+from src.core.config import settings
+
+
+def make_etag(version: str) -> str:
+    """
+    Формирует слабый ETag по версии данных.
+
+    Слабый ETag сохраняется, когда nginx сжимает ответ, и подходит для сравнения
+    в If-None-Match при условных GET-запросах.
+    """
+    return f'W/"{version}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Проверяет If-None-Match по правилам слабого сравнения (RFC 9110, 13.1.2)."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    opaque_tag = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque_tag for candidate in if_none_match.split(",")
+    )
+
+
+def conditional_response(request: Request, response: Response, version: str) -> Response | None:
+    """
+    Выставляет ETag и Cache-Control для ответа по версии данных.
+
+    Возвращает готовый ответ 304, если у клиента уже актуальная версия, иначе None -
+    тогда эндпоинт формирует тело как обычно.
+    """
+    etag = make_etag(version)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.http_cache_max_age}, must-revalidate",
+    }
+
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+    return None
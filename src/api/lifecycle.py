@@ -0,0 +1,22 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.core.lifecycle import AppLifecycle
+
+
+class InFlightRequestsMiddleware:
+    """ASGI-middleware: учитывает HTTP-запросы в обработке для AppLifecycle.drain()."""
+
+    def __init__(self, app: ASGIApp, lifecycle: AppLifecycle):
+        self.app = app
+        self.lifecycle = lifecycle
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        self.lifecycle.request_started()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.lifecycle.request_finished()
@@ -0,0 +1,46 @@
+import logging
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.core.db.profiling import profile_queries
+
+log = logging.getLogger(__name__)
+
+
+class QueryProfilingMiddleware:
+    """
+    ASGI-middleware профилирования SQL по запросам (DB_PROFILE=true).
+
+    Записывает все выражения запроса с временем выполнения. Запрос, выполнивший больше
+    max_queries выражений или потративший на них больше max_duration секунд, логируется
+    с уровнем WARNING вместе со списком выражений, остальные - с уровнем DEBUG.
+    """
+
+    def __init__(
+            self,
+            app: ASGIApp,
+            max_queries: int,
+            max_duration: float,
+            explain_threshold: float | None = None,
+    ):
+        self.app = app
+        self.max_queries = max_queries
+        self.max_duration = max_duration
+        self.explain_threshold = explain_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with profile_queries(self.explain_threshold) as profile:
+            await self.app(scope, receive, send)
+
+        over_budget = profile.count > self.max_queries or profile.duration > self.max_duration
+        if over_budget or log.isEnabledFor(logging.DEBUG):
+            log.log(
+                logging.WARNING if over_budget else logging.DEBUG,
+                "%s %s: %s SQL-выражений за %.2f мс (бюджет %s выражений, %.2f мс)\n%s",
+                scope["method"], scope["path"], profile.count, profile.duration * 1000,
+                self.max_queries, self.max_duration * 1000, profile.describe(),
+            )
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import re
+from collections.abc import AsyncIterator
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from starlette import status
+
+from src.core.config import settings
+from src.core.dependencies import get_rate_broadcaster
+from src.services.rate_broadcast import RateBroadcaster, RateSubscription
+
+log = logging.getLogger(__name__)
+router = APIRouter()
+
+PAIRS_PATTERN = "^[a-zA-Z]{6}(,[a-zA-Z]{6})*$"
+PAIR_RE = re.compile("^[a-zA-Z]{6}$")
+# Событие SSE по коду закрытия подписки: клиент отличает остановку воркера (можно сразу
+# переподключиться) от отключения за медленное чтение.
+SSE_CLOSE_EVENTS: dict[int | None, bytes] = {
+    RateBroadcaster.DROPPED_CODE: b"event: dropped\ndata: {}\n\n",
+    RateBroadcaster.SHUTDOWN_CODE: b"event: shutdown\ndata: {}\n\n",
+}
+
+
+def parse_pairs(pairs: str | None) -> frozenset[str] | None:
+    """Разбирает список пар через запятую (USDEUR,USDRUB). None - подписка на все пары."""
+    if not pairs:
+        return None
+    return frozenset(pair.upper() for pair in pairs.split(","))
+
+
+async def sse_events(subscription: RateSubscription, heartbeat: float) -> AsyncIterator[bytes]:
+    """
+    События Server-Sent Events для подписки.
+
+    Каждое изменение курса - событие rate с ExchangeRateSchema в data. Если изменений нет
+    heartbeat секунд, отправляется комментарий, чтобы прокси не закрыли соединение.
+    Отключенный за медленное чтение подписчик получает событие dropped, при остановке
+    воркера приходит событие shutdown.
+    """
+    while True:
+        try:
+            message = await asyncio.wait_for(subscription.get(), timeout=heartbeat)
+        except TimeoutError:
+            yield b": keepalive\n\n"
+            continue
+        if message is None:
+            close_event = SSE_CLOSE_EVENTS.get(subscription.close_code)
+            if close_event is not None:
+                yield close_event
+            return
+        yield b"event: rate\ndata: " + message + b"\n\n"
+
+
+@router.get("/exchangeRates/stream")
+async def stream_rate_updates(
+        broadcaster: Annotated[RateBroadcaster, Depends(get_rate_broadcaster)],
+        pairs: Annotated[str | None, Query(pattern=PAIRS_PATTERN)] = None,
+) -> StreamingResponse:
+    """
+    Изменения курсов в формате Server-Sent Events.
+
+    pairs - пары через запятую (USDEUR,USDRUB), без параметра приходят изменения всех пар.
+    """
+    log.info("Подписка на изменения курсов (SSE). Method: GET. Path: /exchangeRates/stream. "
+             "Пары: %s", pairs or "все")
+    subscription = broadcaster.subscribe(parse_pairs(pairs))
+
+    async def events() -> AsyncIterator[bytes]:
+        try:
+            async for event in sse_events(subscription, settings.rate_stream_heartbeat):
+                yield event
+        finally:
+            broadcaster.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def receive_subscription_changes(websocket: WebSocket, subscription: RateSubscription) -> None:
+    """
+    Читает сообщения клиента WebSocket до отключения.
+
+    Сообщение {"pairs": ["USDEUR", ...]} заменяет набор пар подписки, пустой список -
+    подписка на все пары. Некорректное сообщение закрывает соединение с кодом 1008.
+    """
+    try:
+        while True:
+            content = await websocket.receive_json()
+            pairs = content.get("pairs") if isinstance(content, dict) else None
+            if not isinstance(pairs, list) or not all(
+                    isinstance(pair, str) and PAIR_RE.match(pair) for pair in pairs
+            ):
+                subscription.close(status.WS_1008_POLICY_VIOLATION)
+                return
+            subscription.pairs = frozenset(pair.upper() for pair in pairs) or None
+    except WebSocketDisconnect:
+        subscription.close()
+    except ValueError:
+        subscription.close(status.WS_1008_POLICY_VIOLATION)
+
+
+@router.websocket("/exchangeRates/ws")
+async def websocket_rate_updates(
+        websocket: WebSocket,
+        broadcaster: Annotated[RateBroadcaster, Depends(get_rate_broadcaster)],
+        pairs: Annotated[str | None, Query(pattern=PAIRS_PATTERN)] = None,
+) -> None:
+    """
+    Изменения курсов через WebSocket.
+
+    Каждое изменение курса отправляется текстовым сообщением с ExchangeRateSchema.
+    Начальный набор пар задается параметром pairs, затем его можно менять сообщениями
+    клиента. Медленный клиент отключается с кодом 1013.
+    """
+    await websocket.accept()
+    log.info("Подписка на изменения курсов (WebSocket). Path: /exchangeRates/ws. Пары: %s", pairs or "все")
+    subscription = broadcaster.subscribe(parse_pairs(pairs))
+    receiver = asyncio.create_task(receive_subscription_changes(websocket, subscription))
+
+    try:
+        while (message := await subscription.get()) is not None:
+            await websocket.send_text(message.decode())
+        if subscription.close_code is not None:
+            await websocket.close(code=subscription.close_code)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        broadcaster.unsubscribe(subscription)
@@ -0,0 +1,94 @@
+"""
+Пересчет OHLC-агрегатов курсов по истории.
+
+Запуск: python -m src.commands.backfill_rollups [--resolution 1h] [--from ISO] [--to ISO]
+
+Период разбивается на окна по --days-per-batch суток, выровненные по полуночи UTC.
+Каждое окно пересчитывается одним запросом INSERT ... SELECT и коммитится отдельно,
+поэтому прерванный пересчет можно запустить повторно с того же места.
+"""
+import argparse
+import asyncio
+import logging
+from collections.abc import Iterator
+from datetime import UTC, datetime, timedelta
+
+from src.core.config import setup_logging
+from src.core.db.session import engine, new_session
+from src.repositories.exchange_rate_rollup_repository import (
+    ExchangeRateRollupRepository,
+    OhlcResolution,
+)
+
+log = logging.getLogger(__name__)
+
+
+def iter_windows(
+        date_from: datetime, date_to: datetime, days_per_batch: int,
+) -> Iterator[tuple[datetime, datetime]]:
+    """
+    Делит период [date_from, date_to] на окна [start, end) по days_per_batch суток.
+
+    Границы выровнены по полуночи UTC, чтобы ни один интервал агрегатов (вплоть до суток)
+    не оказался разрезан между двумя окнами.
+    """
+    start = date_from.astimezone(UTC).replace(hour=0, minute=0, second=0, microsecond=0)
+    step = timedelta(days=days_per_batch)
+    while start <= date_to:
+        yield start, start + step
+        start += step
+
+
+async def backfill(
+        resolutions: list[OhlcResolution],
+        date_from: datetime | None,
+        date_to: datetime | None,
+        days_per_batch: int,
+) -> int:
+    """Пересчитывает агрегаты за период. Без границ периода берется вся история курсов."""
+    if date_from is None or date_to is None:
+        async with new_session() as session:
+            first, last = await ExchangeRateRollupRepository(session).get_history_bounds()
+        if first is None or last is None:
+            log.info("История курсов пуста, пересчитывать нечего")
+            return 0
+        date_from = date_from or first
+        date_to = date_to or last
+
+    total = 0
+    for window_start, window_end in iter_windows(date_from, date_to, days_per_batch):
+        async with new_session() as session, session.begin():
+            repository = ExchangeRateRollupRepository(session)
+            for resolution in resolutions:
+                written = await repository.rebuild(resolution, window_start, window_end)
+                total += written
+                log.info(
+                    "Агрегаты %s за %s - %s пересчитаны. Записей: %s",
+                    resolution, window_start.isoformat(), window_end.isoformat(), written,
+                )
+    return total
+
+
+async def main(args: argparse.Namespace) -> None:
+    resolutions = [args.resolution] if args.resolution else list(OhlcResolution)
+    try:
+        total = await backfill(resolutions, args.date_from, args.date_to, args.days_per_batch)
+    finally:
+        await engine.dispose()
+    log.info("Пересчет агрегатов завершен. Всего записей: %s", total)
+
+
+def parse_datetime(value: str) -> datetime:
+    """Разбирает время в ISO 8601. Время без часового пояса считается UTC."""
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=UTC)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Пересчет OHLC-агрегатов курсов по истории")
+    parser.add_argument("--resolution", type=OhlcResolution, choices=list(OhlcResolution))
+    parser.add_argument("--from", dest="date_from", type=parse_datetime)
+    parser.add_argument("--to", dest="date_to", type=parse_datetime)
+    parser.add_argument("--days-per-batch", type=int, default=7)
+    setup_logging()
+    asyncio.run(main(parser.parse_args()))
@@ -5,6 +5,8 @@ import yaml
 from dotenv import find_dotenv
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from src.core.log import start_queue_listeners
+
 
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=find_dotenv())
@@ -15,6 +17,43 @@ class Settings(BaseSettings):
     postgres_host: str
     postgres_port: int
 
+    postgres_replica_host: str | None = None
+    postgres_replica_port: int | None = None
+
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = -1
+    db_pool_pre_ping: bool = False
+    db_statement_cache_size: int = 100
+    db_pgbouncer_transaction_mode: bool = False
+    db_replica_max_lag: float = 5.0
+    db_replica_check_interval: float = 5.0
+    db_pool_warmup_connections: int | None = None
+    startup_retry_interval: float = 5.0
+    shutdown_drain_timeout: float = 10.0
+    health_check_interval: float = 5.0
+    health_probe_timeout: float = 1.0
+
+    rate_cache_max_staleness: float = 60.0
+    exchange_max_hops: int = 3
+    exchange_pivot_currencies: list[str] = ["USD"]
+    exchange_batch_max_items: int = 10_000
+    exchange_rates_bulk_max_items: int = 50_000
+    http_cache_max_age: int = 0
+    fast_json_response: bool = False
+    pagination_default_limit: int = 100
+    pagination_max_limit: int = 1000
+    rate_stream_queue_size: int = 100
+    rate_stream_heartbeat: float = 15.0
+    rate_stream_notify: bool = False
+    cache_notify: bool = False
+    db_listen_check_interval: float = 10.0
+    db_profile: bool = False
+    db_profile_max_queries: int = 10
+    db_profile_max_duration: float = 0.1
+    db_profile_explain_threshold: float | None = None
+
     @property
     def async_database_url(self) -> str:
         return (
@@ -22,6 +61,25 @@ class Settings(BaseSettings):
             f"{self.postgres_port}/{self.postgres_db}"
         )
 
+    @property
+    def listen_dsn(self) -> str:
+        """DSN для выделенного соединения asyncpg (LISTEN/NOTIFY) в обход пула SQLAlchemy."""
+        return (
+            f"postgresql://{self.postgres_user}:{self.postgres_password}@{self.postgres_host}:"
+            f"{self.postgres_port}/{self.postgres_db}"
+        )
+
+    @property
+    def replica_async_database_url(self) -> str | None:
+        """URL реплики для чтения или None, если реплика не настроена."""
+        if self.postgres_replica_host is None:
+            return None
+        return (
+            f"postgresql+asyncpg://{self.postgres_user}:{self.postgres_password}@"
+            f"{self.postgres_replica_host}:{self.postgres_replica_port or self.postgres_port}/"
+            f"{self.postgres_db}"
+        )
+
 
 settings = Settings()
 
@@ -34,4 +92,5 @@ def setup_logging() -> None:
         logging_config = yaml.safe_load(conf)
 
     logging.config.dictConfig(logging_config)
+    start_queue_listeners()
     logging.getLogger().info("Логгирование успешно настроено из файла.")
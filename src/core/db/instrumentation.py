@@ -0,0 +1,40 @@
+import time
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, ExecutionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.core.metrics import DB_QUERY_SECONDS
+
+if TYPE_CHECKING:
+    from prometheus_client import Histogram
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """
+    Публикует время выполнения SQL-выражений движка в db_query_seconds.
+
+    Время замеряется вокруг выполнения курсора драйвера, без времени ожидания соединения
+    из пула (оно учитывается в db_pool_checkout_seconds).
+    """
+    histograms: dict[str, Histogram] = {}
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(
+            conn: Connection, cursor: Any, statement: str, parameters: Any,
+            context: ExecutionContext, executemany: bool,  # noqa: FBT001
+    ) -> None:
+        context.query_started = time.perf_counter()  # type: ignore[attr-defined]
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(
+            conn: Connection, cursor: Any, statement: str, parameters: Any,
+            context: ExecutionContext, executemany: bool,  # noqa: FBT001
+    ) -> None:
+        elapsed = time.perf_counter() - context.query_started  # type: ignore[attr-defined]
+        operation = statement.split(None, 1)[0].upper() if statement.strip() else ""
+        histogram = histograms.get(operation)
+        if histogram is None:
+            histogram = histograms[operation] = DB_QUERY_SECONDS.labels(engine=name, operation=operation)
+        histogram.observe(elapsed)
@@ -0,0 +1,152 @@
+import asyncio
+import logging
+from collections.abc import Callable, Sequence
+
+import asyncpg
+
+from src.core.config import settings
+
+log = logging.getLogger(__name__)
+
+NotificationHandler = Callable[[str], None]
+ConnectHandler = Callable[[], None]
+
+
+class PgListener:
+    """
+    Выделенное соединение asyncpg для LISTEN/NOTIFY.
+
+    Соединение не берется из пула: оно занято на все время работы приложения. Связь
+    проверяется не реже раза в check_interval секунд; при обрыве listener переподключается
+    с экспоненциально растущей задержкой (до max_reconnect_delay секунд) и заново
+    подписывается на все каналы.
+
+    Уведомления, отправленные без соединения, теряются, поэтому после каждого подключения
+    вызываются обработчики подключения: они должны заново синхронизировать состояние.
+
+    asyncpg не допускает одновременных запросов в одном соединении, поэтому NOTIFY,
+    проверка связи и подписка на каналы выполняются по очереди под блокировкой.
+    """
+
+    def __init__(
+            self,
+            dsn: str,
+            check_interval: float,
+            reconnect_delay: float = 0.5,
+            max_reconnect_delay: float = 30.0,
+    ):
+        self.dsn = dsn
+        self.check_interval = check_interval
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+
+        self._handlers: dict[str, NotificationHandler] = {}
+        self._connect_handlers: list[ConnectHandler] = []
+        self._connection: asyncpg.Connection | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._lost = asyncio.Event()
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_connected(self) -> bool:
+        return self._connection is not None and not self._connection.is_closed()
+
+    def add_handler(self, channel: str, handler: NotificationHandler) -> None:
+        """Регистрирует обработчик уведомлений канала. Вызывать до start()."""
+        self._handlers[channel] = handler
+
+    def add_connect_handler(self, handler: ConnectHandler) -> None:
+        """Регистрирует обработчик, вызываемый после каждого (пере)подключения."""
+        self._connect_handlers.append(handler)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="pg-listener")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self._close()
+
+    async def notify(self, channel: str, payload: str) -> bool:
+        """
+        Отправляет NOTIFY через соединение listener.
+
+        Возвращает False, если соединения нет или отправка не удалась, чтобы вызывающий
+        код мог доставить событие хотя бы внутри своего процесса.
+        """
+        return await self.notify_many(channel, [payload])
+
+    async def notify_many(self, channel: str, payloads: Sequence[str]) -> bool:
+        """Отправляет по NOTIFY на каждый payload одним запросом (см. notify)."""
+        try:
+            async with self._lock:
+                if self._connection is None or self._connection.is_closed():
+                    return False
+                await self._connection.execute(
+                    "SELECT pg_notify($1, payload) FROM unnest($2::text[]) AS payload", channel, payloads,
+                )
+        except (asyncpg.PostgresError, asyncpg.InterfaceError, OSError):
+            log.warning("Не удалось отправить NOTIFY в канал %s", channel, exc_info=True)
+            return False
+        return True
+
+    async def _run(self) -> None:
+        delay = self.reconnect_delay
+        while True:
+            try:
+                await self._listen()
+                delay = self.reconnect_delay
+                await self._wait_until_lost()
+            except (asyncpg.PostgresError, asyncpg.InterfaceError, OSError, TimeoutError):
+                log.warning("Соединение LISTEN недоступно, повтор через %.1f с", delay, exc_info=True)
+            else:
+                log.warning("Соединение LISTEN потеряно, переподключение")
+            await self._close()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def _listen(self) -> None:
+        self._lost.clear()
+        connection = await asyncpg.connect(self.dsn, timeout=self.check_interval)
+        async with self._lock:
+            self._connection = connection
+            self._connection.add_termination_listener(lambda _: self._lost.set())
+            for channel in self._handlers:
+                await self._connection.add_listener(channel, self._dispatch)
+        log.info("Соединение LISTEN установлено. Каналы: %s", ", ".join(self._handlers))
+        for handler in self._connect_handlers:
+            handler()
+
+    async def _wait_until_lost(self) -> None:
+        """Ждет обрыва соединения, периодически проверяя его запросом."""
+        while self._connection is not None:
+            try:
+                await asyncio.wait_for(self._lost.wait(), timeout=self.check_interval)
+            except TimeoutError:
+                async with self._lock:
+                    await self._connection.execute("SELECT 1", timeout=self.check_interval)
+            else:
+                return
+
+    def _dispatch(self, _connection: object, _pid: int, channel: str, payload: object) -> None:
+        handler = self._handlers.get(channel)
+        if handler is None:
+            return
+        try:
+            handler(str(payload))
+        except Exception:
+            log.exception("Ошибка обработки уведомления из канала %s", channel)
+
+    async def _close(self) -> None:
+        connection, self._connection = self._connection, None
+        if connection is not None and not connection.is_closed():
+            try:
+                await connection.close(timeout=self.check_interval)
+            except (asyncpg.PostgresError, asyncpg.InterfaceError, OSError, TimeoutError):
+                connection.terminate()
+
+
+pg_listener = PgListener(dsn=settings.listen_dsn, check_interval=settings.db_listen_check_interval)
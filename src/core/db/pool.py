@@ -0,0 +1,31 @@
+import time
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
+
+from src.core.metrics import DB_POOL_CHECKED_OUT, DB_POOL_CHECKOUT_SECONDS, DB_POOL_SATURATION
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """
+    Пул соединений, публикующий метрики ожидания и заполненности.
+
+    Метки метрик берутся из pool.logging_name (параметр pool_logging_name движка).
+    """
+
+    def __init__(self, *args: object, **kwargs: object):
+        super().__init__(*args, **kwargs)  # type: ignore[arg-type]
+        name = self.logging_name or "default"
+        self._checkout_seconds = DB_POOL_CHECKOUT_SECONDS.labels(pool=name)
+        DB_POOL_CHECKED_OUT.labels(pool=name).set_function(self.checkedout)
+        DB_POOL_SATURATION.labels(pool=name).set_function(self.saturation)
+
+    def saturation(self) -> float:
+        capacity = self.size() + max(self._max_overflow, 0)
+        return self.checkedout() / capacity if capacity else 0.0
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self._checkout_seconds.observe(time.perf_counter() - started)
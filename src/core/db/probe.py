@@ -0,0 +1,84 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import QueuePool
+
+from src.core.db.pool import InstrumentedAsyncPool
+from src.core.db.replica import PROBE_QUERY
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class ProbeResult:
+    """Результат проверки БД. latency - время SELECT 1 в секундах, checked_at - time.monotonic()."""
+
+    ok: bool
+    latency: float | None
+    checked_at: float
+    error: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class PoolStatus:
+    size: int
+    checked_out: int
+    overflow: int
+    saturation: float
+
+
+class DatabaseProbe:
+    """
+    Проверка доступности БД для readiness-проб.
+
+    SELECT 1 выполняется не чаще раза в check_interval секунд, между проверками результат
+    берется из кэша. Одновременные пробы ждут одну проверку, поэтому нагрузка на БД
+    не зависит от частоты и числа проб.
+    """
+
+    def __init__(self, engine: AsyncEngine, check_interval: float, timeout: float = 1.0):
+        self.engine = engine
+        self.check_interval = check_interval
+        self.timeout = timeout
+        self._result: ProbeResult | None = None
+        self._lock = asyncio.Lock()
+
+    async def check(self) -> ProbeResult:
+        if self._is_fresh(self._result):
+            return self._result  # type: ignore[return-value]
+
+        async with self._lock:
+            # Пока ждали блокировку, проверку мог выполнить другой запрос.
+            if not self._is_fresh(self._result):
+                self._result = await self._probe()
+            return self._result  # type: ignore[return-value]
+
+    def pool_status(self) -> PoolStatus:
+        """Состояние пула соединений. Для пулов без очереди (SQLite в тестах) - нули."""
+        pool = self.engine.pool
+        if not isinstance(pool, QueuePool):
+            return PoolStatus(size=0, checked_out=0, overflow=0, saturation=0.0)
+        return PoolStatus(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+            saturation=pool.saturation() if isinstance(pool, InstrumentedAsyncPool) else 0.0,
+        )
+
+    def _is_fresh(self, result: ProbeResult | None) -> bool:
+        return result is not None and time.monotonic() - result.checked_at < self.check_interval
+
+    async def _probe(self) -> ProbeResult:
+        started = time.monotonic()
+        try:
+            async with asyncio.timeout(self.timeout), self.engine.connect() as connection:
+                await connection.execute(PROBE_QUERY)
+        except (SQLAlchemyError, OSError, TimeoutError) as exc:
+            log.warning("Проверка доступности БД не прошла: %r", exc)
+            return ProbeResult(ok=False, latency=None, checked_at=time.monotonic(), error=type(exc).__name__)
+        finished = time.monotonic()
+        return ProbeResult(ok=True, latency=finished - started, checked_at=finished)
@@ -0,0 +1,129 @@
+import logging
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, ExecutionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class QueryRecord:
+    """Выполненное SQL-выражение: текст, параметры, время и план (если снимался)."""
+
+    statement: str
+    parameters: Any
+    duration: float
+    plan: str | None = None
+
+
+@dataclass(slots=True)
+class QueryProfile:
+    """
+    SQL-выражения, выполненные внутри одного блока profile_queries().
+
+    Если задан explain_threshold (секунды), для SELECT медленнее порога снимается
+    EXPLAIN ANALYZE. Это повторно выполняет запрос, поэтому включается только для отладки.
+    """
+
+    explain_threshold: float | None = None
+    queries: list[QueryRecord] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def duration(self) -> float:
+        return sum(query.duration for query in self.queries)
+
+    def describe(self) -> str:
+        """Текстовый отчет: по строке на выражение, планы - с отступом под выражением."""
+        lines = []
+        for number, query in enumerate(self.queries, start=1):
+            statement = " ".join(query.statement.split())
+            lines.append(f"{number}. {query.duration * 1000:.2f} мс: {statement} {query.parameters!r}")
+            if query.plan is not None:
+                lines.extend(f"    {line}" for line in query.plan.splitlines())
+        return "\n".join(lines)
+
+
+_current_profile: ContextVar[QueryProfile | None] = ContextVar("query_profile", default=None)
+
+
+@contextmanager
+def profile_queries(explain_threshold: float | None = None) -> Iterator[QueryProfile]:
+    """
+    Собирает SQL-выражения, выполненные в текущем контексте, в QueryProfile.
+
+    Выражения записываются только для движков, к которым подключен attach_profiler().
+    """
+    profile = QueryProfile(explain_threshold=explain_threshold)
+    token = _current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _current_profile.reset(token)
+
+
+def attach_profiler(engine: AsyncEngine) -> None:
+    """
+    Подключает к движку запись выражений в активный QueryProfile.
+
+    Вне profile_queries() обработчики сводятся к чтению ContextVar. Повторный вызов
+    для того же движка ничего не делает.
+    """
+    sync_engine = engine.sync_engine
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _before_cursor_execute(
+        conn: Connection, cursor: Any, statement: str, parameters: Any,
+        context: ExecutionContext, executemany: bool,  # noqa: FBT001
+) -> None:
+    if _current_profile.get() is not None:
+        context.profile_started = time.perf_counter()  # type: ignore[attr-defined]
+
+
+def _after_cursor_execute(
+        conn: Connection, cursor: Any, statement: str, parameters: Any,
+        context: ExecutionContext, executemany: bool,  # noqa: FBT001
+) -> None:
+    profile = _current_profile.get()
+    started = getattr(context, "profile_started", None)
+    if profile is None or started is None:
+        return
+
+    record = QueryRecord(statement, parameters, time.perf_counter() - started)
+    if (
+        profile.explain_threshold is not None
+        and record.duration >= profile.explain_threshold
+        and not executemany
+        and conn.dialect.name == "postgresql"
+        and statement.lstrip()[:6].upper() == "SELECT"
+    ):
+        record.plan = _explain_analyze(conn, statement, parameters)
+    profile.queries.append(record)
+
+
+def _explain_analyze(conn: Connection, statement: str, parameters: Any) -> str | None:
+    # Отдельный курсор драйвера: результат исходного выражения еще не прочитан,
+    # и выполнение EXPLAIN не должно снова вызывать обработчики движка.
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters)
+        return "\n".join(row[0] for row in cursor.fetchall())
+    except Exception:
+        log.warning("Не удалось получить план выражения", exc_info=True)
+        return None
+    finally:
+        cursor.close()
@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import time
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession, async_sessionmaker
+
+log = logging.getLogger(__name__)
+
+# Если реплика получила весь WAL и применила его, отставания нет, даже если основная БД
+# давно ничего не писала и pg_last_xact_replay_timestamp() был давно.
+POSTGRES_LAG_QUERY = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+    "END",
+)
+PROBE_QUERY = text("SELECT 1")
+
+
+class ReplicaRouter:
+    """
+    Выбирает фабрику сессий для запросов только на чтение.
+
+    Реплика используется, пока она отвечает и отстает от основной БД не больше max_lag
+    секунд. Состояние реплики проверяется не чаще раза в check_interval секунд, между
+    проверками решение берется из кэша. При недоступности или отставании реплики
+    чтение переключается на основную БД до следующей успешной проверки.
+    """
+
+    def __init__(
+            self,
+            primary: AsyncEngine,
+            replica: AsyncEngine | None,
+            max_lag: float,
+            check_interval: float,
+            probe_timeout: float = 1.0,
+    ):
+        self.primary = primary
+        self.replica = replica
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.probe_timeout = probe_timeout
+
+        self._primary_sessions = async_sessionmaker(primary, expire_on_commit=False, class_=AsyncSession)
+        self._replica_sessions = (
+            async_sessionmaker(replica, expire_on_commit=False, class_=AsyncSession)
+            if replica is not None else None
+        )
+        self._replica_available = True
+        self._checked_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    @property
+    def uses_replica(self) -> bool:
+        return self._replica_sessions is not None and self._replica_available
+
+    async def get_session_factory(self) -> async_sessionmaker[AsyncSession]:
+        """Возвращает фабрику сессий реплики или основной БД."""
+        if self._replica_sessions is None:
+            return self._primary_sessions
+
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            async with self._lock:
+                if time.monotonic() - self._checked_at >= self.check_interval:
+                    await self._check_replica()
+
+        return self._replica_sessions if self._replica_available else self._primary_sessions
+
+    def report_failure(self) -> None:
+        """Отмечает реплику недоступной после ошибки соединения в запросе."""
+        if self._replica_sessions is not None and self._replica_available:
+            log.warning("Ошибка соединения с репликой, чтение переключено на основную БД")
+            self._replica_available = False
+            self._checked_at = time.monotonic()
+
+    async def _check_replica(self) -> None:
+        if self.replica is None:
+            return
+
+        try:
+            async with asyncio.timeout(self.probe_timeout), self.replica.connect() as connection:
+                lag = await self._replication_lag(connection)
+        except (SQLAlchemyError, OSError, TimeoutError):
+            available = False
+            log.warning("Реплика недоступна, чтение переключено на основную БД", exc_info=True)
+        else:
+            available = lag <= self.max_lag
+            if not available:
+                log.warning(
+                    "Реплика отстает на %.1f с (допустимо %.1f с), чтение переключено на основную БД",
+                    lag, self.max_lag,
+                )
+
+        if available and not self._replica_available:
+            log.info("Реплика снова доступна, чтение переключено на реплику")
+
+        self._replica_available = available
+        self._checked_at = time.monotonic()
+
+    async def _replication_lag(self, connection: AsyncConnection) -> float:
+        """Возвращает отставание реплики в секундах. Для не-PostgreSQL БД только проверяет связь."""
+        if connection.dialect.name != "postgresql":
+            await connection.execute(PROBE_QUERY)
+            return 0.0
+        lag = await connection.scalar(POSTGRES_LAG_QUERY)
+        return float(lag or 0)
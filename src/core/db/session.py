@@ -1,13 +1,87 @@
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+from uuid import uuid4
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
 from src.core.config import settings
+from src.core.db.instrumentation import instrument_engine
+from src.core.db.pool import InstrumentedAsyncPool
+from src.core.db.probe import DatabaseProbe
+from src.core.db.profiling import attach_profiler
+from src.core.db.replica import ReplicaRouter
 
-engine = create_async_engine(settings.async_database_url)
+# application_name соединений процесса. Триггеры добавляют его в уведомления
+# об изменении таблиц, и воркер узнает собственные записи. PgBouncer передает
+# application_name клиента на серверное соединение, в том числе в режиме transaction.
+APPLICATION_NAME = f"currency-exchange-{uuid4().hex[:12]}"
+
+
+def build_connect_args() -> dict[str, Any]:
+    """
+    Параметры подключения asyncpg из Settings.
+
+    В режиме PgBouncer (transaction pooling) кэши подготовленных выражений отключаются,
+    а имена выражений делаются уникальными: серверное соединение может меняться
+    между транзакциями, и именованные выражения предыдущего клиента там недоступны.
+    """
+    server_settings = {"application_name": APPLICATION_NAME}
+    if settings.db_pgbouncer_transaction_mode:
+        return {
+            "prepared_statement_cache_size": 0,
+            "statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            "server_settings": server_settings,
+        }
+    return {
+        "prepared_statement_cache_size": settings.db_statement_cache_size,
+        "server_settings": server_settings,
+    }
+
+
+def create_engine(url: str, name: str) -> AsyncEngine:
+    """
+    Фабрика асинхронного движка с параметрами пула из Settings и метриками запросов.
+
+    С DB_PROFILE=true к движку подключается профилирование выражений по запросам.
+    """
+    engine = create_async_engine(
+        url,
+        poolclass=InstrumentedAsyncPool,
+        pool_logging_name=name,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_args=build_connect_args(),
+    )
+    instrument_engine(engine, name)
+    if settings.db_profile:
+        attach_profiler(engine)
+    return engine
+
+
+engine = create_engine(settings.async_database_url, name="primary")
+
+replica_url = settings.replica_async_database_url
+replica_engine = create_engine(replica_url, name="replica") if replica_url else None
 
 new_session = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
 
+read_router = ReplicaRouter(
+    primary=engine,
+    replica=replica_engine,
+    max_lag=settings.db_replica_max_lag,
+    check_interval=settings.db_replica_check_interval,
+)
+
+database_probe = DatabaseProbe(
+    engine, check_interval=settings.health_check_interval, timeout=settings.health_probe_timeout,
+)
+
 
 async def get_session() -> AsyncGenerator:
     """
@@ -18,3 +92,27 @@ async def get_session() -> AsyncGenerator:
     """
     async with new_session() as session:
         yield session
+
+
+@asynccontextmanager
+async def read_session() -> AsyncIterator[AsyncSession]:
+    """
+    Открывает сессию только для чтения.
+
+    Сессия привязана к реплике, если она настроена (POSTGRES_REPLICA_HOST), доступна
+    и не отстает больше DB_REPLICA_MAX_LAG секунд, иначе - к основной БД.
+    """
+    session_factory = await read_router.get_session_factory()
+    async with session_factory() as session:
+        try:
+            yield session
+        except (InterfaceError, OperationalError, OSError):
+            if session.bind is replica_engine:
+                read_router.report_failure()
+            raise
+
+
+async def get_read_session() -> AsyncGenerator:
+    """Зависимость FastAPI с сессией только для чтения (см. read_session)."""
+    async with read_session() as session:
+        yield session
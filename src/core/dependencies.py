@@ -3,11 +3,20 @@ from typing import Annotated
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.core.db.session import get_session
+from src.core.db.probe import DatabaseProbe
+from src.core.db.session import database_probe, get_read_session, get_session, read_session
 from src.repositories.currency import CurrencyRepository
+from src.repositories.exchange_rate_history_repository import ExchangeRateHistoryRepository
 from src.repositories.exchange_rate_repository import ExchangeRateRepository
+from src.repositories.exchange_rate_rollup_repository import ExchangeRateRollupRepository
+from src.services.currency_registry import currency_registry
 from src.services.currency_service import CurrencyService
+from src.services.exchange_rate_export import ExchangeRateExporter
 from src.services.exchange_rate_service import ExchangeRateService
+from src.services.rate_broadcast import RateBroadcaster, rate_broadcaster
+from src.services.rate_cache import rate_cache
+from src.services.response_cache import response_cache
+from src.services.single_flight import rate_lookups
 
 
 def get_currency_repository(
@@ -25,7 +34,9 @@ def get_currency_service(
         repository: Annotated[CurrencyRepository, Depends(get_currency_repository)],
 ) -> CurrencyService:
     """Провайдер для CurrencyService. Создает экземпляр сервиса для валют с готовым репозиторием."""
-    return CurrencyService(repository=repository)
+    return CurrencyService(
+        repository=repository, response_cache=response_cache, registry=currency_registry,
+    )
 
 
 def get_exchange_rate_repository(
@@ -39,8 +50,28 @@ def get_exchange_rate_repository(
     return ExchangeRateRepository(session=session)
 
 
+def get_exchange_rate_history_repository(
+        session: Annotated[AsyncSession, Depends(get_session)],
+) -> ExchangeRateHistoryRepository:
+    """Провайдер ExchangeRateHistoryRepository. Сессия общая с остальными репозиториями запроса."""
+    return ExchangeRateHistoryRepository(session=session)
+
+
+def get_exchange_rate_rollup_repository(
+        session: Annotated[AsyncSession, Depends(get_session)],
+) -> ExchangeRateRollupRepository:
+    """Провайдер ExchangeRateRollupRepository. Агрегаты пишутся в одной транзакции с курсом."""
+    return ExchangeRateRollupRepository(session=session)
+
+
 def get_exchange_rate_service(
         repository: Annotated[ExchangeRateRepository, Depends(get_exchange_rate_repository)],
+        history_repository: Annotated[
+            ExchangeRateHistoryRepository, Depends(get_exchange_rate_history_repository),
+        ],
+        rollup_repository: Annotated[
+            ExchangeRateRollupRepository, Depends(get_exchange_rate_rollup_repository),
+        ],
         currency_service: Annotated[CurrencyService, Depends(get_currency_service)],
 ) -> ExchangeRateService:
     """
@@ -48,4 +79,107 @@ def get_exchange_rate_service(
 
     Создает экземпляр сервиса для обменного курса с готовым репозиторием.
     """
-    return ExchangeRateService(repository=repository, currency_service=currency_service)
+    return ExchangeRateService(
+        repository=repository,
+        history_repository=history_repository,
+        rollup_repository=rollup_repository,
+        currency_service=currency_service,
+        rate_cache=rate_cache,
+        rate_broadcaster=rate_broadcaster,
+        response_cache=response_cache,
+        rate_lookups=rate_lookups,
+    )
+
+
+def get_read_currency_repository(
+        session: Annotated[AsyncSession, Depends(get_read_session)],
+) -> CurrencyRepository:
+    """
+    Провайдер CurrencyRepository только для чтения.
+
+    Сессия привязана к реплике, если она настроена и доступна, иначе к основной БД.
+    """
+    return CurrencyRepository(session=session)
+
+
+def get_read_currency_service(
+        repository: Annotated[CurrencyRepository, Depends(get_read_currency_repository)],
+) -> CurrencyService:
+    """Провайдер CurrencyService для GET-эндпоинтов, читающих с реплики."""
+    return CurrencyService(
+        repository=repository, response_cache=response_cache, registry=currency_registry,
+    )
+
+
+def get_read_exchange_rate_repository(
+        session: Annotated[AsyncSession, Depends(get_read_session)],
+) -> ExchangeRateRepository:
+    """
+    Провайдер ExchangeRateRepository только для чтения.
+
+    Сессия привязана к реплике, если она настроена и доступна, иначе к основной БД.
+    """
+    return ExchangeRateRepository(session=session)
+
+
+def get_read_exchange_rate_history_repository(
+        session: Annotated[AsyncSession, Depends(get_read_session)],
+) -> ExchangeRateHistoryRepository:
+    """Провайдер ExchangeRateHistoryRepository только для чтения."""
+    return ExchangeRateHistoryRepository(session=session)
+
+
+def get_read_exchange_rate_rollup_repository(
+        session: Annotated[AsyncSession, Depends(get_read_session)],
+) -> ExchangeRateRollupRepository:
+    """Провайдер ExchangeRateRollupRepository только для чтения."""
+    return ExchangeRateRollupRepository(session=session)
+
+
+def get_read_exchange_rate_service(
+        repository: Annotated[ExchangeRateRepository, Depends(get_read_exchange_rate_repository)],
+        snapshot_repository: Annotated[ExchangeRateRepository, Depends(get_exchange_rate_repository)],
+        history_repository: Annotated[
+            ExchangeRateHistoryRepository, Depends(get_read_exchange_rate_history_repository),
+        ],
+        rollup_repository: Annotated[
+            ExchangeRateRollupRepository, Depends(get_read_exchange_rate_rollup_repository),
+        ],
+        currency_service: Annotated[CurrencyService, Depends(get_read_currency_service)],
+) -> ExchangeRateService:
+    """
+    Провайдер ExchangeRateService для эндпоинтов, которые только читают данные.
+
+    Запросы идут на реплику, а снимок курсов загружается с основной БД: сессия
+    не берет соединение из пула, пока снимок свежий.
+    """
+    return ExchangeRateService(
+        repository=repository,
+        snapshot_repository=snapshot_repository,
+        history_repository=history_repository,
+        rollup_repository=rollup_repository,
+        currency_service=currency_service,
+        rate_cache=rate_cache,
+        rate_broadcaster=rate_broadcaster,
+        response_cache=response_cache,
+        rate_lookups=rate_lookups,
+    )
+
+
+def get_exchange_rate_exporter() -> ExchangeRateExporter:
+    """
+    Провайдер ExchangeRateExporter.
+
+    Выгрузка открывает собственную сессию только для чтения на время отправки потока.
+    """
+    return ExchangeRateExporter(session_scope=read_session)
+
+
+def get_rate_broadcaster() -> RateBroadcaster:
+    """Провайдер RateBroadcaster. Рассылка общая для всех подписчиков процесса."""
+    return rate_broadcaster
+
+
+def get_database_probe() -> DatabaseProbe:
+    """Провайдер DatabaseProbe. Результат проверки БД общий для всех проб процесса."""
+    return database_probe
@@ -0,0 +1,55 @@
+import asyncio
+import logging
+
+log = logging.getLogger(__name__)
+
+
+class AppLifecycle:
+    """
+    Готовность воркера и учет HTTP-запросов в обработке.
+
+    ready выставляется lifespan после прогрева пула и кэшей и снимается в начале остановки.
+    drain() ждет завершения запросов, принятых до остановки, прежде чем закрывать пул.
+    """
+
+    def __init__(self) -> None:
+        self.ready = False
+        self._in_flight = 0
+        self._idle: asyncio.Event | None = None
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def request_started(self) -> None:
+        self._in_flight += 1
+
+    def request_finished(self) -> None:
+        self._in_flight -= 1
+        if self._in_flight == 0 and self._idle is not None:
+            self._idle.set()
+
+    async def drain(self, timeout: float) -> bool:
+        """
+        Снимает готовность и ждет завершения запросов не дольше timeout секунд.
+
+        Возвращает False, если к истечению timeout запросы еще обрабатывались.
+        """
+        self.ready = False
+        if self._in_flight == 0:
+            return True
+
+        log.info("Ожидание завершения запросов в обработке: %s", self._in_flight)
+        self._idle = asyncio.Event()
+        try:
+            async with asyncio.timeout(timeout):
+                await self._idle.wait()
+        except TimeoutError:
+            log.warning("Запросы не завершились за %.1f с при остановке: %s", timeout, self._in_flight)
+            return False
+        finally:
+            self._idle = None
+        return True
+
+
+lifecycle = AppLifecycle()
@@ -0,0 +1,101 @@
+import atexit
+import copy
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+import orjson
+
+from src.core.metrics import LOG_RECORDS_DROPPED
+
+_exception_formatter = logging.Formatter()
+_started: set[QueueListener] = set()
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Форматирует запись в одну строку JSON: level, timestamp, logger, lineno, message.
+
+    Текст исключения и стек попадают в поля exc_info и stack_info. Строка кодируется
+    orjson, поэтому кавычки и переводы строк в сообщениях не ломают JSON.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload: dict[str, object] = {
+            "level": record.levelname,
+            "timestamp": self.formatTime(record, self.datefmt),
+            "logger": record.name,
+            "lineno": record.lineno,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exc_info"] = record.exc_text
+        if record.stack_info:
+            payload["stack_info"] = self.formatStack(record.stack_info)
+        return orjson.dumps(payload, default=str).decode()
+
+
+class AsyncQueueHandler(QueueHandler):
+    """
+    Передает записи в QueueListener, который форматирует и пишет их в отдельном потоке.
+
+    В потоке вызова аргументы только подставляются в сообщение (они могут измениться
+    после возврата из вызова лога), JSON и запись в поток вывода выполняет слушатель.
+    Если очередь заполнена, запись отбрасывается и учитывается в log_records_dropped_total:
+    медленный вывод не блокирует цикл событий.
+    """
+
+    listener: QueueListener
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Пропускает каждую N-ю запись уровня INFO и ниже из заданных функций.
+
+    every - {"логгер.функция": N}, например {"src.api.exchange.exchange_currencies": 100}.
+    Записи из других функций и записи уровня WARNING и выше проходят всегда.
+    """
+
+    def __init__(self, every: dict[str, int] | None = None):
+        super().__init__()
+        self.every = every or {}
+        self._counters: dict[str, int] = dict.fromkeys(self.every, 0)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO:
+            return True
+        key = f"{record.name}.{record.funcName}"
+        every = self.every.get(key)
+        if every is None or every <= 1:
+            return True
+        count = self._counters[key]
+        self._counters[key] = count + 1
+        return count % every == 0
+
+
+def start_queue_listeners() -> None:
+    """Запускает слушателей всех AsyncQueueHandler из конфигурации и останавливает их при выходе."""
+    for name in logging.getHandlerNames():
+        handler = logging.getHandlerByName(name)
+        if isinstance(handler, AsyncQueueHandler) and handler.listener not in _started:
+            _started.add(handler.listener)
+            handler.listener.start()
+            atexit.register(handler.listener.stop)
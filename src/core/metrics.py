@@ -0,0 +1,62 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_seconds",
+    "Время ожидания соединения из пула SQLAlchemy.",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections",
+    "Количество соединений, выданных из пула.",
+    ["pool"],
+)
+DB_POOL_SATURATION = Gauge(
+    "db_pool_saturation_ratio",
+    "Доля занятых соединений от pool_size + max_overflow.",
+    ["pool"],
+)
+
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+)
+STAGE_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.01, 0.05, 0.25, 1)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Длительность обработки HTTP-запроса по шаблону маршрута.",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+EXCHANGE_STAGE_SECONDS = Histogram(
+    "exchange_stage_seconds",
+    "Длительность этапов конвертации: fetch (снимок или история курсов), resolve (маршрут"
+    " и курс), quantize (округление суммы), validate (схема ответа).",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+EXCHANGE_RESOLUTIONS = Counter(
+    "exchange_rate_resolutions_total",
+    "Конвертации по типу маршрута: direct, reverse, cross.",
+    ["path"],
+)
+DB_QUERY_SECONDS = Histogram(
+    "db_query_seconds",
+    "Время выполнения SQL-выражений по типу (SELECT, INSERT, ...).",
+    ["engine", "operation"],
+    buckets=LATENCY_BUCKETS,
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Обращения к внутрипроцессным кэшам: result=hit или miss.",
+    ["cache", "result"],
+)
+LOG_RECORDS_DROPPED = Counter(
+    "log_records_dropped",
+    "Записи лога, отброшенные из-за переполнения очереди AsyncQueueHandler.",
+)
+SINGLE_FLIGHT_CALLS = Counter(
+    "single_flight_calls",
+    "Обращения к SingleFlight: role=leader - выполнил запрос, coalesced - получил чужой результат.",
+    ["operation", "role"],
+)
@@ -20,3 +20,7 @@ class ExchangeRateExistsError(CurrencyExchangeError):
 
 class SameCurrencyConversionError(CurrencyExchangeError):
     """Исключение при конвертации валюты в саму себя"""
+
+
+class InvalidBatchError(CurrencyExchangeError):
+    """Исключение при некорректном теле пакетного запроса"""
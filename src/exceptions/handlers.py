@@ -1,4 +1,5 @@
 import logging
+from typing import Any
 
 from asyncpg import PostgresError
 from fastapi import FastAPI
@@ -14,6 +15,7 @@ from src.exceptions.exceptions import (
     CurrencyNotExistsError,
     ExchangeRateExistsError,
     ExchangeRateNotExistsError,
+    InvalidBatchError,
     SameCurrencyConversionError,
 )
 
@@ -46,7 +48,7 @@ async def database_exception_handler(request: Request, exc: Exception) -> JSONRe
 
 
 async def currency_not_found_handler(request: Request, exc: Exception) -> JSONResponse:
-    log.warning(f"Валюта не найдена в БД: {exc}")
+    log.warning("Валюта не найдена в БД: %s", exc)
     return JSONResponse(
         status_code=status.HTTP_404_NOT_FOUND,
         content={"message": "Валюта не найдена"},
@@ -54,13 +56,25 @@ async def currency_not_found_handler(request: Request, exc: Exception) -> JSONRe
 
 
 async def currency_exists_handler(request: Request, exc: Exception) -> JSONResponse:
-    log.warning(f"Валюта уже есть в БД, {request.method}, {request.url.path}, {exc}")
+    log.warning("Валюта уже есть в БД, %s, %s, %s", request.method, request.url.path, exc)
     return JSONResponse(
         status_code=status.HTTP_409_CONFLICT,
         content={"message": "Такая валюта уже существует."},
     )
 
 
+def format_validation_error(error: Any) -> str:
+    """Формирует понятное пользователю сообщение по одной ошибке валидации Pydantic."""
+    field_name = str(error["loc"][-1]) if error["loc"] else ""
+    template: str = PYDANTIC_ERROR_MESSAGES.get(error["type"], error["msg"])
+
+    return template.format(
+        field_name=field_name,
+        limit_value=error.get("ctx", {}).get("gt"),
+        original_msg=error.get("msg"),
+    )
+
+
 async def validation_error_handler(request: Request, exc: Exception) -> JSONResponse:
     """
     Кастомный обработчик ошибок валидации Pydantic.
@@ -68,18 +82,9 @@ async def validation_error_handler(request: Request, exc: Exception) -> JSONResp
     Формирует понятный для пользователя ответ со всеми ошибками.
     """
     if isinstance(exc, RequestValidationError):
-        field_name = str(exc.errors()[0]["loc"][-1])
-        error_type = exc.errors()[0]["type"]
-
-        template = PYDANTIC_ERROR_MESSAGES.get(error_type, exc.errors()[0]["msg"])
+        message = format_validation_error(exc.errors()[0])
 
-        message = template.format(
-            field_name=field_name,
-            limit_value=exc.errors()[0].get("ctx", {}).get("gt"),
-            original_msg=exc.errors()[0].get("msg"),
-        )
-
-        log.warning(f"Ошибка валидации данных: {message}")
+        log.warning("Ошибка валидации данных: %s", message)
 
         return JSONResponse(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
@@ -93,7 +98,7 @@ async def validation_error_handler(request: Request, exc: Exception) -> JSONResp
 
 
 async def exchange_rate_not_found_handler(request: Request, exc: Exception) -> JSONResponse:
-    log.warning(f"Обменный курс не найден в БД: {exc}")
+    log.warning("Обменный курс не найден в БД: %s", exc)
     return JSONResponse(
         status_code=status.HTTP_404_NOT_FOUND,
         content={"message": "Обменного курса данных валют нет в БД"},
@@ -101,7 +106,7 @@ async def exchange_rate_not_found_handler(request: Request, exc: Exception) -> J
 
 
 async def exchange_rate_exists_handler(request: Request, exc: Exception) -> JSONResponse:
-    log.warning(f"Валютная пара уже существует в БД: {exc}")
+    log.warning("Валютная пара уже существует в БД: %s", exc)
     return JSONResponse(
         status_code=status.HTTP_409_CONFLICT,
         content={"message": "Такая валютная пара уже существует"},
@@ -111,13 +116,21 @@ async def exchange_rate_exists_handler(request: Request, exc: Exception) -> JSON
 async def same_currency_exception_handler(
         request: Request, exc: Exception,
 ) -> JSONResponse:
-    log.warning(f"Конвертация валюты в саму себя, {request.method}, {request.url.path}, {exc}")
+    log.warning("Конвертация валюты в саму себя, %s, %s, %s", request.method, request.url.path, exc)
     return JSONResponse(
         status_code=status.HTTP_400_BAD_REQUEST,
         content={"message": "Нельзя конвертировать валюту в саму себя"},
     )
 
 
+async def invalid_batch_handler(request: Request, exc: Exception) -> JSONResponse:
+    log.warning("Некорректный пакетный запрос, %s, %s, %s", request.method, request.url.path, exc)
+    return JSONResponse(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        content={"message": str(exc)},
+    )
+
+
 async def custom_http_exception_handler(request: Request, exc: Exception) -> JSONResponse:
     if isinstance(exc, StarletteHTTPException):
         if exc.status_code == 404:
@@ -146,4 +159,5 @@ def register_exception_handlers(app: FastAPI) -> None:
     app.add_exception_handler(ExchangeRateNotExistsError, exchange_rate_not_found_handler)
     app.add_exception_handler(ExchangeRateExistsError, exchange_rate_exists_handler)
     app.add_exception_handler(SameCurrencyConversionError, same_currency_exception_handler)
+    app.add_exception_handler(InvalidBatchError, invalid_batch_handler)
     app.add_exception_handler(StarletteHTTPException, custom_http_exception_handler)
@@ -1,11 +1,142 @@
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import SQLAlchemyError
 
 from src.api import main_router
-from src.core.config import setup_logging
+from src.api.lifecycle import InFlightRequestsMiddleware
+from src.api.metrics import RequestMetricsMiddleware
+from src.api.profiling import QueryProfilingMiddleware
+from src.api.responses import FastJSONResponse
+from src.core.config import settings, setup_logging
+from src.core.db.listener import pg_listener
+from src.core.db.session import engine, new_session, replica_engine
+from src.core.db.warmup import warm_up_engine
+from src.core.lifecycle import lifecycle
 from src.exceptions.handlers import register_exception_handlers
+from src.repositories.currency import CurrencyRepository
+from src.repositories.exchange_rate_repository import ExchangeRateRepository
+from src.services.cache_invalidation import cache_invalidator
+from src.services.currency_registry import currency_registry
+from src.services.rate_broadcast import rate_broadcaster
+from src.services.rate_cache import rate_cache
+
+log = logging.getLogger(__name__)
+
+
+async def warm_up_pools() -> bool:
+    """
+    Прогревает пулы основной БД и реплики: DB_POOL_WARMUP_CONNECTIONS, не больше DB_POOL_SIZE.
+
+    Возвращает False, если какой-то пул прогреть не удалось.
+    """
+    connections = min(
+        settings.db_pool_size if settings.db_pool_warmup_connections is None
+        else settings.db_pool_warmup_connections,
+        settings.db_pool_size,
+    )
+    if connections <= 0:
+        return True
+    engines = [engine] if replica_engine is None else [engine, replica_engine]
+    results = await asyncio.gather(
+        *(warm_up_engine(pool_engine, connections) for pool_engine in engines), return_exceptions=True,
+    )
+    warmed = True
+    for result in results:
+        if isinstance(result, SQLAlchemyError | OSError):
+            log.error("Не удалось прогреть пул соединений при старте", exc_info=result)
+            warmed = False
+        elif isinstance(result, BaseException):
+            raise result
+    return warmed
+
+
+async def load_reference_data() -> bool:
+    """Загружает справочник валют и снимок курсов. Возвращает False, если БД недоступна."""
+    try:
+        async with new_session() as session:
+            await currency_registry.reload(CurrencyRepository(session))
+            await rate_cache.reload(ExchangeRateRepository(session))
+    except (SQLAlchemyError, OSError):
+        log.exception("Не удалось загрузить справочник валют и снимок курсов")
+        return False
+    return True
+
+
+async def become_ready(retry_interval: float) -> None:
+    """
+    Повторяет загрузку справочника и снимка курсов, пока она не пройдет, и отмечает воркер готовым.
+
+    Запускается, если при старте не удалось прогреть пул или загрузить данные: до успешной
+    загрузки /health/ready отвечает 503, и балансировщик не отправляет на воркер запросы.
+    """
+    while not await load_reference_data():
+        await asyncio.sleep(retry_interval)
+    log.info("Справочник валют и снимок курсов загружены, воркер готов")
+    lifecycle.ready = True
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Готовит воркер к приему запросов и плавно останавливает его.
+
+    При старте прогревает пулы соединений, загружает справочник валют и снимок курсов,
+    и только после этого отмечает воркер готовым (lifecycle.ready). Если БД недоступна,
+    воркер остается неготовым, а загрузка повторяется в фоне. С RATE_STREAM_NOTIFY=true
+    запускает LISTEN, чтобы изменения курсов доходили до подписчиков всех воркеров,
+    с CACHE_NOTIFY=true - чтобы запись в любом воркере сбрасывала кэши остальных.
+
+    При остановке снимает готовность, закрывает подписки на курсы, ждет завершения
+    запросов в обработке (не дольше SHUTDOWN_DRAIN_TIMEOUT) и закрывает пулы соединений.
+    """
+    warmed = await warm_up_pools()
+    loaded = await load_reference_data()
+
+    if settings.rate_stream_notify:
+        rate_broadcaster.attach_listener(pg_listener)
+    if settings.cache_notify:
+        cache_invalidator.attach_listener(pg_listener)
+    if settings.rate_stream_notify or settings.cache_notify:
+        pg_listener.start()
+
+    retry: asyncio.Task[None] | None = None
+    if warmed and loaded:
+        lifecycle.ready = True
+    else:
+        retry = asyncio.create_task(become_ready(settings.startup_retry_interval))
+    try:
+        yield
+    finally:
+        if retry is not None:
+            retry.cancel()
+        lifecycle.ready = False
+        rate_broadcaster.close_all()
+        await lifecycle.drain(settings.shutdown_drain_timeout)
+        await pg_listener.stop()
+        await engine.dispose()
+        if replica_engine is not None:
+            await replica_engine.dispose()
+
 
 setup_logging()
-app = FastAPI()
+app = FastAPI(
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse if settings.fast_json_response else JSONResponse,
+)
 
+app.add_middleware(RequestMetricsMiddleware)
+app.add_middleware(InFlightRequestsMiddleware, lifecycle=lifecycle)
+if settings.db_profile:
+    app.add_middleware(
+        QueryProfilingMiddleware,
+        max_queries=settings.db_profile_max_queries,
+        max_duration=settings.db_profile_max_duration,
+        explain_threshold=settings.db_profile_explain_threshold,
+    )
 register_exception_handlers(app)
 app.include_router(main_router)
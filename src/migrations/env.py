@@ -10,6 +10,8 @@ from src.core.config import settings
 from src.core.db.base import Base
 from src.models.currency import Currency  # noqa
 from src.models.exchange_rate import ExchangeRate  # noqa
+from src.models.exchange_rate_history import ExchangeRateHistory  # noqa
+from src.models.exchange_rate_ohlc import ExchangeRateOhlc  # noqa
 
 config = context.config
 
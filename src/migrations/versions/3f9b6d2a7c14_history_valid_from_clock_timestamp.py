@@ -0,0 +1,31 @@
+"""history valid_from clock timestamp
+
+Revision ID: 3f9b6d2a7c14
+Revises: e7f1a3c8b952
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9b6d2a7c14'
+down_revision: Union[str, Sequence[str], None] = 'e7f1a3c8b952'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # now() - время начала транзакции, clock_timestamp() - время самой записи.
+    op.alter_column(
+        'exchange_rate_history', 'valid_from', server_default=sa.text('clock_timestamp()'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('exchange_rate_history', 'valid_from', server_default=sa.text('now()'))
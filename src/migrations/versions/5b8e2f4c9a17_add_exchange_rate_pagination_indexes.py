@@ -0,0 +1,33 @@
+"""add exchange rate pagination indexes
+
+Revision ID: 5b8e2f4c9a17
+Revises: 1ac9c9d2ce02
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8e2f4c9a17'
+down_revision: Union[str, Sequence[str], None] = '1ac9c9d2ce02'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_exchange_rate_base_currency_id_id', 'exchange_rate', ['base_currency_id', 'id'], unique=False,
+    )
+    op.create_index(
+        'ix_exchange_rate_target_currency_id_id', 'exchange_rate', ['target_currency_id', 'id'], unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_exchange_rate_target_currency_id_id', table_name='exchange_rate')
+    op.drop_index('ix_exchange_rate_base_currency_id_id', table_name='exchange_rate')
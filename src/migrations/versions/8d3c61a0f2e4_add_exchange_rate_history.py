@@ -0,0 +1,52 @@
+"""add exchange rate history
+
+Revision ID: 8d3c61a0f2e4
+Revises: 5b8e2f4c9a17
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d3c61a0f2e4'
+down_revision: Union[str, Sequence[str], None] = '5b8e2f4c9a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Секции по годам; значения вне диапазона попадают в секцию по умолчанию.
+PARTITION_YEARS = range(2025, 2031)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('exchange_rate_history',
+    sa.Column('base_currency_id', sa.Integer(), nullable=False),
+    sa.Column('target_currency_id', sa.Integer(), nullable=False),
+    sa.Column('valid_from', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('rate', sa.Numeric(precision=17, scale=6), nullable=False),
+    sa.ForeignKeyConstraint(['base_currency_id'], ['currency.id'], ),
+    sa.ForeignKeyConstraint(['target_currency_id'], ['currency.id'], ),
+    sa.PrimaryKeyConstraint('base_currency_id', 'target_currency_id', 'valid_from'),
+    postgresql_partition_by='RANGE (valid_from)'
+    )
+    for year in PARTITION_YEARS:
+        op.execute(
+            f"CREATE TABLE exchange_rate_history_{year} PARTITION OF exchange_rate_history "
+            f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+        )
+    op.execute("CREATE TABLE exchange_rate_history_default PARTITION OF exchange_rate_history DEFAULT")
+
+    # Текущие курсы становятся первой точкой истории.
+    op.execute(
+        "INSERT INTO exchange_rate_history (base_currency_id, target_currency_id, rate) "
+        "SELECT base_currency_id, target_currency_id, rate FROM exchange_rate"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('exchange_rate_history')
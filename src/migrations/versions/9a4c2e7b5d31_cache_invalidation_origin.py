@@ -0,0 +1,49 @@
+"""cache invalidation origin
+
+Revision ID: 9a4c2e7b5d31
+Revises: 3f9b6d2a7c14
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4c2e7b5d31'
+down_revision: Union[str, Sequence[str], None] = '3f9b6d2a7c14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # application_name записавшего соединения позволяет воркеру пропускать уведомления
+    # о собственных записях.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION notify_cache_invalidation() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify(
+                'cache_invalidation', TG_TABLE_NAME || ':' || current_setting('application_name')
+            );
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION notify_cache_invalidation() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('cache_invalidation', TG_TABLE_NAME);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
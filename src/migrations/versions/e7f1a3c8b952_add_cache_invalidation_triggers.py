@@ -0,0 +1,48 @@
+"""add cache invalidation triggers
+
+Revision ID: e7f1a3c8b952
+Revises: c4a7e9b25d10
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7f1a3c8b952'
+down_revision: Union[str, Sequence[str], None] = 'c4a7e9b25d10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("currency", "exchange_rate")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # NOTIFY доставляется после коммита, одинаковые уведомления транзакции схлопываются,
+    # поэтому пакетная запись дает одно уведомление.
+    op.execute(
+        """
+        CREATE FUNCTION notify_cache_invalidation() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('cache_invalidation', TG_TABLE_NAME);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    for table in TABLES:
+        op.execute(
+            f"CREATE TRIGGER {table}_cache_invalidation "
+            f"AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table} "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION notify_cache_invalidation()"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        op.execute(f"DROP TRIGGER {table}_cache_invalidation ON {table}")
+    op.execute("DROP FUNCTION notify_cache_invalidation()")
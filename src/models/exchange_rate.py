@@ -1,7 +1,7 @@
 from decimal import Decimal
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey, Numeric, UniqueConstraint
+from sqlalchemy import ForeignKey, Index, Numeric, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.core.db.base import Base
@@ -29,4 +29,7 @@ class ExchangeRate(Base):
 
     __table_args__ = (
         UniqueConstraint("base_currency_id", "target_currency_id", name="uq_base_target_currencies"),
+        # Постраничная выборка с фильтром по валюте идет по id внутри одной валюты.
+        Index("ix_exchange_rate_base_currency_id_id", "base_currency_id", "id"),
+        Index("ix_exchange_rate_target_currency_id_id", "target_currency_id", "id"),
     )
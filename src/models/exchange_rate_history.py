@@ -0,0 +1,32 @@
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import DateTime, ForeignKey, Numeric, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.core.db.base import Base
+
+
+class ExchangeRateHistory(Base):
+    """
+    Журнал значений обменных курсов (только добавление).
+
+    Каждая запись курса сохраняет значение, действующее с момента valid_from. Первичный
+    ключ (base_currency_id, target_currency_id, valid_from) одновременно служит индексом
+    для поиска курса на момент времени. В PostgreSQL таблица секционирована по valid_from.
+
+    valid_from - время самой записи (clock_timestamp()), а не начала транзакции: иначе
+    транзакция, начатая раньше, но закоммиченная позже, получила бы более старый момент
+    и поиск на момент времени вернул бы замененный курс.
+    """
+
+    __tablename__ = "exchange_rate_history"
+
+    base_currency_id: Mapped[int] = mapped_column(ForeignKey("currency.id"), primary_key=True)
+    target_currency_id: Mapped[int] = mapped_column(ForeignKey("currency.id"), primary_key=True)
+    valid_from: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), primary_key=True, server_default=func.clock_timestamp(),
+    )
+    rate: Mapped[Decimal] = mapped_column(Numeric(precision=17, scale=6), nullable=False)
+
+    __table_args__ = {"postgresql_partition_by": "RANGE (valid_from)"}
@@ -0,0 +1,29 @@
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import DateTime, ForeignKey, Integer, Numeric, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.core.db.base import Base
+
+
+class ExchangeRateOhlc(Base):
+    """
+    Агрегаты курса валютной пары по интервалам времени (open-high-low-close).
+
+    Одна строка - один интервал bucket_start длительностью resolution (1m, 1h, 1d).
+    Строки обновляются при каждой записи курса и могут быть пересчитаны из истории
+    командой python -m src.commands.backfill_rollups.
+    """
+
+    __tablename__ = "exchange_rate_ohlc"
+
+    base_currency_id: Mapped[int] = mapped_column(ForeignKey("currency.id"), primary_key=True)
+    target_currency_id: Mapped[int] = mapped_column(ForeignKey("currency.id"), primary_key=True)
+    resolution: Mapped[str] = mapped_column(String(3), primary_key=True)
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    open: Mapped[Decimal] = mapped_column(Numeric(precision=17, scale=6), nullable=False)
+    high: Mapped[Decimal] = mapped_column(Numeric(precision=17, scale=6), nullable=False)
+    low: Mapped[Decimal] = mapped_column(Numeric(precision=17, scale=6), nullable=False)
+    close: Mapped[Decimal] = mapped_column(Numeric(precision=17, scale=6), nullable=False)
+    ticks: Mapped[int] = mapped_column(Integer, nullable=False)
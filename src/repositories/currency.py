@@ -1,7 +1,7 @@
 from collections.abc import Sequence
 
-from sqlalchemy import Row, select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
 
 from src.models.currency import Currency
 
@@ -10,25 +10,39 @@ class CurrencyRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
 
+    @property
+    def bind(self) -> AsyncEngine | AsyncConnection | None:
+        """Движок сессии: основная БД или реплика."""
+        return self.session.bind
+
     async def create_currency(self, code: str, name: str, sign: str) -> Currency:
-        new_currency = Currency(code=code, name=name, sign=sign)
-        self.session.add(new_currency)
-        await self.session.flush()
-        return new_currency
+        """Создает валюту одним выражением INSERT ... RETURNING, без повторного чтения строки."""
+        query_result = await self.session.execute(
+            insert(Currency).values(code=code, name=name, sign=sign).returning(Currency),
+        )
+        return query_result.scalar_one()
 
     async def get_all_currencies(self) -> Sequence[Currency]:
         """Получает список всех валют."""
         query_result = await self.session.execute(select(Currency))
         return query_result.scalars().all()
 
+    async def get_currencies_page(self, after_id: int | None, limit: int) -> Sequence[Currency]:
+        """Получает не больше limit валют с id больше after_id в порядке id."""
+        query = select(Currency)
+        if after_id is not None:
+            query = query.where(Currency.id > after_id)
+        query_result = await self.session.execute(query.order_by(Currency.id).limit(limit))
+        return query_result.scalars().all()
+
     async def get_currency_by_code(self, code: str) -> Currency | None:
         """Получает одну валюту по её коду."""
         query = select(Currency).where(Currency.code == code)
         query_result = await self.session.execute(query)
         return query_result.scalar_one_or_none()
 
-    async def get_codes_and_id_by_codes(self, codes: list[str]) -> Sequence[Row]:
-        """Получает список кортежей (code, id) по списку кодов валют."""
-        query = select(Currency.code, Currency.id).where(Currency.code.in_(codes))
+    async def get_currencies_by_codes(self, codes: list[str]) -> Sequence[Currency]:
+        """Получает валюты по списку кодов."""
+        query = select(Currency).where(Currency.code.in_(codes))
         query_result = await self.session.execute(query)
-        return query_result.all()
+        return query_result.scalars().all()
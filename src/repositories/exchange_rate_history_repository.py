@@ -0,0 +1,121 @@
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import CTE, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from src.models.currency import Currency
+from src.models.exchange_rate import ExchangeRate
+from src.models.exchange_rate_history import ExchangeRateHistory
+
+
+@dataclass(slots=True)
+class HistoricalRate:
+    """Курс валютной пары, действовавший на заданный момент времени."""
+
+    id: int
+    base_currency_id: int
+    target_currency_id: int
+    base_currency: Currency
+    target_currency: Currency
+    rate: Decimal
+
+
+class ExchangeRateHistoryRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @staticmethod
+    def add_rates_from(source: CTE) -> CTE:
+        """
+        Data-modifying CTE: добавляет в журнал курсы из source.
+
+        Используется как RateJournal, чтобы запись курса и журнала была одним выражением.
+        Журнал только дополняется: повтор первичного ключа - ошибка, а не перезапись.
+        """
+        return insert(ExchangeRateHistory).from_select(
+            ["base_currency_id", "target_currency_id", "valid_from", "rate"],
+            select(
+                source.c.base_currency_id,
+                source.c.target_currency_id,
+                func.clock_timestamp(),
+                source.c.rate,
+            ),
+        ).cte("written_history")
+
+    async def get_rates_at(self, at: datetime) -> list[HistoricalRate]:
+        """
+        Получает курсы всех пар, действовавшие на момент at.
+
+        Для каждой пары выполняется один поиск по первичному ключу журнала: последнее
+        значение с valid_from <= at. Пары, у которых на тот момент не было курса, не
+        возвращаются.
+        """
+        BaseCurrency = aliased(Currency)  # noqa: N806
+        TargetCurrency = aliased(Currency)  # noqa: N806
+
+        rate_at = (
+            select(ExchangeRateHistory.rate)
+            .where(
+                ExchangeRateHistory.base_currency_id == ExchangeRate.base_currency_id,
+                ExchangeRateHistory.target_currency_id == ExchangeRate.target_currency_id,
+                ExchangeRateHistory.valid_from <= at,
+            )
+            .order_by(ExchangeRateHistory.valid_from.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+        rates = (
+            select(
+                ExchangeRate.id,
+                ExchangeRate.base_currency_id,
+                ExchangeRate.target_currency_id,
+                rate_at.label("rate"),
+            )
+            .subquery()
+        )
+        query = (
+            select(rates.c.id, BaseCurrency, TargetCurrency, rates.c.rate)
+            .join(BaseCurrency, rates.c.base_currency_id == BaseCurrency.id)
+            .join(TargetCurrency, rates.c.target_currency_id == TargetCurrency.id)
+            .where(rates.c.rate.is_not(None))
+        )
+
+        query_result = await self.session.execute(query)
+        return [
+            HistoricalRate(
+                id=rate_id,
+                base_currency_id=base_currency.id,
+                target_currency_id=target_currency.id,
+                base_currency=base_currency,
+                target_currency=target_currency,
+                rate=rate,
+            )
+            for rate_id, base_currency, target_currency, rate in query_result.all()
+        ]
+
+    async def get_pair_history(
+            self,
+            base_id: int,
+            target_id: int,
+            date_from: datetime | None,
+            date_to: datetime | None,
+            limit: int,
+    ) -> Sequence[ExchangeRateHistory]:
+        """Получает значения курса пары за период в порядке времени, не больше limit."""
+        query = select(ExchangeRateHistory).where(
+            ExchangeRateHistory.base_currency_id == base_id,
+            ExchangeRateHistory.target_currency_id == target_id,
+        )
+        if date_from is not None:
+            query = query.where(ExchangeRateHistory.valid_from >= date_from)
+        if date_to is not None:
+            query = query.where(ExchangeRateHistory.valid_from <= date_to)
+
+        query_result = await self.session.execute(
+            query.order_by(ExchangeRateHistory.valid_from).limit(limit),
+        )
+        return query_result.scalars().all()
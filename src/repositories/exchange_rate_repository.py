@@ -1,8 +1,10 @@
-from collections.abc import Sequence
+from collections.abc import AsyncIterator, Callable, Sequence
+from dataclasses import dataclass
 from decimal import Decimal
 from typing import Any
 
-from sqlalchemy import Row, RowMapping, and_, or_, select, update
+from sqlalchemy import CTE, Boolean, Row, Select, literal_column, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import aliased, contains_eager, joinedload
 
@@ -10,6 +12,29 @@ from src.exceptions.exceptions import ExchangeRateNotExistsError
 from src.models.currency import Currency
 from src.models.exchange_rate import ExchangeRate
 
+# asyncpg ограничивает число параметров запроса 32767. В пачке upsert на строку приходится
+# 3 параметра, CTE журнала читают строки из upsert и добавляют только постоянные параметры.
+MAX_QUERY_PARAMS = 32767
+UPSERT_CHUNK_SIZE = 5000
+# Сколько строк серверный курсор отдает за одну выборку при потоковой выгрузке.
+EXPORT_BATCH_SIZE = 1000
+
+# Строит по CTE с записанным курсом (id, base_currency_id, target_currency_id, rate)
+# data-modifying CTE, которые выполняются тем же выражением, что и запись курса.
+RateJournal = Callable[[CTE], Sequence[CTE]]
+
+
+@dataclass(slots=True)
+class UpsertedRates:
+    """Курсы, записанные upsert_exchange_rates, и сколько из них вставлено."""
+
+    rates: list[ExchangeRate]
+    inserted: int
+
+    @property
+    def updated(self) -> int:
+        return len(self.rates) - self.inserted
+
 
 class ExchangeRateRepository:
     def __init__(self, session: AsyncSession):
@@ -24,34 +49,19 @@ class ExchangeRateRepository:
         query_result = await self.session.execute(query)
         return query_result.scalars().all()
 
-    async def create_exchange_rate(self, base_id: int, target_id: int, rate: Decimal) -> ExchangeRate:
-        """Создает обменный курс для валютной пары."""
-        new_exchange_rate = ExchangeRate(
-            base_currency_id=base_id, target_currency_id=target_id, rate=rate,
-        )
-        self.session.add(new_exchange_rate)
-        await self.session.flush()
-        return new_exchange_rate
-
-    async def update_exchange_rate(self, base_id: int, target_id: int, rate: Decimal) -> ExchangeRate:
-        """Обновляет обменный курс для валютной пары."""
-        stmt = (update(ExchangeRate).where(
-            ExchangeRate.base_currency_id == base_id,
-            ExchangeRate.target_currency_id == target_id,
-        ).values(rate=rate).returning(ExchangeRate))
-
-        query_result = await self.session.execute(stmt)
-
-        updated_exchange_rate = query_result.scalar_one_or_none()
-
-        if not updated_exchange_rate:
-            raise ExchangeRateNotExistsError
-
-        await self.session.refresh(updated_exchange_rate, ["base_currency", "target_currency"])
-
-        return updated_exchange_rate
-
-    async def get_rate_by_codes(self, base_code: str, target_code: str) -> ExchangeRate | None:
+    async def get_exchange_rates_page(
+            self,
+            after_id: int | None,
+            limit: int,
+            base_code: str | None = None,
+            target_code: str | None = None,
+    ) -> Sequence[ExchangeRate]:
+        """
+        Получает страницу курсов в порядке id (keyset-пагинация).
+
+        Возвращает не больше limit курсов с id больше after_id, при необходимости
+        только с указанной базовой и/или целевой валютой.
+        """
         BaseCurrency = aliased(Currency)  # noqa: N806
         TargetCurrency = aliased(Currency)  # noqa: N806
 
@@ -59,40 +69,149 @@ class ExchangeRateRepository:
             select(ExchangeRate)
             .join(BaseCurrency, ExchangeRate.base_currency_id == BaseCurrency.id)
             .join(TargetCurrency, ExchangeRate.target_currency_id == TargetCurrency.id)
-            .where(BaseCurrency.code == base_code, TargetCurrency.code == target_code)
             .options(
                 contains_eager(ExchangeRate.base_currency, alias=BaseCurrency),
                 contains_eager(ExchangeRate.target_currency, alias=TargetCurrency),
             )
         )
-        query_result = await self.session.execute(query)
-        return query_result.scalar_one_or_none()
+        if after_id is not None:
+            query = query.where(ExchangeRate.id > after_id)
+        if base_code is not None:
+            query = query.where(BaseCurrency.code == base_code)
+        if target_code is not None:
+            query = query.where(TargetCurrency.code == target_code)
+
+        query_result = await self.session.execute(query.order_by(ExchangeRate.id).limit(limit))
+        return query_result.scalars().all()
+
+    async def stream_exchange_rate_rows(self) -> AsyncIterator[Sequence[Row[Any]]]:
+        """
+        Потоково читает все курсы серверным курсором, пачками по EXPORT_BATCH_SIZE строк.
 
-    async def get_exchange_rates(
-            self, possible_pairs: list[tuple[str, str]],
-    ) -> Sequence[Row[Any] | RowMapping | Any]:
+        Строки плоские (без ORM-объектов): id, код, название и знак базовой и целевой
+        валюты, курс - поэтому память не растет с размером таблицы.
+        """
         BaseCurrency = aliased(Currency)  # noqa: N806
         TargetCurrency = aliased(Currency)  # noqa: N806
 
-        conditions = [
-            and_(
-                BaseCurrency.code == base, TargetCurrency.code == target,
-            ) for base, target in possible_pairs
-        ]
-
-        if not conditions:
-            return []
-
         query = (
-            select(ExchangeRate)
+            select(
+                ExchangeRate.id,
+                BaseCurrency.id, BaseCurrency.code, BaseCurrency.name, BaseCurrency.sign,
+                TargetCurrency.id, TargetCurrency.code, TargetCurrency.name, TargetCurrency.sign,
+                ExchangeRate.rate,
+            )
             .join(BaseCurrency, ExchangeRate.base_currency_id == BaseCurrency.id)
             .join(TargetCurrency, ExchangeRate.target_currency_id == TargetCurrency.id)
-            .where(or_(*conditions))
+            .order_by(ExchangeRate.id)
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+
+        query_result = await self.session.stream(query)
+        async for rows in query_result.partitions():
+            yield rows
+
+    async def create_exchange_rate(
+            self, base_id: int, target_id: int, rate: Decimal, journal: RateJournal | None = None,
+    ) -> ExchangeRate:
+        """
+        Создает обменный курс для валютной пары одним выражением.
+
+        INSERT ... RETURNING выполняется в CTE и соединяется с валютами пары, поэтому курс
+        возвращается с загруженными base_currency и target_currency без дополнительных запросов.
+        """
+        written = (
+            insert(ExchangeRate)
+            .values(base_currency_id=base_id, target_currency_id=target_id, rate=rate)
+            .returning(*ExchangeRate.__table__.columns)
+            .cte("written")
+        )
+        query_result = await self.session.execute(self._written_rate_query(written, journal))
+        return query_result.scalar_one()
+
+    async def update_exchange_rate(
+            self, base_id: int, target_id: int, rate: Decimal, journal: RateJournal | None = None,
+    ) -> ExchangeRate:
+        """Обновляет обменный курс для валютной пары одним выражением (см. create_exchange_rate)."""
+        written = (
+            update(ExchangeRate)
+            .where(ExchangeRate.base_currency_id == base_id, ExchangeRate.target_currency_id == target_id)
+            .values(rate=rate)
+            .returning(*ExchangeRate.__table__.columns)
+            .cte("written")
+        )
+        query_result = await self.session.execute(self._written_rate_query(written, journal))
+        exchange_rate = query_result.scalar_one_or_none()
+        if exchange_rate is None:
+            raise ExchangeRateNotExistsError
+        return exchange_rate
+
+    @staticmethod
+    def _written_rate_query(written: CTE, journal: RateJournal | None) -> Select[tuple[ExchangeRate]]:
+        """
+        Запрос, выполняющий запись из CTE written и возвращающий записанный курс с валютами.
+
+        CTE из journal добавляются в то же выражение: PostgreSQL выполняет data-modifying
+        CTE, даже если основной запрос их не читает.
+        """
+        BaseCurrency = aliased(Currency)  # noqa: N806
+        TargetCurrency = aliased(Currency)  # noqa: N806
+        WrittenRate = aliased(ExchangeRate, written)  # noqa: N806
+
+        query = (
+            select(WrittenRate)
+            .join(BaseCurrency, WrittenRate.base_currency_id == BaseCurrency.id)
+            .join(TargetCurrency, WrittenRate.target_currency_id == TargetCurrency.id)
             .options(
-                contains_eager(ExchangeRate.base_currency, alias=BaseCurrency),
-                contains_eager(ExchangeRate.target_currency, alias=TargetCurrency),
+                contains_eager(WrittenRate.base_currency, alias=BaseCurrency),
+                contains_eager(WrittenRate.target_currency, alias=TargetCurrency),
             )
+            .execution_options(populate_existing=True)
+        )
+        if journal is not None:
+            query = query.add_cte(*journal(written))
+        return query
+
+    async def upsert_exchange_rates(
+            self, rates: Sequence[tuple[int, int, Decimal]], journal: RateJournal | None = None,
+    ) -> UpsertedRates:
+        """
+        Вставляет или обновляет курсы пачками через INSERT ... ON CONFLICT DO UPDATE.
+
+        Пары в rates должны быть уникальны. CTE из journal получают записанные строки пачки
+        и выполняются тем же выражением. Возвращает записанные курсы с валютами (как
+        create_exchange_rate) и число вставленных среди них: у только что вставленной
+        строки системный столбец xmax равен 0.
+        """
+        upserted = UpsertedRates(rates=[], inserted=0)
+
+        for start in range(0, len(rates), UPSERT_CHUNK_SIZE):
+            chunk = rates[start:start + UPSERT_CHUNK_SIZE]
+            insert_stmt = insert(ExchangeRate).values([
+                {"base_currency_id": base_id, "target_currency_id": target_id, "rate": rate}
+                for base_id, target_id, rate in chunk
+            ])
+            written = insert_stmt.on_conflict_do_update(
+                constraint="uq_base_target_currencies",
+                set_={"rate": insert_stmt.excluded.rate},
+            ).returning(
+                *ExchangeRate.__table__.columns, literal_column("xmax = 0", Boolean).label("inserted"),
+            ).cte("written")
+            query = self._written_rate_query(written, journal).add_columns(written.c.inserted)
+
+            query_result = await self.session.execute(query)
+            for exchange_rate, is_inserted in query_result.all():
+                upserted.rates.append(exchange_rate)
+                upserted.inserted += is_inserted
+
+        return upserted
+
+    async def get_rate_by_ids(self, base_id: int, target_id: int) -> ExchangeRate | None:
+        """Получает курс пары по id валют: поиск идет по уникальному индексу пары."""
+        query = (
+            select(ExchangeRate)
+            .where(ExchangeRate.base_currency_id == base_id, ExchangeRate.target_currency_id == target_id)
+            .options(joinedload(ExchangeRate.base_currency), joinedload(ExchangeRate.target_currency))
         )
-
         query_result = await self.session.execute(query)
-        return query_result.scalars().all()
+        return query_result.scalar_one_or_none()
@@ -0,0 +1,157 @@
+from collections.abc import Sequence
+from datetime import datetime
+from enum import StrEnum
+from typing import Any
+
+from sqlalchemy import CTE, CursorResult, func, literal, select, text, union_all
+from sqlalchemy.dialects.postgresql import Insert, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.exchange_rate_history import ExchangeRateHistory
+from src.models.exchange_rate_ohlc import ExchangeRateOhlc
+
+
+class OhlcResolution(StrEnum):
+    MINUTE = "1m"
+    HOUR = "1h"
+    DAY = "1d"
+
+    @property
+    def unit(self) -> str:
+        """Единица date_trunc в PostgreSQL."""
+        return {"1m": "minute", "1h": "hour", "1d": "day"}[self.value]
+
+
+# Пересчет агрегатов одним INSERT ... SELECT на интервал: open и close - первое и последнее
+# значение интервала, high и low - экстремумы. Интервалы считаются в UTC.
+BACKFILL_QUERY = text("""
+INSERT INTO exchange_rate_ohlc AS ohlc (
+    base_currency_id, target_currency_id, resolution, bucket_start, open, high, low, close, ticks
+)
+SELECT
+    base_currency_id,
+    target_currency_id,
+    :resolution,
+    timezone('UTC', date_trunc(:unit, timezone('UTC', valid_from))) AS bucket_start,
+    (array_agg(rate ORDER BY valid_from))[1],
+    max(rate),
+    min(rate),
+    (array_agg(rate ORDER BY valid_from DESC))[1],
+    count(*)
+FROM exchange_rate_history
+WHERE valid_from >= :date_from AND valid_from < :date_to
+GROUP BY base_currency_id, target_currency_id, bucket_start
+ON CONFLICT (base_currency_id, target_currency_id, resolution, bucket_start) DO UPDATE SET
+    open = excluded.open,
+    high = excluded.high,
+    low = excluded.low,
+    close = excluded.close,
+    ticks = excluded.ticks
+""")
+
+
+OHLC_COLUMNS = [
+    "base_currency_id", "target_currency_id", "resolution", "bucket_start", "open", "high", "low", "close",
+    "ticks",
+]
+
+
+def _bucket_start(resolution: OhlcResolution) -> Any:
+    """Начало текущего интервала в UTC по времени транзакции."""
+    return func.timezone("UTC", func.date_trunc(resolution.unit, func.timezone("UTC", func.now())))
+
+
+def _merge_ticks(stmt: Insert) -> Insert:
+    """
+    ON CONFLICT для вставки тиков: курс становится close, расширяет high/low,
+    а если интервал только начался - задает и open.
+    """
+    excluded = stmt.excluded
+    return stmt.on_conflict_do_update(
+        index_elements=["base_currency_id", "target_currency_id", "resolution", "bucket_start"],
+        set_={
+            "high": func.greatest(ExchangeRateOhlc.high, excluded.high),
+            "low": func.least(ExchangeRateOhlc.low, excluded.low),
+            "close": excluded.close,
+            "ticks": ExchangeRateOhlc.ticks + excluded.ticks,
+        },
+    )
+
+
+class ExchangeRateRollupRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @staticmethod
+    def record_ticks_from(source: CTE) -> CTE:
+        """
+        Data-modifying CTE: учитывает курсы из source во всех агрегатах (см. _merge_ticks).
+
+        Используется как RateJournal, чтобы запись курса и агрегатов была одним выражением.
+        """
+        ticks = union_all(*(
+            select(
+                source.c.base_currency_id,
+                source.c.target_currency_id,
+                literal(resolution.value),
+                _bucket_start(resolution),
+                source.c.rate,
+                source.c.rate,
+                source.c.rate,
+                source.c.rate,
+                literal(1),
+            )
+            for resolution in OhlcResolution
+        ))
+        return _merge_ticks(insert(ExchangeRateOhlc).from_select(OHLC_COLUMNS, ticks)).cte("written_ohlc")
+
+    async def get_bars(
+            self,
+            base_id: int,
+            target_id: int,
+            resolution: OhlcResolution,
+            date_from: datetime | None,
+            date_to: datetime | None,
+            limit: int,
+    ) -> Sequence[ExchangeRateOhlc]:
+        """Получает агрегаты пары за период в порядке времени, не больше limit."""
+        query = select(ExchangeRateOhlc).where(
+            ExchangeRateOhlc.base_currency_id == base_id,
+            ExchangeRateOhlc.target_currency_id == target_id,
+            ExchangeRateOhlc.resolution == resolution.value,
+        )
+        if date_from is not None:
+            query = query.where(ExchangeRateOhlc.bucket_start >= date_from)
+        if date_to is not None:
+            query = query.where(ExchangeRateOhlc.bucket_start <= date_to)
+
+        query_result = await self.session.execute(
+            query.order_by(ExchangeRateOhlc.bucket_start).limit(limit),
+        )
+        return query_result.scalars().all()
+
+    async def get_history_bounds(self) -> tuple[datetime | None, datetime | None]:
+        """Получает время первой и последней записи в истории курсов."""
+        query_result = await self.session.execute(
+            select(func.min(ExchangeRateHistory.valid_from), func.max(ExchangeRateHistory.valid_from)),
+        )
+        first, last = query_result.one()
+        return first, last
+
+    async def rebuild(self, resolution: OhlcResolution, date_from: datetime, date_to: datetime) -> int:
+        """
+        Пересчитывает агрегаты resolution по истории за [date_from, date_to).
+
+        Все интервалы периода считаются одним запросом на стороне БД. Возвращает
+        число записанных агрегатов.
+        """
+        query_result: CursorResult[Any] = await self.session.execute(  # type: ignore[assignment]
+            BACKFILL_QUERY,
+            {
+                "resolution": resolution.value,
+                "unit": resolution.unit,
+                "date_from": date_from,
+                "date_to": date_to,
+            },
+        )
+        return query_result.rowcount
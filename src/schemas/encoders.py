@@ -0,0 +1,58 @@
+from decimal import Decimal
+from typing import Any
+
+import orjson
+
+from src.schemas.exchange_rate import ExchangeCurrencyResponse
+
+
+def encode_default(value: Any) -> str:
+    """Сериализует Decimal строкой, как Pydantic в режиме JSON."""
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Сериализует данные в компактный JSON без экранирования не-ASCII символов.
+
+    Массивы NumPy сериализуются как вложенные списки, NaN - как null.
+    """
+    return orjson.dumps(
+        content, default=encode_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+    )
+
+
+def encode_currency(currency: Any) -> dict[str, Any]:
+    """Повторяет CurrencyScheme для ORM-объекта или схемы валюты."""
+    return {"id": currency.id, "code": currency.code, "name": currency.name, "sign": currency.sign}
+
+
+def encode_exchange_rate(exchange_rate: Any) -> dict[str, Any]:
+    """
+    Повторяет ExchangeRateSchema (с алиасами полей) для ORM-объекта курса.
+
+    Курс хранится в Numeric(scale=6), поэтому уже имеет 6 знаков после запятой.
+    """
+    return {
+        "id": exchange_rate.id,
+        "baseCurrency": encode_currency(exchange_rate.base_currency),
+        "targetCurrency": encode_currency(exchange_rate.target_currency),
+        "rate": exchange_rate.rate,
+    }
+
+
+def encode_exchange_result(result: ExchangeCurrencyResponse) -> dict[str, Any]:
+    """
+    Повторяет ExchangeCurrencyResponse (с алиасами полей).
+
+    Сервис конвертации уже округляет курс до 6, а сумму - до 2 знаков после запятой.
+    """
+    return {
+        "baseCurrency": encode_currency(result.base_currency),
+        "targetCurrency": encode_currency(result.target_currency),
+        "rate": result.rate,
+        "amount": result.amount,
+        "convertedAmount": result.converted_amount,
+    }
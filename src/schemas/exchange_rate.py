@@ -1,6 +1,7 @@
+from datetime import datetime
 from decimal import Decimal
 
-from pydantic import BaseModel, ConfigDict, Field, model_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 
 from src.exceptions.exceptions import SameCurrencyConversionError
 from src.schemas.currency import CurrencyScheme
@@ -15,6 +16,37 @@ class ExchangeRateSchema(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class RateHistoryPoint(BaseModel):
+    rate: Decimal
+    valid_from: datetime = Field(serialization_alias="validFrom")
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ExchangeRateHistoryResponse(BaseModel):
+    base_currency: CurrencyScheme = Field(serialization_alias="baseCurrency")
+    target_currency: CurrencyScheme = Field(serialization_alias="targetCurrency")
+    history: list[RateHistoryPoint]
+
+
+class OhlcBar(BaseModel):
+    bucket_start: datetime = Field(serialization_alias="bucketStart")
+    open: Decimal
+    high: Decimal
+    low: Decimal
+    close: Decimal
+    ticks: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ExchangeRateOhlcResponse(BaseModel):
+    base_currency: CurrencyScheme = Field(serialization_alias="baseCurrency")
+    target_currency: CurrencyScheme = Field(serialization_alias="targetCurrency")
+    resolution: str
+    bars: list[OhlcBar]
+
+
 class ExchangeRateCreate(BaseModel):
     base_currency_code: str = Field(pattern="^[a-zA-Z]{3}$", alias="baseCurrencyCode")
     target_currency_code: str = Field(pattern="^[a-zA-Z]{3}$", alias="targetCurrencyCode")
@@ -40,3 +72,32 @@ class ExchangeCurrencyResponse(BaseModel):
         ge=0, max_digits=19, decimal_places=2, serialization_alias="convertedAmount",
     )
     model_config = ConfigDict(from_attributes=True)
+
+
+class ExchangeBatchItem(BaseModel):
+    base_currency: str = Field(pattern="^[a-zA-Z]{3}$", alias="from")
+    target_currency: str = Field(pattern="^[a-zA-Z]{3}$", alias="to")
+    amount: Decimal = Field(gt=0, max_digits=18, decimal_places=2)
+
+    @field_validator("base_currency", "target_currency")
+    @classmethod
+    def code_to_uppercase(cls, code: str) -> str:
+        return code.upper()
+
+
+class ExchangeBatchResult(BaseModel):
+    result: ExchangeCurrencyResponse | None = None
+    message: str | None = None
+
+
+class BulkRowError(BaseModel):
+    index: int
+    message: str
+
+
+class ExchangeRatesBulkResult(BaseModel):
+    inserted: int = 0
+    updated: int = 0
+    superseded: int = 0
+    rejected: int = 0
+    errors: list[BulkRowError] = []
@@ -0,0 +1,35 @@
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class LivenessResponse(BaseModel):
+    status: str = "ok"
+
+
+class DatabaseStatus(BaseModel):
+    ok: bool
+    latency: float | None = Field(description="Время SELECT 1, секунды")
+    error: str | None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PoolStatusSchema(BaseModel):
+    size: int
+    checked_out: int = Field(serialization_alias="checkedOut")
+    overflow: int
+    saturation: float
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class CacheStatus(BaseModel):
+    rate_snapshot: bool = Field(serialization_alias="rateSnapshot")
+    currency_registry: bool = Field(serialization_alias="currencyRegistry")
+
+
+class ReadinessResponse(BaseModel):
+    ready: bool
+    started: bool
+    database: DatabaseStatus
+    pool: PoolStatusSchema
+    caches: CacheStatus
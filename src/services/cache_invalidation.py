@@ -0,0 +1,62 @@
+import logging
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+from src.core.db.session import APPLICATION_NAME
+from src.services.currency_registry import currency_registry
+from src.services.rate_cache import rate_cache
+
+if TYPE_CHECKING:
+    from src.core.db.listener import PgListener
+
+log = logging.getLogger(__name__)
+
+# Канал, в который триггеры таблиц пишут "таблица:application_name записавшего соединения".
+CACHE_INVALIDATION_CHANNEL = "cache_invalidation"
+
+Invalidation = Callable[[], None]
+
+
+class CacheInvalidator:
+    """
+    Сбрасывает кэши процесса при изменении таблиц в любом воркере.
+
+    Триггеры на таблицах после каждого изменяющего выражения отправляют NOTIFY с именем
+    таблицы и application_name соединения, listener передает его сюда, и сбрасываются
+    кэши, зарегистрированные для этой таблицы. Уведомления о записях самого процесса
+    (application_name равен origin) пропускаются: записавший воркер уже обновил свои кэши,
+    а сброс заставил бы его перечитывать их после каждой записи. После (пере)подключения
+    listener сбрасываются все кэши: уведомления, пришедшие без соединения, потеряны.
+    """
+
+    def __init__(self, origin: str | None = None) -> None:
+        self.origin = origin
+        self._invalidations: dict[str, list[Invalidation]] = {}
+
+    def register(self, table: str, invalidation: Invalidation) -> None:
+        self._invalidations.setdefault(table, []).append(invalidation)
+
+    def handle_notification(self, payload: str) -> None:
+        table, _, origin = payload.partition(":")
+        if origin and origin == self.origin:
+            return
+        for invalidation in self._invalidations.get(table, ()):
+            invalidation()
+        log.debug("Кэши таблицы %s сброшены по уведомлению", table)
+
+    def invalidate_all(self) -> None:
+        for invalidations in self._invalidations.values():
+            for invalidation in invalidations:
+                invalidation()
+        log.info("Все кэши сброшены после подключения к каналу уведомлений")
+
+    def attach_listener(self, listener: "PgListener") -> None:
+        listener.add_handler(CACHE_INVALIDATION_CHANNEL, self.handle_notification)
+        listener.add_connect_handler(self.invalidate_all)
+
+
+cache_invalidator = CacheInvalidator(origin=APPLICATION_NAME)
+# Снимок курсов содержит и курсы, и валюты.
+cache_invalidator.register("exchange_rate", rate_cache.invalidate)
+cache_invalidator.register("currency", rate_cache.invalidate)
+cache_invalidator.register("currency", currency_registry.invalidate)
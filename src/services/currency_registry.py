@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import time
+from collections.abc import Iterable, Sequence
+from typing import TYPE_CHECKING
+
+from src.core.config import settings
+from src.core.metrics import CACHE_REQUESTS
+from src.schemas.currency import CurrencyScheme
+from src.services.single_flight import SingleFlight
+
+if TYPE_CHECKING:
+    from src.models.currency import Currency
+    from src.repositories.currency import CurrencyRepository
+    from src.services.rate_cache import CurrencyRecord
+
+log = logging.getLogger(__name__)
+
+CACHE_HITS = CACHE_REQUESTS.labels(cache="currency_registry", result="hit")
+CACHE_MISSES = CACHE_REQUESTS.labels(cache="currency_registry", result="miss")
+
+
+class CurrencyRegistry:
+    """
+    Внутрипроцессный справочник валют: код -> валюта.
+
+    Загружается целиком при старте приложения (или при первом обращении) и дополняется
+    при создании валют, поэтому перевод кодов в id не обращается к БД. Коды, которых нет
+    в справочнике, ищутся в БД одним запросом: валюту мог создать другой воркер.
+    Одновременные поиски одних и тех же кодов в одной БД выполняют один запрос: поиск
+    с основной БД (запись) не ждет результата с реплики, который может отставать.
+
+    version меняется при каждом изменении содержимого справочника, по нему кэшируется
+    тело списка валют. Полный список (get_all) перечитывается из БД, если справочник
+    старше max_staleness секунд: валюту мог создать другой воркер.
+    """
+
+    def __init__(self, max_staleness: float = float("inf")) -> None:
+        self.max_staleness = max_staleness
+        self.version = 0
+        self._loaded_at = 0.0
+        self._currencies: dict[str, CurrencyScheme] | None = None
+        self._lock = asyncio.Lock()
+        self._lookups: SingleFlight[tuple[object, tuple[str, ...]], Sequence[Currency]] = SingleFlight(
+            "currency",
+        )
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._currencies is not None
+
+    async def get_many(
+            self, repository: "CurrencyRepository", codes: Iterable[str],
+    ) -> dict[str, CurrencyScheme]:
+        """Возвращает {код: валюта} для существующих валют из codes."""
+        currencies = self._currencies
+        if currencies is None:
+            currencies = await self.reload(repository)
+
+        found = {}
+        missing = []
+        for code in set(codes):
+            currency = currencies.get(code)
+            if currency is None:
+                missing.append(code)
+            else:
+                found[code] = currency
+
+        if not missing:
+            CACHE_HITS.inc()
+        else:
+            CACHE_MISSES.inc()
+            codes_key = tuple(sorted(missing))
+            records = await self._lookups.do(
+                (repository.bind, codes_key), lambda: repository.get_currencies_by_codes(list(codes_key)),
+            )
+            for record in records:
+                found[record.code] = self.add(record)
+        return found
+
+    async def get(self, repository: "CurrencyRepository", code: str) -> CurrencyScheme | None:
+        currencies = await self.get_many(repository, [code])
+        return currencies.get(code)
+
+    async def get_all(self, repository: "CurrencyRepository") -> tuple[int, list[CurrencyScheme]]:
+        """Возвращает версию справочника и все валюты этой версии в порядке id."""
+        currencies = self._currencies
+        if currencies is None or time.monotonic() - self._loaded_at >= self.max_staleness:
+            currencies = await self.reload(repository)
+        return self.version, sorted(currencies.values(), key=lambda currency: currency.id or 0)
+
+    def add(self, currency: "CurrencyRecord") -> CurrencyScheme:
+        """Write-through: добавляет закоммиченную валюту в справочник."""
+        scheme = CurrencyScheme.model_validate(currency)
+        if self._currencies is not None and self._currencies.get(scheme.code) != scheme:
+            self._currencies[scheme.code] = scheme
+            self.version += 1
+        return scheme
+
+    def invalidate(self) -> None:
+        """Сбрасывает справочник: следующее обращение перечитает его из БД."""
+        self._currencies = None
+        self.version += 1
+
+    async def reload(self, repository: "CurrencyRepository") -> dict[str, CurrencyScheme]:
+        async with self._lock:
+            records = await repository.get_all_currencies()
+            currencies = {
+                record.code: CurrencyScheme.model_validate(record) for record in records
+            }
+            if currencies != self._currencies:
+                self.version += 1
+            self._currencies = currencies
+            self._loaded_at = time.monotonic()
+        log.info("Справочник валют загружен из БД. Валют: %s", len(records))
+        return currencies
+
+
+currency_registry = CurrencyRegistry(max_staleness=settings.rate_cache_max_staleness)
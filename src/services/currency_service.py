@@ -1,19 +1,36 @@
 import logging
-from collections.abc import Sequence
+from collections.abc import Iterable, Sequence
+from functools import partial
 
+from pydantic import TypeAdapter
 from sqlalchemy.exc import IntegrityError
 
+from src.core.config import settings
 from src.exceptions.exceptions import CurrencyExistsError, CurrencyNotExistsError
 from src.models.currency import Currency
 from src.repositories.currency import CurrencyRepository
 from src.schemas.currency import CurrencyScheme
+from src.schemas.encoders import dumps, encode_currency
+from src.services.currency_registry import CurrencyRegistry
+from src.services.pagination import Page, make_page
+from src.services.response_cache import ResponseCache, render_json
 
 log = logging.getLogger(__name__)
 
+CURRENCIES_RESPONSE_KEY = "currencies"
+CURRENCY_LIST_ADAPTER = TypeAdapter(list[CurrencyScheme])
+
 
 class CurrencyService:
-    def __init__(self, repository: CurrencyRepository):
+    def __init__(
+            self,
+            repository: CurrencyRepository,
+            response_cache: ResponseCache,
+            registry: CurrencyRegistry,
+    ):
         self.repository = repository
+        self.response_cache = response_cache
+        self.registry = registry
 
     async def create_currency(self, currency_data: CurrencyScheme) -> Currency:
         code: str = currency_data.code
@@ -26,16 +43,15 @@ class CurrencyService:
             except IntegrityError as err:
                 raise CurrencyExistsError from err
 
-            await self.repository.session.refresh(new_currency)
-
+        self.registry.add(new_currency)
         return new_currency
 
-    async def get_currency_by_code(self, code: str) -> Currency:
-        """Приводит код к верхнему регистру и получает валюту по нему."""
-        currency = await self.repository.get_currency_by_code(code.upper())
+    async def get_currency_by_code(self, code: str) -> CurrencyScheme:
+        """Приводит код к верхнему регистру и получает валюту по нему из справочника."""
+        currency = await self.registry.get(self.repository, code.upper())
         if currency:
             return currency
-        log.warning(f"Валюты: '{code}' нет в БД")
+        log.warning("Валюты: '%s' нет в БД", code)
         raise CurrencyNotExistsError
 
     async def get_codes_and_id_by_codes(self, codes: list[str]) -> dict[str, int]:
@@ -44,11 +60,41 @@ class CurrencyService:
 
         Проверяет, что все запрошенные валюты существуют.
         """
-        codes_and_id = await self.repository.get_codes_and_id_by_codes(codes)
-        if len(codes_and_id) != 2:
-            log.warning(f"Валюты: '{codes}' нет в БД")
+        codes_and_id = await self.get_ids_by_codes(codes)
+        if len(codes_and_id) != len(set(codes)):
+            log.warning("Валюты: '%s' нет в БД", codes)
             raise CurrencyNotExistsError
-        return {row.code: row.id for row in codes_and_id}
+        return codes_and_id
+
+    async def get_ids_by_codes(self, codes: Iterable[str]) -> dict[str, int]:
+        """Принимает коды валют, возвращает словарь {код: id} только для существующих валют."""
+        currencies = await self.registry.get_many(self.repository, codes)
+        return {
+            code: currency.id for code, currency in currencies.items() if currency.id is not None
+        }
 
     async def get_all_currencies(self) -> Sequence[Currency]:
         return await self.repository.get_all_currencies()
+
+    async def get_currencies_page(self, cursor: int | None, limit: int) -> Page[Currency]:
+        """Возвращает страницу валют после cursor (id последней полученной валюты)."""
+        rows = await self.repository.get_currencies_page(cursor, limit + 1)
+        return make_page(rows, limit, cursor_of=lambda row: row.id)
+
+    async def get_all_currencies_json(self) -> bytes:
+        """
+        Возвращает готовое JSON-тело списка валют.
+
+        Тело строится из справочника валют и заново, только если изменилась его версия.
+        Пока справочник свежий, обращения к БД нет.
+        """
+        version, currencies = await self.registry.get_all(self.repository)
+        return await self.response_cache.get_or_render(
+            CURRENCIES_RESPONSE_KEY, str(version), partial(self._render_currencies, currencies),
+        )
+
+    @staticmethod
+    async def _render_currencies(currencies: list[CurrencyScheme]) -> bytes:
+        if settings.fast_json_response:
+            return dumps([encode_currency(currency) for currency in currencies])
+        return render_json(CURRENCY_LIST_ADAPTER, currencies)
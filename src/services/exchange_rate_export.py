@@ -0,0 +1,73 @@
+import csv
+import io
+from collections.abc import AsyncIterator, Callable, Sequence
+from contextlib import AbstractAsyncContextManager
+from enum import StrEnum
+from typing import Any
+
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.repositories.exchange_rate_repository import ExchangeRateRepository
+from src.schemas.encoders import dumps
+
+CSV_HEADER = ("id", "baseCurrencyCode", "targetCurrencyCode", "rate")
+
+
+class ExportFormat(StrEnum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+    @property
+    def media_type(self) -> str:
+        return "application/x-ndjson" if self is ExportFormat.NDJSON else "text/csv; charset=utf-8"
+
+
+def encode_ndjson(rows: Sequence[Row[Any]]) -> bytes:
+    """Кодирует пачку строк в NDJSON: по объекту в формате ExchangeRateSchema на строку."""
+    lines = [
+        dumps({
+            "id": rate_id,
+            "baseCurrency": {"id": base_id, "code": base_code, "name": base_name, "sign": base_sign},
+            "targetCurrency": {
+                "id": target_id, "code": target_code, "name": target_name, "sign": target_sign,
+            },
+            "rate": rate,
+        })
+        for (
+            rate_id, base_id, base_code, base_name, base_sign,
+            target_id, target_code, target_name, target_sign, rate,
+        ) in rows
+    ]
+    return b"\n".join(lines) + b"\n"
+
+
+def encode_csv(rows: Sequence[Row[Any]]) -> bytes:
+    """Кодирует пачку строк в CSV с колонками CSV_HEADER (формат POST /exchangeRates/bulk)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerows((row[0], row[2], row[6], row[9]) for row in rows)
+    return buffer.getvalue().encode()
+
+
+class ExchangeRateExporter:
+    """
+    Потоковая выгрузка всей таблицы курсов в NDJSON или CSV.
+
+    Сессия открывается внутри генератора, а не берется из зависимости запроса:
+    зависимости FastAPI с yield закрываются до того, как StreamingResponse отправит тело.
+    """
+
+    def __init__(self, session_scope: Callable[[], AbstractAsyncContextManager[AsyncSession]]):
+        self.session_scope = session_scope
+
+    async def export(self, export_format: ExportFormat) -> AsyncIterator[bytes]:
+        """Отдает выгрузку кусками по мере чтения строк из БД."""
+        if export_format is ExportFormat.CSV:
+            yield (",".join(CSV_HEADER) + "\n").encode()
+
+        encode = encode_csv if export_format is ExportFormat.CSV else encode_ndjson
+        async with self.session_scope() as session:
+            repository = ExchangeRateRepository(session)
+            async for rows in repository.stream_exchange_rate_rows():
+                yield encode(rows)
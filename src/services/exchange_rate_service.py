@@ -1,25 +1,89 @@
 import logging
+import time
 from collections.abc import Sequence
+from datetime import UTC, datetime
 from decimal import ROUND_HALF_UP, Decimal
+from functools import partial
 
+from pydantic import TypeAdapter
+from sqlalchemy import CTE
 from sqlalchemy.exc import IntegrityError
 
+from src.core.config import settings
+from src.core.metrics import EXCHANGE_RESOLUTIONS, EXCHANGE_STAGE_SECONDS
 from src.exceptions.exceptions import (
     ExchangeRateExistsError,
     ExchangeRateNotExistsError,
 )
 from src.models.exchange_rate import ExchangeRate
+from src.models.exchange_rate_history import ExchangeRateHistory
+from src.models.exchange_rate_ohlc import ExchangeRateOhlc
+from src.repositories.exchange_rate_history_repository import ExchangeRateHistoryRepository
 from src.repositories.exchange_rate_repository import ExchangeRateRepository
-from src.schemas.exchange_rate import ExchangeCurrencyResponse, ExchangeRateCreate, ExchangeRateUpdate
+from src.repositories.exchange_rate_rollup_repository import (
+    ExchangeRateRollupRepository,
+    OhlcResolution,
+)
+from src.schemas.encoders import dumps, encode_exchange_rate
+from src.schemas.exchange_rate import (
+    BulkRowError,
+    ExchangeBatchItem,
+    ExchangeBatchResult,
+    ExchangeCurrencyResponse,
+    ExchangeRateCreate,
+    ExchangeRatesBulkResult,
+    ExchangeRateSchema,
+    ExchangeRateUpdate,
+)
 from src.services.currency_service import CurrencyService
+from src.services.pagination import Page, make_page
+from src.services.rate_broadcast import RateBroadcaster
+from src.services.rate_cache import RateCache, RateSnapshot
+from src.services.rate_graph import RateRoute
+from src.services.response_cache import ResponseCache, render_json
+from src.services.single_flight import SingleFlight
 
 log = logging.getLogger(__name__)
 
+SAME_CURRENCY_MESSAGE = "Нельзя конвертировать валюту в саму себя"
+EXCHANGE_RATE_NOT_FOUND_MESSAGE = "Обменного курса данных валют нет в БД"
+CURRENCY_NOT_FOUND_MESSAGE = "Валюта не найдена"
+
+EXCHANGE_RATES_RESPONSE_KEY = "exchange_rates"
+RATE_MATRIX_RESPONSE_KEY = "exchange_rates_matrix"
+
+FETCH_SECONDS = EXCHANGE_STAGE_SECONDS.labels(stage="fetch")
+RESOLVE_SECONDS = EXCHANGE_STAGE_SECONDS.labels(stage="resolve")
+QUANTIZE_SECONDS = EXCHANGE_STAGE_SECONDS.labels(stage="quantize")
+VALIDATE_SECONDS = EXCHANGE_STAGE_SECONDS.labels(stage="validate")
+RESOLUTIONS = {path: EXCHANGE_RESOLUTIONS.labels(path=path) for path in ("direct", "reverse", "cross")}
+EXCHANGE_RATE_LIST_ADAPTER = TypeAdapter(list[ExchangeRateSchema])
+
 
 class ExchangeRateService:
-    def __init__(self, repository: ExchangeRateRepository, currency_service: CurrencyService):
+    def __init__(
+            self,
+            repository: ExchangeRateRepository,
+            history_repository: ExchangeRateHistoryRepository,
+            rollup_repository: ExchangeRateRollupRepository,
+            currency_service: CurrencyService,
+            rate_cache: RateCache,
+            rate_broadcaster: RateBroadcaster,
+            response_cache: ResponseCache,
+            rate_lookups: SingleFlight[tuple[int, int], ExchangeRate | None],
+            snapshot_repository: ExchangeRateRepository | None = None,
+    ):
         self.repository = repository
+        # Снимок курсов читается с основной БД: отстающая реплика вернула бы в него
+        # курсы до последней записи. По умолчанию - тот же репозиторий.
+        self.snapshot_repository = snapshot_repository or repository
+        self.history_repository = history_repository
+        self.rollup_repository = rollup_repository
         self.currency_service = currency_service
+        self.rate_cache = rate_cache
+        self.rate_broadcaster = rate_broadcaster
+        self.response_cache = response_cache
+        self.rate_lookups = rate_lookups
 
     def parse_codes(self, code_pair: str) -> tuple[str, str]:
         base_code = code_pair[:3].upper()
@@ -36,97 +100,297 @@ class ExchangeRateService:
         target_id = currencies_data[target_currency_code]
         return base_id, target_id
 
-    async def get_all_exchange_rates(self) -> Sequence[ExchangeRate]:
-        return await self.repository.get_all_exchange_rates()
+    async def get_rates_snapshot(self) -> RateSnapshot:
+        """
+        Возвращает актуальный снимок курсов.
+
+        ETag ответа и само тело нужно брать из одного снимка, чтобы версия описывала
+        именно отданные данные.
+        """
+        return await self.rate_cache.get_snapshot(self.snapshot_repository)
+
+    async def get_rates_version(self) -> str:
+        """
+        Возвращает версию таблицы курсов для HTTP-кэширования.
+
+        Версия меняется при каждой записи курса; пока снимок свежий, обращения к БД нет.
+        """
+        return await self.rate_cache.get_version(self.snapshot_repository)
+
+    async def get_exchange_rates_page(
+            self,
+            cursor: int | None,
+            limit: int,
+            base_code: str | None = None,
+            target_code: str | None = None,
+    ) -> Page[ExchangeRate]:
+        """
+        Возвращает страницу курсов после cursor (id последнего полученного курса).
+
+        Фильтры по коду базовой и целевой валюты необязательны и применяются в SQL.
+        """
+        rows = await self.repository.get_exchange_rates_page(
+            cursor, limit + 1, base_code=base_code, target_code=target_code,
+        )
+        return make_page(rows, limit, cursor_of=lambda row: row.id)
+
+    async def get_all_exchange_rates_json(self, snapshot: RateSnapshot | None = None) -> bytes:
+        """
+        Возвращает готовое JSON-тело списка курсов.
+
+        Тело строится из снимка курсов и кэшируется под его версией, поэтому версия
+        всегда описывает отданные курсы. Снимок, по которому уже выставлен ETag,
+        можно передать, чтобы не запрашивать его повторно.
+        """
+        if snapshot is None:
+            snapshot = await self.get_rates_snapshot()
+        return await self.response_cache.get_or_render(
+            EXCHANGE_RATES_RESPONSE_KEY, snapshot.version, partial(self._render_exchange_rates, snapshot),
+        )
+
+    @staticmethod
+    async def _render_exchange_rates(snapshot: RateSnapshot) -> bytes:
+        exchange_rates = snapshot.exchange_rates()
+        if settings.fast_json_response:
+            return dumps([encode_exchange_rate(exchange_rate) for exchange_rate in exchange_rates])
+        return render_json(EXCHANGE_RATE_LIST_ADAPTER, exchange_rates)
+
+    async def get_rate_matrix_json(self, version: str | None = None) -> bytes:
+        """
+        Возвращает готовое JSON-тело матрицы эффективных курсов.
+
+        Формат: {"version": ..., "currencies": [коды], "rates": [[...], ...]}, где
+        rates[i][j] - курс currencies[i] -> currencies[j], null - маршрута между валютами нет.
+        """
+        if version is None:
+            version = await self.get_rates_version()
+        return await self.response_cache.get_or_render(
+            RATE_MATRIX_RESPONSE_KEY, version, self._render_rate_matrix,
+        )
+
+    async def _render_rate_matrix(self) -> bytes:
+        matrix = await self.rate_cache.get_matrix(self.snapshot_repository)
+        return dumps({"version": matrix.version, "currencies": matrix.codes, "rates": matrix.rates})
 
     async def get_exchange_rate_by_codes(self, base_code: str, target_code: str) -> ExchangeRate:
-        exchange_rate = await self.repository.get_rate_by_codes(base_code, target_code)
+        """
+        Получает курс пары. Коды переводятся в id по справочнику валют, без запроса к БД.
+
+        Одновременные запросы одной пары выполняют один запрос к БД через rate_lookups.
+        """
+        currency_ids = await self.currency_service.get_ids_by_codes([base_code, target_code])
+        exchange_rate = None
+        if base_code in currency_ids and target_code in currency_ids:
+            base_id, target_id = currency_ids[base_code], currency_ids[target_code]
+            exchange_rate = await self.rate_lookups.do(
+                (base_id, target_id), lambda: self.repository.get_rate_by_ids(base_id, target_id),
+            )
 
         if not exchange_rate:
-            log.warning(f"Обменного курса данных валют ({base_code}/{target_code}) нет в БД")
+            log.warning("Обменного курса данных валют (%s/%s) нет в БД", base_code, target_code)
             raise ExchangeRateNotExistsError
 
         return exchange_rate
 
-    async def _collects_possible_exchange_rates(
-            self, base_currency: str, target_currency: str,
-    ) -> list[tuple[str, str]]:
+    def get_exchange_rate_from_snapshot(
+            self, snapshot: RateSnapshot, base_code: str, target_code: str,
+    ) -> ExchangeRateSchema:
+        """Получает курс пары из снимка курсов, без запроса к БД."""
+        exchange_rate = snapshot.get_exchange_rate(base_code, target_code)
+        if exchange_rate is None:
+            log.warning("Обменного курса данных валют (%s/%s) нет в БД", base_code, target_code)
+            raise ExchangeRateNotExistsError
+        return exchange_rate
 
-        possible_exchange_rates = [
-            (base_currency, target_currency),
-            (target_currency, base_currency),
+    async def get_exchange_rate_history(
+            self,
+            base_code: str,
+            target_code: str,
+            date_from: datetime | None,
+            date_to: datetime | None,
+            limit: int,
+    ) -> tuple[ExchangeRate, Sequence[ExchangeRateHistory]]:
+        """Возвращает текущий курс пары и значения курса за период в порядке времени."""
+        exchange_rate = await self.get_exchange_rate_by_codes(base_code, target_code)
+        history = await self.history_repository.get_pair_history(
+            exchange_rate.base_currency_id,
+            exchange_rate.target_currency_id,
+            self._as_utc(date_from) if date_from else None,
+            self._as_utc(date_to) if date_to else None,
+            limit,
+        )
+        return exchange_rate, history
+
+    async def get_exchange_rate_ohlc(
+            self,
+            base_code: str,
+            target_code: str,
+            resolution: OhlcResolution,
+            date_from: datetime | None,
+            date_to: datetime | None,
+            limit: int,
+    ) -> tuple[ExchangeRate, Sequence[ExchangeRateOhlc]]:
+        """Возвращает текущий курс пары и ее OHLC-агрегаты за период в порядке времени."""
+        exchange_rate = await self.get_exchange_rate_by_codes(base_code, target_code)
+        bars = await self.rollup_repository.get_bars(
+            exchange_rate.base_currency_id,
+            exchange_rate.target_currency_id,
+            resolution,
+            self._as_utc(date_from) if date_from else None,
+            self._as_utc(date_to) if date_to else None,
+            limit,
+        )
+        return exchange_rate, bars
+
+    def _journal(self, written: CTE) -> list[CTE]:
+        """RateJournal: история и агрегаты пишутся тем же выражением, что и сам курс."""
+        return [
+            self.history_repository.add_rates_from(written),
+            self.rollup_repository.record_ticks_from(written),
         ]
 
-        if base_currency != "USD" and target_currency != "USD":
-            possible_exchange_rates.append(("USD", base_currency))
-            possible_exchange_rates.append(("USD", target_currency))
+    @staticmethod
+    def _as_utc(moment: datetime) -> datetime:
+        """Время без часового пояса считается UTC."""
+        return moment if moment.tzinfo is not None else moment.replace(tzinfo=UTC)
 
-        return possible_exchange_rates
+    @staticmethod
+    def _describe_route(snapshot: RateSnapshot, route: RateRoute) -> str:
+        if len(route.hops) > 1:
+            pivots = ", ".join(
+                snapshot.currencies[currency_id].code for currency_id in route.currency_ids[1:-1]
+            )
+            return f"кросс курс через {pivots}"
+        if route.hops[0].forward:
+            return "прямой курс"
+        return "обратный курс"
+
+    @staticmethod
+    def _route_kind(route: RateRoute) -> str:
+        if len(route.hops) > 1:
+            return "cross"
+        return "direct" if route.hops[0].forward else "reverse"
+
+    @staticmethod
+    def _find_route(snapshot: RateSnapshot, base_currency: str, target_currency: str) -> RateRoute:
+        route = snapshot.find_route(base_currency, target_currency)
+        if route is None:
+            raise ExchangeRateNotExistsError
+        return route
+
+    @staticmethod
+    def _route_rate(snapshot: RateSnapshot, route: RateRoute) -> Decimal:
+        return snapshot.route_rate(route).quantize(Decimal("0.000001"), rounding=ROUND_HALF_UP)
 
     async def exchange_currencies(
-            self, base_currency: str, target_currency: str, amount: Decimal,
+            self,
+            base_currency: str,
+            target_currency: str,
+            amount: Decimal,
+            at: datetime | None = None,
+            snapshot: RateSnapshot | None = None,
     ) -> ExchangeCurrencyResponse:
         """Конвертирует указанную сумму из базовой валюты в целевую.
 
-        Метод реализует трехуровневую стратегию поиска обменного курса:
-        1.  **Прямой курс:** Поиск прямого курса (BASE -> TARGET).
-        2.  **Обратный курс:** Если прямой курс не найден, выполняется поиск
-            обратного курса (TARGET -> BASE) и его значение инвертируется (1/rate).
-        3.  **Кросс-курс:** Если предыдущие шаги не увенчались успехом,
-            выполняется попытка конвертации через базовую валюту USD по формуле
-            (USD -> TARGET) / (USD -> BASE).
+        Сохраненные курсы рассматриваются как ориентированный граф: курс BASE -> TARGET
+        дает прямое ребро и обратное ребро со значением 1/rate. Выбирается маршрут
+        с наименьшим числом переходов (не больше settings.exchange_max_hops):
+        1.  **Прямой курс:** BASE -> TARGET.
+        2.  **Обратный курс:** TARGET -> BASE, значение инвертируется (1/rate).
+        3.  **Кросс-курс:** через одну или несколько промежуточных валют; при равной длине
+            предпочитаются валюты из settings.exchange_pivot_currencies (по умолчанию USD),
+            например (USD -> TARGET) / (USD -> BASE).
+
+        Курсы и маршруты берутся из внутрипроцессного снимка RateCache, а не из БД; снимок,
+        по которому уже выставлен ETag, можно передать в snapshot. Если передан момент
+        времени at, снимок строится по истории курсов на этот момент.
+
+        Длительность этапов публикуется в exchange_stage_seconds, тип маршрута -
+        в exchange_rate_resolutions_total.
         """
-
-        possible_exchange_rates = await self._collects_possible_exchange_rates(
-            base_currency, target_currency,
-        )
-
-        available_exchange_rates = await self.repository.get_exchange_rates(possible_exchange_rates)
-
-        rates_map = {
-            (exch_rate.base_currency.code, exch_rate.target_currency.code): exch_rate
-            for exch_rate in available_exchange_rates
-        }
-
-        straight_exchange_rate = rates_map.get((base_currency, target_currency), None)
-        reverse_exchange_rate = rates_map.get((target_currency, base_currency), None)
-        cross_rate_usd_base = rates_map.get(("USD", base_currency), None)
-        cross_rate_usd_target = rates_map.get(("USD", target_currency), None)
-
-        if straight_exchange_rate:
-            log.info(f"Найден прямой курс {base_currency}/{target_currency}")
-            rate = straight_exchange_rate.rate
-            base_currency_obj = straight_exchange_rate.base_currency
-            target_currency_obj = straight_exchange_rate.target_currency
-
-        elif reverse_exchange_rate:
-            log.info(f"Найден обратный курс {target_currency}/{base_currency}")
-            rate = 1 / reverse_exchange_rate.rate
-            base_currency_obj = reverse_exchange_rate.target_currency
-            target_currency_obj = reverse_exchange_rate.base_currency
-
-        elif cross_rate_usd_base and cross_rate_usd_target:
-            log.info("Найден кросс курс через USD")
-            rate = cross_rate_usd_target.rate / cross_rate_usd_base.rate
-            base_currency_obj = cross_rate_usd_base.target_currency
-            target_currency_obj = cross_rate_usd_target.target_currency
-
+        started = time.perf_counter()
+        if at is None:
+            if snapshot is None:
+                snapshot = await self.rate_cache.get_snapshot(self.snapshot_repository)
         else:
-            raise ExchangeRateNotExistsError
+            snapshot = RateSnapshot.from_exchange_rates(
+                await self.history_repository.get_rates_at(self._as_utc(at)),
+            )
+        fetched = time.perf_counter()
+        FETCH_SECONDS.observe(fetched - started)
 
-        rate = rate.quantize(Decimal("0.000001"), rounding=ROUND_HALF_UP)
+        route = self._find_route(snapshot, base_currency, target_currency)
+        log.info("Найден курс %s/%s: %s", base_currency, target_currency, self._describe_route(snapshot, route))
+
+        rate = self._route_rate(snapshot, route)
+        resolved = time.perf_counter()
+        RESOLVE_SECONDS.observe(resolved - fetched)
+        RESOLUTIONS[self._route_kind(route)].inc()
 
         converted_amount = (rate * amount).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+        quantized = time.perf_counter()
+        QUANTIZE_SECONDS.observe(quantized - resolved)
 
         prepared_data = {
-            "base_currency": base_currency_obj,
-            "target_currency": target_currency_obj,
+            "base_currency": snapshot.get_currency(base_currency),
+            "target_currency": snapshot.get_currency(target_currency),
             "rate": rate,
             "amount": amount,
             "converted_amount": converted_amount,
         }
 
-        return ExchangeCurrencyResponse.model_validate(prepared_data)
+        result = ExchangeCurrencyResponse.model_validate(prepared_data)
+        VALIDATE_SECONDS.observe(time.perf_counter() - quantized)
+        return result
+
+    async def exchange_currencies_batch(
+            self, items: Sequence[ExchangeBatchItem],
+    ) -> list[ExchangeBatchResult]:
+        """Конвертирует пакет сумм, сохраняя порядок элементов.
+
+        Снимок курсов запрашивается один раз на весь пакет, курс каждой уникальной пары
+        считается один раз по той же стратегии, что и в exchange_currencies. Ошибки
+        отдельных элементов не прерывают пакет и возвращаются в поле message.
+        """
+        snapshot = await self.rate_cache.get_snapshot(self.snapshot_repository)
+
+        rates: dict[tuple[str, str], Decimal | None] = {}
+        for base_currency, target_currency in {
+            (item.base_currency, item.target_currency) for item in items
+        }:
+            if base_currency == target_currency:
+                continue
+            try:
+                route = self._find_route(snapshot, base_currency, target_currency)
+            except ExchangeRateNotExistsError:
+                rates[(base_currency, target_currency)] = None
+            else:
+                rates[(base_currency, target_currency)] = self._route_rate(snapshot, route)
+
+        cent = Decimal("0.01")
+        results = []
+        for item in items:
+            if item.base_currency == item.target_currency:
+                results.append(ExchangeBatchResult(message=SAME_CURRENCY_MESSAGE))
+                continue
+
+            rate = rates[(item.base_currency, item.target_currency)]
+            if rate is None:
+                results.append(ExchangeBatchResult(message=EXCHANGE_RATE_NOT_FOUND_MESSAGE))
+                continue
+
+            # Маршрут найден, значит обе валюты есть в снимке. Значения уже провалидированы
+            # и округлены, повторная валидация не нужна.
+            results.append(ExchangeBatchResult(result=ExchangeCurrencyResponse.model_construct(
+                base_currency=snapshot.currencies[snapshot.currency_ids[item.base_currency]],
+                target_currency=snapshot.currencies[snapshot.currency_ids[item.target_currency]],
+                rate=rate,
+                amount=item.amount,
+                converted_amount=(rate * item.amount).quantize(cent, rounding=ROUND_HALF_UP),
+            )))
+
+        log.info("Пакетная конвертация выполнена. Элементов: %s, пар: %s", len(items), len(rates))
+        return results
 
     async def create_exchange_rate(self, exchange_rate: ExchangeRateCreate) -> ExchangeRate:
         base_code = exchange_rate.base_currency_code.upper()
@@ -139,12 +403,14 @@ class ExchangeRateService:
             )
             try:
                 new_exchange_rate = await self.repository.create_exchange_rate(
-                    base_id, target_id, rate,
+                    base_id, target_id, rate, journal=self._journal,
                 )
             except IntegrityError as err:
                 raise ExchangeRateExistsError from err
 
-        await self.repository.session.refresh(new_exchange_rate, ["base_currency", "target_currency"])
+        self.rate_cache.apply(new_exchange_rate)
+        self.rate_lookups.forget((base_id, target_id))
+        await self.rate_broadcaster.publish_rate(new_exchange_rate)
 
         return new_exchange_rate
 
@@ -158,4 +424,65 @@ class ExchangeRateService:
                 base_code, target_code,
             )
 
-            return await self.repository.update_exchange_rate(base_id, target_id, rate)
+            updated_exchange_rate = await self.repository.update_exchange_rate(
+                base_id, target_id, rate, journal=self._journal,
+            )
+
+        self.rate_cache.apply(updated_exchange_rate)
+        self.rate_lookups.forget((base_id, target_id))
+        await self.rate_broadcaster.publish_rate(updated_exchange_rate)
+
+        return updated_exchange_rate
+
+    async def bulk_upsert_exchange_rates(
+            self, items: Sequence[tuple[int, ExchangeRateCreate]],
+    ) -> ExchangeRatesBulkResult:
+        """Вставляет или обновляет пакет курсов одной транзакцией.
+
+        items - пары (индекс элемента в запросе, курс). Если пара встречается в пакете
+        несколько раз, применяется последний курс, предыдущие учитываются как superseded.
+        Коды всех валют пакета переводятся в id одним запросом, строки с неизвестными
+        валютами отклоняются, остальные записываются через INSERT ... ON CONFLICT DO UPDATE.
+        Записанные курсы рассылаются подписчикам, как и при записи одного курса.
+        """
+        result = ExchangeRatesBulkResult()
+        latest_rates: dict[tuple[str, str], tuple[int, Decimal]] = {}
+
+        for index, item in items:
+            pair = (item.base_currency_code.upper(), item.target_currency_code.upper())
+            if pair[0] == pair[1]:
+                result.errors.append(BulkRowError(index=index, message=SAME_CURRENCY_MESSAGE))
+                continue
+            if pair in latest_rates:
+                result.superseded += 1
+            latest_rates[pair] = (index, item.rate)
+
+        if latest_rates:
+            async with self.repository.session.begin():
+                currency_ids = await self.currency_service.get_ids_by_codes(
+                    {code for pair in latest_rates for code in pair},
+                )
+
+                rows = []
+                for (base_code, target_code), (index, rate) in latest_rates.items():
+                    if base_code not in currency_ids or target_code not in currency_ids:
+                        result.errors.append(BulkRowError(index=index, message=CURRENCY_NOT_FOUND_MESSAGE))
+                        continue
+                    rows.append((currency_ids[base_code], currency_ids[target_code], rate))
+
+                upserted = await self.repository.upsert_exchange_rates(rows, journal=self._journal)
+                result.inserted, result.updated = upserted.inserted, upserted.updated
+
+            if upserted.rates:
+                self.rate_cache.invalidate()
+                self.rate_lookups.clear()
+                await self.rate_broadcaster.publish_rates(upserted.rates)
+
+        result.errors.sort(key=lambda error: error.index)
+        result.rejected = len(result.errors)
+
+        log.info(
+            "Пакетная запись курсов: вставлено %s, обновлено %s, перезаписано в пакете %s, отклонено %s",
+            result.inserted, result.updated, result.superseded, result.rejected,
+        )
+        return result
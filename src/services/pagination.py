@@ -0,0 +1,22 @@
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class Page[T]:
+    """Страница keyset-пагинации: элементы и id, с которого начинается следующая страница."""
+
+    items: Sequence[T]
+    next_cursor: int | None
+
+
+def make_page[T](rows: Sequence[T], limit: int, cursor_of: Callable[[T], int]) -> Page[T]:
+    """
+    Собирает страницу из строк, запрошенных с limit + 1.
+
+    Лишняя строка означает, что за страницей есть еще данные; сама она не отдается,
+    а курсором следующей страницы становится ключ (cursor_of) последнего отданного элемента.
+    """
+    if len(rows) > limit:
+        return Page(items=rows[:limit], next_cursor=cursor_of(rows[limit - 1]))
+    return Page(items=rows, next_cursor=None)
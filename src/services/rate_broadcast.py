@@ -0,0 +1,145 @@
+import asyncio
+import logging
+from collections.abc import Sequence
+from typing import TYPE_CHECKING
+
+import orjson
+
+from src.core.config import settings
+from src.schemas.encoders import dumps, encode_exchange_rate
+
+if TYPE_CHECKING:
+    from src.core.db.listener import PgListener
+    from src.models.exchange_rate import ExchangeRate
+
+log = logging.getLogger(__name__)
+
+RATE_UPDATES_CHANNEL = "exchange_rate_updates"
+
+
+class RateSubscription:
+    """
+    Подписка клиента на изменения курсов.
+
+    pairs - коды пар вида USDEUR или None для всех пар. Сообщения копятся в ограниченной
+    очереди; None в очереди означает, что подписка закрыта, причина - в close_code.
+    """
+
+    def __init__(self, pairs: frozenset[str] | None, queue_size: int):
+        self.pairs = pairs
+        self.close_code: int | None = None
+        self._queue: asyncio.Queue[bytes | None] = asyncio.Queue(maxsize=queue_size)
+        self._closed = False
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def matches(self, pair: str) -> bool:
+        return self.pairs is None or pair in self.pairs
+
+    def offer(self, message: bytes) -> bool:
+        """Кладет сообщение в очередь без ожидания. False - очередь переполнена."""
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    def close(self, code: int | None = None) -> None:
+        """Закрывает подписку: недоставленные сообщения отбрасываются, get() вернет None."""
+        if self._closed:
+            return
+        self._closed = True
+        self.close_code = code
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait(None)
+
+    async def get(self) -> bytes | None:
+        return await self._queue.get()
+
+
+class RateBroadcaster:
+    """
+    Внутрипроцессная рассылка изменений курсов подписчикам.
+
+    Сообщение сериализуется один раз и раскладывается по очередям подписчиков без ожидания.
+    Подписчик, чья очередь переполнена, отключается с кодом DROPPED_CODE: медленный клиент
+    не задерживает остальных и не копит память.
+
+    Если подключен PgListener, изменение отправляется через NOTIFY и приходит в каждый
+    воркер, в том числе в отправивший, через LISTEN. Без listener или при его недоступности
+    событие доставляется только подписчикам текущего процесса.
+    """
+
+    # WebSocket 1013 Try Again Later: клиент может переподключиться.
+    DROPPED_CODE = 1013
+    # WebSocket 1001 Going Away: воркер останавливается.
+    SHUTDOWN_CODE = 1001
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscriptions: set[RateSubscription] = set()
+        self._listener: PgListener | None = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscriptions)
+
+    def subscribe(self, pairs: frozenset[str] | None) -> RateSubscription:
+        subscription = RateSubscription(pairs, self.queue_size)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: RateSubscription) -> None:
+        self._subscriptions.discard(subscription)
+        subscription.close()
+
+    def close_all(self) -> None:
+        """Закрывает все подписки с кодом SHUTDOWN_CODE: потоки SSE и WebSocket завершаются."""
+        for subscription in self._subscriptions:
+            subscription.close(self.SHUTDOWN_CODE)
+        self._subscriptions.clear()
+
+    def publish(self, pair: str, message: bytes) -> None:
+        """Раздает сообщение подписчикам пары в текущем процессе."""
+        for subscription in list(self._subscriptions):
+            if subscription.matches(pair) and not subscription.offer(message):
+                log.warning("Подписчик не успевает читать обновления курсов и отключен")
+                self._subscriptions.discard(subscription)
+                subscription.close(self.DROPPED_CODE)
+
+    async def publish_rate(self, exchange_rate: "ExchangeRate") -> None:
+        """Рассылает закоммиченный курс с загруженными валютами."""
+        await self.publish_rates([exchange_rate])
+
+    async def publish_rates(self, exchange_rates: Sequence["ExchangeRate"]) -> None:
+        """
+        Рассылает закоммиченные курсы с загруженными валютами.
+
+        Через listener все курсы уходят одним запросом: по NOTIFY на курс.
+        """
+        if not exchange_rates or (not self._subscriptions and self._listener is None):
+            return
+
+        messages = [dumps(encode_exchange_rate(exchange_rate)) for exchange_rate in exchange_rates]
+        if self._listener is not None and await self._listener.notify_many(
+                RATE_UPDATES_CHANNEL, [message.decode() for message in messages],
+        ):
+            return
+        for exchange_rate, message in zip(exchange_rates, messages, strict=True):
+            self.publish(exchange_rate.base_currency.code + exchange_rate.target_currency.code, message)
+
+    def attach_listener(self, listener: "PgListener") -> None:
+        """Включает доставку изменений во все воркеры через LISTEN/NOTIFY."""
+        self._listener = listener
+        listener.add_handler(RATE_UPDATES_CHANNEL, self._handle_notification)
+
+    def _handle_notification(self, payload: str) -> None:
+        content = orjson.loads(payload)
+        pair = content["baseCurrency"]["code"] + content["targetCurrency"]["code"]
+        self.publish(pair, payload.encode())
+
+
+rate_broadcaster = RateBroadcaster(queue_size=settings.rate_stream_queue_size)
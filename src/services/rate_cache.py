@@ -0,0 +1,298 @@
+import asyncio
+import hashlib
+import logging
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import TYPE_CHECKING, Protocol
+
+from src.core.config import settings
+from src.core.metrics import CACHE_REQUESTS
+from src.schemas.currency import CurrencyScheme
+from src.schemas.exchange_rate import ExchangeRateSchema
+from src.services.rate_graph import RateGraph, RateRoute, build_ranks
+from src.services.rate_matrix import RateMatrix
+
+if TYPE_CHECKING:
+    from src.models.exchange_rate import ExchangeRate
+    from src.repositories.exchange_rate_repository import ExchangeRateRepository
+
+log = logging.getLogger(__name__)
+
+CACHE_HITS = CACHE_REQUESTS.labels(cache="rate_snapshot", result="hit")
+CACHE_MISSES = CACHE_REQUESTS.labels(cache="rate_snapshot", result="miss")
+
+
+class CurrencyRecord(Protocol):
+    id: int
+    code: str
+    name: str
+    sign: str
+
+
+class RateRecord(Protocol):
+    """Курс с загруженными валютами: ORM-объект ExchangeRate или курс из истории."""
+
+    id: int
+    base_currency_id: int
+    target_currency_id: int
+    rate: Decimal
+
+    @property
+    def base_currency(self) -> CurrencyRecord: ...
+
+    @property
+    def target_currency(self) -> CurrencyRecord: ...
+
+
+@dataclass(frozen=True, slots=True)
+class RateSnapshot:
+    """
+    Неизменяемый снимок таблицы обменных курсов.
+
+    Хранит соответствие код -> id валюты, сами валюты, список смежности курсов
+    {base_id: {target_id: rate}}, id курсов в той же структуре и граф маршрутов
+    конвертации. Изменения создают новый снимок (copy-on-write), поэтому конкурентные
+    читатели никогда не видят частично обновленные данные.
+
+    version - хэш содержимого таблицы курсов: XOR хэшей всех пар с их курсами (digest).
+    Он одинаков во всех воркерах с одинаковыми данными и меняется при любом изменении
+    курса, поэтому годится для ETag. При записи курса он пересчитывается только по
+    измененным парам.
+    """
+
+    currency_ids: dict[str, int]
+    currencies: dict[int, CurrencyScheme]
+    adjacency: dict[int, dict[int, Decimal]]
+    rate_ids: dict[int, dict[int, int]]
+    graph: RateGraph
+    digest: int
+
+    @classmethod
+    def empty(cls) -> "RateSnapshot":
+        return cls(
+            currency_ids={}, currencies={}, adjacency={}, rate_ids={}, graph=_build_graph({}, {}), digest=0,
+        )
+
+    @property
+    def version(self) -> str:
+        return f"{self.digest:016x}"
+
+    @classmethod
+    def from_exchange_rates(cls, exchange_rates: Iterable[RateRecord]) -> "RateSnapshot":
+        """Строит снимок из курсов с загруженными base_currency и target_currency."""
+        return cls.empty().with_rates(exchange_rates)
+
+    def with_rates(self, exchange_rates: Iterable[RateRecord]) -> "RateSnapshot":
+        """
+        Возвращает новый снимок, в который добавлены или обновлены переданные курсы.
+
+        Копируются только строки смежности измененных базовых валют, остальные
+        разделяются с текущим снимком, поэтому запись одного курса не зависит
+        от размера таблицы.
+        """
+        currency_ids = self.currency_ids
+        currencies = self.currencies
+        adjacency = dict(self.adjacency)
+        rate_ids = dict(self.rate_ids)
+        copied_rows: set[int] = set()
+        digest = self.digest
+        pairs_changed = False
+
+        for exchange_rate in exchange_rates:
+            for currency in (exchange_rate.base_currency, exchange_rate.target_currency):
+                if currency.id not in currencies:
+                    if currencies is self.currencies:
+                        currency_ids, currencies = dict(currency_ids), dict(currencies)
+                    currencies[currency.id] = CurrencyScheme.model_validate(currency)
+                    currency_ids[currency.code] = currency.id
+
+            base_id, target_id = exchange_rate.base_currency_id, exchange_rate.target_currency_id
+            if base_id not in copied_rows:
+                adjacency[base_id] = dict(adjacency.get(base_id, {}))
+                rate_ids[base_id] = dict(rate_ids.get(base_id, {}))
+                copied_rows.add(base_id)
+            targets = adjacency[base_id]
+
+            previous = targets.get(target_id)
+            if previous is not None:
+                digest ^= _pair_digest(base_id, target_id, previous)
+            digest ^= _pair_digest(base_id, target_id, exchange_rate.rate)
+            targets[target_id] = exchange_rate.rate
+            rate_ids[base_id][target_id] = exchange_rate.id
+
+            pairs_changed = pairs_changed or (base_id, target_id) not in self.graph.pairs
+
+        # Пересчет путей нужен только при изменении набора пар, а не значений курсов.
+        graph = _build_graph(currency_ids, adjacency) if pairs_changed else self.graph
+
+        return RateSnapshot(
+            currency_ids=currency_ids, currencies=currencies, adjacency=adjacency, rate_ids=rate_ids,
+            graph=graph, digest=digest,
+        )
+
+    def get_currency(self, code: str) -> CurrencyScheme | None:
+        currency_id = self.currency_ids.get(code)
+        if currency_id is None:
+            return None
+        return self.currencies[currency_id]
+
+    def get_rate(self, base_code: str, target_code: str) -> Decimal | None:
+        """Возвращает сохраненный курс BASE -> TARGET или None, если его нет."""
+        base_id = self.currency_ids.get(base_code)
+        target_id = self.currency_ids.get(target_code)
+        if base_id is None or target_id is None:
+            return None
+        return self.adjacency.get(base_id, {}).get(target_id)
+
+    def get_exchange_rate(self, base_code: str, target_code: str) -> ExchangeRateSchema | None:
+        """Возвращает сохраненный курс BASE -> TARGET с валютами или None, если его нет."""
+        base_id = self.currency_ids.get(base_code)
+        target_id = self.currency_ids.get(target_code)
+        if base_id is None or target_id is None or target_id not in self.adjacency.get(base_id, {}):
+            return None
+        return self._exchange_rate(base_id, target_id)
+
+    def exchange_rates(self) -> list[ExchangeRateSchema]:
+        """Возвращает все сохраненные курсы с валютами в порядке id."""
+        exchange_rates = [
+            self._exchange_rate(base_id, target_id)
+            for base_id, targets in self.adjacency.items()
+            for target_id in targets
+        ]
+        exchange_rates.sort(key=lambda exchange_rate: exchange_rate.id)
+        return exchange_rates
+
+    def find_route(self, base_code: str, target_code: str) -> RateRoute | None:
+        """Возвращает предпочтительный маршрут конвертации BASE -> TARGET или None."""
+        base_id = self.currency_ids.get(base_code)
+        target_id = self.currency_ids.get(target_code)
+        if base_id is None or target_id is None:
+            return None
+        return self.graph.find_route(base_id, target_id)
+
+    def route_rate(self, route: RateRoute) -> Decimal:
+        """
+        Считает итоговый курс маршрута.
+
+        Прямые курсы перемножаются в числителе, обратные - в знаменателе, деление
+        выполняется один раз, чтобы не накапливать ошибку округления промежуточных 1/rate.
+        """
+        numerator = Decimal(1)
+        denominator = Decimal(1)
+        for hop in route.hops:
+            if hop.forward:
+                numerator *= self.adjacency[hop.source_id][hop.target_id]
+            else:
+                denominator *= self.adjacency[hop.target_id][hop.source_id]
+        return numerator / denominator
+
+    def _exchange_rate(self, base_id: int, target_id: int) -> ExchangeRateSchema:
+        # Значения взяты из БД и уже прошли валидацию при загрузке или записи.
+        return ExchangeRateSchema.model_construct(
+            id=self.rate_ids[base_id][target_id],
+            base_currency=self.currencies[base_id],
+            target_currency=self.currencies[target_id],
+            rate=self.adjacency[base_id][target_id],
+        )
+
+
+def _pair_digest(base_id: int, target_id: int, rate: Decimal) -> int:
+    """Хэш пары с курсом; версия снимка - XOR таких хэшей, от порядка пар не зависит."""
+    digest = hashlib.blake2b(f"{base_id}:{target_id}:{rate.normalize()}".encode(), digest_size=8)
+    return int.from_bytes(digest.digest())
+
+
+def _build_graph(
+        currency_ids: dict[str, int], adjacency: dict[int, dict[int, Decimal]],
+) -> RateGraph:
+    return RateGraph(
+        pairs=(
+            (base_id, target_id) for base_id, targets in adjacency.items() for target_id in targets
+        ),
+        ranks=build_ranks(currency_ids, settings.exchange_pivot_currencies),
+        max_hops=settings.exchange_max_hops,
+    )
+
+
+class RateCache:
+    """
+    Внутрипроцессный кэш обменных курсов.
+
+    Снимок загружается целиком одним запросом и отдается из памяти, пока не превышен
+    max_staleness (в секундах). Запись курсов обновляет снимок на месте через apply(),
+    invalidate() помечает снимок устаревшим, reload() перечитывает его принудительно.
+    """
+
+    def __init__(self, max_staleness: float):
+        self.max_staleness = max_staleness
+        self._snapshot: RateSnapshot | None = None
+        self._matrix: RateMatrix | None = None
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._snapshot is not None
+
+    @property
+    def is_fresh(self) -> bool:
+        return (
+            self._snapshot is not None
+            and time.monotonic() - self._loaded_at < self.max_staleness
+        )
+
+    async def get_snapshot(self, repository: "ExchangeRateRepository") -> RateSnapshot:
+        """Возвращает актуальный снимок, при необходимости перечитывая его из БД."""
+        if self.is_fresh and self._snapshot is not None:
+            CACHE_HITS.inc()
+            return self._snapshot
+
+        CACHE_MISSES.inc()
+        async with self._lock:
+            # Пока ждали блокировку, снимок мог загрузить другой запрос.
+            if self.is_fresh and self._snapshot is not None:
+                return self._snapshot
+            return await self._load(repository)
+
+    async def get_version(self, repository: "ExchangeRateRepository") -> str:
+        """Возвращает версию актуального снимка курсов."""
+        snapshot = await self.get_snapshot(repository)
+        return snapshot.version
+
+    async def get_matrix(self, repository: "ExchangeRateRepository") -> RateMatrix:
+        """Возвращает матрицу курсов актуального снимка, перестраивая ее при изменении курсов."""
+        snapshot = await self.get_snapshot(repository)
+        matrix = self._matrix
+        if matrix is None or matrix.version != snapshot.version:
+            matrix = RateMatrix.build(snapshot, previous=matrix)
+            self._matrix = matrix
+        return matrix
+
+    async def reload(self, repository: "ExchangeRateRepository") -> RateSnapshot:
+        """Принудительно перечитывает снимок из БД."""
+        async with self._lock:
+            return await self._load(repository)
+
+    def invalidate(self) -> None:
+        """Помечает снимок устаревшим: следующий запрос перечитает его из БД."""
+        self._loaded_at = 0.0
+
+    def apply(self, exchange_rate: "ExchangeRate") -> None:
+        """Write-through: применяет закоммиченный курс к текущему снимку."""
+        if self._snapshot is None:
+            return
+        # Маршруты нового графа строятся лениво при первом поиске из каждой валюты,
+        # а не все сразу в обработчике записи.
+        self._snapshot = self._snapshot.with_rates([exchange_rate])
+
+    async def _load(self, repository: "ExchangeRateRepository") -> RateSnapshot:
+        exchange_rates = await repository.get_all_exchange_rates()
+        self._snapshot = RateSnapshot.from_exchange_rates(exchange_rates)
+        self._loaded_at = time.monotonic()
+        log.info("Снимок обменных курсов загружен из БД. Курсов: %s", len(exchange_rates))
+        return self._snapshot
+
+
+rate_cache = RateCache(max_staleness=settings.rate_cache_max_staleness)
@@ -0,0 +1,101 @@
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class RateHop:
+    """Одно ребро маршрута: переход source -> target по прямому или обратному курсу."""
+
+    source_id: int
+    target_id: int
+    forward: bool
+
+
+@dataclass(frozen=True, slots=True)
+class RateRoute:
+    """Маршрут конвертации между двумя валютами."""
+
+    hops: tuple[RateHop, ...]
+
+    @property
+    def currency_ids(self) -> tuple[int, ...]:
+        return (self.hops[0].source_id, *(hop.target_id for hop in self.hops))
+
+
+class RateGraph:
+    """
+    Ориентированный граф обменных курсов.
+
+    Каждый сохраненный курс BASE -> TARGET дает прямое ребро BASE -> TARGET и обратное
+    TARGET -> BASE. Маршрут ищется поиском в ширину не длиннее max_hops ребер: выигрывает
+    путь с наименьшим числом переходов, при равной длине - путь через более приоритетную
+    промежуточную валюту (порядок pivot_ids), прямое ребро предпочитается обратному.
+
+    Граф хранит только топологию: значения курсов подставляются при расчете маршрута,
+    поэтому обновление курса существующей пары не требует пересчета путей.
+    """
+
+    def __init__(
+            self,
+            pairs: Iterable[tuple[int, int]],
+            ranks: Mapping[int, tuple[int, str]],
+            max_hops: int,
+    ):
+        self.max_hops = max_hops
+        self.pairs = frozenset(pairs)
+
+        edges: dict[int, dict[int, bool]] = {}
+        for base_id, target_id in self.pairs:
+            edges.setdefault(base_id, {})[target_id] = True
+            edges.setdefault(target_id, {}).setdefault(base_id, False)
+
+        self._edges: dict[int, list[tuple[int, bool]]] = {
+            node: sorted(neighbours.items(), key=lambda item: ranks[item[0]])
+            for node, neighbours in edges.items()
+        }
+        self._routes: dict[int, dict[int, RateRoute]] = {}
+
+    def find_route(self, source_id: int, target_id: int) -> RateRoute | None:
+        if source_id == target_id:
+            return None
+        return self.routes_from(source_id).get(target_id)
+
+    def routes_from(self, source_id: int) -> dict[int, RateRoute]:
+        """Возвращает предпочтительные маршруты из source_id во все достижимые валюты."""
+        routes = self._routes.get(source_id)
+        if routes is not None:
+            return routes
+
+        routes = {}
+        visited = {source_id}
+        # Узлы фронтира упорядочены по приоритету пути, поэтому первый нашедший
+        # вершину родитель и задает предпочтительный маршрут.
+        frontier: list[tuple[int, tuple[RateHop, ...]]] = [(source_id, ())]
+
+        for _ in range(self.max_hops):
+            next_frontier = []
+            for node, hops in frontier:
+                for neighbour, forward in self._edges.get(node, ()):
+                    if neighbour in visited:
+                        continue
+                    visited.add(neighbour)
+                    route_hops = (*hops, RateHop(node, neighbour, forward))
+                    routes[neighbour] = RateRoute(route_hops)
+                    next_frontier.append((neighbour, route_hops))
+            if not next_frontier:
+                break
+            frontier = next_frontier
+
+        self._routes[source_id] = routes
+        return routes
+
+
+def build_ranks(
+        currency_ids: Mapping[str, int], pivot_codes: Sequence[str],
+) -> dict[int, tuple[int, str]]:
+    """Ранжирует валюты: сначала pivot-валюты в заданном порядке, затем остальные по коду."""
+    pivot_order = {code: index for index, code in enumerate(pivot_codes)}
+    return {
+        currency_id: (pivot_order.get(code, len(pivot_order)), code)
+        for code, currency_id in currency_ids.items()
+    }
@@ -0,0 +1,123 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+import numpy.typing as npt
+
+if TYPE_CHECKING:
+    from src.services.rate_cache import RateSnapshot
+    from src.services.rate_graph import RateGraph
+
+FloatMatrix = npt.NDArray[np.float64]
+IndexArray = npt.NDArray[np.intp]
+
+
+@dataclass(frozen=True, slots=True)
+class RouteLevel:
+    """
+    Пары матрицы, маршрут которых имеет одинаковую длину.
+
+    Курс пары (rows[k], cols[k]) равен курсу пары (rows[k], parents[k]) с маршрутом
+    на один переход короче, умноженному на курс перехода parents[k] -> cols[k].
+    """
+
+    rows: IndexArray
+    cols: IndexArray
+    parents: IndexArray
+
+
+@dataclass(frozen=True, slots=True)
+class MatrixTopology:
+    """Структура матрицы курсов, зависящая только от набора пар, а не от значений курсов."""
+
+    graph: "RateGraph"
+    codes: tuple[str, ...]
+    positions: dict[int, int]
+    levels: tuple[RouteLevel, ...]
+
+    @classmethod
+    def build(cls, snapshot: "RateSnapshot") -> "MatrixTopology":
+        codes = tuple(sorted(snapshot.currency_ids))
+        positions = {snapshot.currency_ids[code]: position for position, code in enumerate(codes)}
+
+        levels: list[tuple[list[int], list[int], list[int]]] = []
+        for source_id, row in positions.items():
+            for target_id, route in snapshot.graph.routes_from(source_id).items():
+                depth = len(route.hops) - 1
+                while len(levels) <= depth:
+                    levels.append(([], [], []))
+                rows, cols, parents = levels[depth]
+                rows.append(row)
+                cols.append(positions[target_id])
+                parents.append(positions[route.hops[-1].source_id])
+
+        return cls(
+            graph=snapshot.graph,
+            codes=codes,
+            positions=positions,
+            levels=tuple(
+                RouteLevel(
+                    rows=np.asarray(rows, dtype=np.intp),
+                    cols=np.asarray(cols, dtype=np.intp),
+                    parents=np.asarray(parents, dtype=np.intp),
+                )
+                for rows, cols, parents in levels
+            ),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class RateMatrix:
+    """
+    Плотная матрица N x N эффективных курсов: rates[i, j] - курс codes[i] -> codes[j].
+
+    Курсы считаются по тем же маршрутам, что и конвертация (RateGraph): прямой, обратный
+    или кросс-курс через pivot-валюты. Пары без маршрута - NaN, диагональ - 1. Значения
+    во float64 и предназначены для массовых расчетов; конвертация сумм выполняется в Decimal.
+    """
+
+    version: str
+    topology: MatrixTopology
+    rates: FloatMatrix
+
+    @property
+    def codes(self) -> tuple[str, ...]:
+        return self.topology.codes
+
+    @classmethod
+    def build(cls, snapshot: "RateSnapshot", previous: "RateMatrix | None" = None) -> "RateMatrix":
+        """
+        Строит матрицу по снимку курсов.
+
+        Если набор пар не менялся (у снимка тот же граф, что у previous), структура
+        переиспользуется и пересчитываются только значения: векторно, одной операцией
+        на каждую длину маршрута.
+        """
+        if previous is not None and previous.topology.graph is snapshot.graph:
+            topology = previous.topology
+        else:
+            topology = MatrixTopology.build(snapshot)
+
+        size = len(topology.codes)
+        positions = topology.positions
+        bases, targets, values = [], [], []
+        for base_id, rates in snapshot.adjacency.items():
+            for target_id, rate in rates.items():
+                bases.append(positions[base_id])
+                targets.append(positions[target_id])
+                values.append(float(rate))
+
+        # Курс одного перехода: прямой курс пары, а если его нет - обратный.
+        hops = np.full((size, size), np.nan)
+        value_array = np.asarray(values, dtype=np.float64)
+        hops[targets, bases] = 1 / value_array
+        hops[bases, targets] = value_array
+
+        rates_matrix = np.full((size, size), np.nan)
+        np.fill_diagonal(rates_matrix, 1.0)
+        for level in topology.levels:
+            rates_matrix[level.rows, level.cols] = (
+                rates_matrix[level.rows, level.parents] * hops[level.parents, level.cols]
+            )
+
+        return cls(version=snapshot.version, topology=topology, rates=rates_matrix)
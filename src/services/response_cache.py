@@ -0,0 +1,61 @@
+import asyncio
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from pydantic import TypeAdapter
+
+from src.core.metrics import CACHE_REQUESTS
+
+CACHE_HITS = CACHE_REQUESTS.labels(cache="response", result="hit")
+CACHE_MISSES = CACHE_REQUESTS.labels(cache="response", result="miss")
+
+
+def render_json(adapter: TypeAdapter[Any], objects: Any) -> bytes:
+    """
+    Сериализует объекты в JSON так же, как FastAPI сериализует response_model.
+
+    Объекты проходят валидацию схемы (from_attributes) и выгружаются с алиасами полей,
+    поэтому тело побайтно совпадает с ответом обычного эндпоинта.
+    """
+    return adapter.dump_json(adapter.validate_python(objects, from_attributes=True), by_alias=True)
+
+
+class ResponseCache:
+    """
+    Кэш готовых JSON-тел ответов.
+
+    Тело хранится вместе с версией данных, по которой оно построено, и пересобирается
+    только при смене версии. Одновременные промахи по одному ключу рендерят тело один раз.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[str, tuple[str, bytes]] = {}
+        self._locks: defaultdict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+    async def get_or_render(
+            self, key: str, version: str, render: Callable[[], Awaitable[bytes]],
+    ) -> bytes:
+        """Возвращает тело для версии version, при промахе строит его через render()."""
+        body = self._get(key, version)
+        if body is not None:
+            CACHE_HITS.inc()
+            return body
+
+        CACHE_MISSES.inc()
+        async with self._locks[key]:
+            # Пока ждали блокировку, тело этой версии мог построить другой запрос.
+            body = self._get(key, version)
+            if body is None:
+                body = await render()
+                self._entries[key] = (version, body)
+            return body
+
+    def _get(self, key: str, version: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            return None
+        return entry[1]
+
+
+response_cache = ResponseCache()
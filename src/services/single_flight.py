@@ -0,0 +1,67 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import TYPE_CHECKING
+
+from src.core.metrics import SINGLE_FLIGHT_CALLS
+
+if TYPE_CHECKING:
+    from src.models.exchange_rate import ExchangeRate
+
+
+class SingleFlight[K: Hashable, V]:
+    """
+    Объединяет одновременные одинаковые запросы в один.
+
+    Первый вызов с ключом (лидер) выполняет запрос сам, в своей задаче и со своей сессией.
+    Вызовы с тем же ключом, пришедшие до его завершения, ждут и получают тот же результат
+    или то же исключение. Если лидер отменен, запрос не считается выполненным: ожидающие
+    повторяют его, и лидером становится один из них. Отмена ожидающего на лидера не влияет.
+
+    Объединяются только запросы, которые уже выполняются, поэтому результат не старше
+    обычного ответа на одновременный запрос. После записи ключ сбрасывается через forget().
+    """
+
+    def __init__(self, operation: str):
+        self._flights: dict[K, asyncio.Future[V]] = {}
+        self._leaders = SINGLE_FLIGHT_CALLS.labels(operation=operation, role="leader")
+        self._coalesced = SINGLE_FLIGHT_CALLS.labels(operation=operation, role="coalesced")
+
+    async def do(self, key: K, call: Callable[[], Awaitable[V]]) -> V:
+        """Возвращает результат call() для ключа, присоединяясь к уже выполняемому запросу."""
+        while (flight := self._flights.get(key)) is not None:
+            self._coalesced.inc()
+            # wait(), а не await flight: отмена ожидающего не должна отменять общий результат.
+            await asyncio.wait([flight])
+            if not flight.cancelled():
+                return flight.result()
+
+        self._leaders.inc()
+        flight = asyncio.get_running_loop().create_future()
+        self._flights[key] = flight
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except BaseException as error:
+            flight.set_exception(error)
+            # Ожидающих может не быть: помечаем исключение полученным, чтобы asyncio
+            # не писал в лог "exception was never retrieved".
+            flight.exception()
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    def forget(self, key: K) -> None:
+        """Следующий вызов с ключом выполнит новый запрос, не дожидаясь текущего."""
+        self._flights.pop(key, None)
+
+    def clear(self) -> None:
+        self._flights.clear()
+
+
+rate_lookups: SingleFlight[tuple[int, int], "ExchangeRate | None"] = SingleFlight("exchange_rate")
@@ -1,5 +1,8 @@
 import logging
-from collections.abc import AsyncGenerator, Generator
+from collections.abc import AsyncGenerator, Callable, Generator, Iterator
+from contextlib import AbstractContextManager, contextmanager
+from decimal import Decimal
+from types import SimpleNamespace
 from unittest.mock import AsyncMock
 
 import pytest
@@ -7,18 +10,78 @@ import pytest_asyncio
 import yaml
 from httpx import ASGITransport, AsyncClient
 from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
 from src.core.config import LOGGING_CONFIG_PATH
-from src.core.dependencies import get_currency_service
+from src.core.db.base import Base
+from src.core.db.profiling import QueryProfile, attach_profiler, profile_queries
+from src.core.db.session import get_read_session, get_session
+from src.core.dependencies import (
+    get_currency_service,
+    get_exchange_rate_service,
+    get_read_currency_service,
+    get_read_exchange_rate_service,
+)
+from src.core.log import start_queue_listeners
 from src.main import app
+from src.models.currency import Currency
+from src.models.exchange_rate import ExchangeRate
+from src.repositories.currency import CurrencyRepository
+from src.repositories.exchange_rate_history_repository import ExchangeRateHistoryRepository
+from src.repositories.exchange_rate_repository import ExchangeRateRepository
+from src.repositories.exchange_rate_rollup_repository import ExchangeRateRollupRepository
 from src.schemas.currency import CurrencyScheme
-from src.services.currency_service import CurrencyService
+from src.services.currency_registry import CurrencyRegistry, currency_registry
+from src.services.currency_service import CURRENCY_LIST_ADAPTER, CurrencyService
+from src.services.exchange_rate_service import ExchangeRateService
+from src.services.rate_broadcast import RateBroadcaster
+from src.services.rate_cache import RateCache, rate_cache
+from src.services.response_cache import ResponseCache, render_json
+from src.services.single_flight import SingleFlight
 
 CURRENCIES = [
     CurrencyScheme(id=1, code="USD", name="USDUSDUSD", sign="$"),
     CurrencyScheme(id=2, code="EUR", name="EUROPIAN", sign="eu"),
 ]
 
+USD = SimpleNamespace(id=1, code="USD", name="US Dollar", sign="$")
+EUR = SimpleNamespace(id=2, code="EUR", name="Euro", sign="€")
+RUB = SimpleNamespace(id=3, code="RUB", name="Russian Ruble", sign="₽")
+GBP = SimpleNamespace(id=4, code="GBP", name="Pound Sterling", sign="£")
+
+
+def make_rate(rate_id: int, base: SimpleNamespace, target: SimpleNamespace, rate: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=rate_id,
+        base_currency_id=base.id,
+        target_currency_id=target.id,
+        base_currency=base,
+        target_currency=target,
+        rate=Decimal(rate),
+    )
+
+
+RATES = [
+    make_rate(1, USD, EUR, "0.900000"),
+    make_rate(2, USD, RUB, "90.000000"),
+    make_rate(3, GBP, USD, "1.250000"),
+]
+
+
+def make_service(rates: list[SimpleNamespace], max_staleness: float = 60.0) -> ExchangeRateService:
+    repository = AsyncMock()
+    repository.get_all_exchange_rates.return_value = rates
+    return ExchangeRateService(
+        repository=repository,
+        history_repository=AsyncMock(),
+        rollup_repository=AsyncMock(),
+        currency_service=AsyncMock(),
+        rate_cache=RateCache(max_staleness=max_staleness),
+        rate_broadcaster=RateBroadcaster(queue_size=10),
+        response_cache=ResponseCache(),
+        rate_lookups=SingleFlight("exchange_rate"),
+    )
+
 
 def setup_project_logging() -> None:
     """
@@ -31,6 +94,7 @@ def setup_project_logging() -> None:
         with config_path.open() as conf_file:
             logging_config = yaml.safe_load(conf_file)
         logging.config.dictConfig(logging_config)
+        start_queue_listeners()
         print("\nКастомная конфигурация логгирования применена.")
     else:
         print(f"\nВнимание: Файл конфигурации логгирования не найден: {config_path}")
@@ -48,6 +112,106 @@ async def ac() -> AsyncGenerator[AsyncClient]:
         yield client
 
 
+@pytest_asyncio.fixture
+async def sqlite_engine() -> AsyncGenerator[AsyncEngine]:
+    """Фикстура: SQLite в памяти с валютами USD, EUR, RUB, GBP и шестью курсами."""
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    async with async_sessionmaker(engine)() as session:
+        session.add_all([
+            Currency(id=currency_id, code=code, name=code, sign=code)
+            for currency_id, code in enumerate(["USD", "EUR", "RUB", "GBP"], start=1)
+        ])
+        pairs = [(1, 2), (1, 3), (4, 1), (2, 3), (4, 3), (2, 4)]
+        session.add_all([
+            ExchangeRate(
+                id=rate_id, base_currency_id=base, target_currency_id=target, rate=Decimal(rate_id),
+            )
+            for rate_id, (base, target) in enumerate(pairs, start=1)
+        ])
+        await session.commit()
+
+    yield engine
+
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def db_session(sqlite_engine: AsyncEngine) -> AsyncGenerator[AsyncSession]:
+    """Фикстура: сессия к заполненной SQLite-базе sqlite_engine."""
+    async with async_sessionmaker(sqlite_engine, expire_on_commit=False)() as session:
+        yield session
+
+
+@pytest.fixture
+def db_exchange_rate_service(db_session: AsyncSession) -> ExchangeRateService:
+    """Фикстура: ExchangeRateService с настоящими репозиториями над db_session и своими кэшами."""
+    currency_service = CurrencyService(
+        CurrencyRepository(db_session), response_cache=ResponseCache(), registry=CurrencyRegistry(),
+    )
+    return ExchangeRateService(
+        repository=ExchangeRateRepository(db_session),
+        history_repository=ExchangeRateHistoryRepository(db_session),
+        rollup_repository=ExchangeRateRollupRepository(db_session),
+        currency_service=currency_service,
+        rate_cache=RateCache(max_staleness=60),
+        rate_broadcaster=RateBroadcaster(queue_size=10),
+        response_cache=ResponseCache(),
+        rate_lookups=SingleFlight("exchange_rate"),
+    )
+
+
+@pytest_asyncio.fixture
+async def sqlite_app(sqlite_engine: AsyncEngine) -> AsyncGenerator[AsyncEngine]:
+    """
+    Фикстура: приложение с настоящими сервисами и репозиториями поверх sqlite_engine.
+
+    Кэши процесса сбрасываются до и после теста, чтобы данные SQLite не попали в другие тесты.
+    """
+    sessions = async_sessionmaker(sqlite_engine, expire_on_commit=False)
+
+    async def get_sqlite_session() -> AsyncGenerator[AsyncSession]:
+        async with sessions() as session:
+            yield session
+
+    app.dependency_overrides[get_session] = get_sqlite_session
+    app.dependency_overrides[get_read_session] = get_sqlite_session
+    rate_cache.invalidate()
+    currency_registry.invalidate()
+
+    yield sqlite_engine
+
+    del app.dependency_overrides[get_session]
+    del app.dependency_overrides[get_read_session]
+    rate_cache.invalidate()
+    currency_registry.invalidate()
+
+
+@pytest.fixture
+def max_queries(sqlite_engine: AsyncEngine) -> Callable[[int], AbstractContextManager[QueryProfile]]:
+    """
+    Фикстура: проверка числа SQL-выражений к sqlite_engine внутри блока.
+
+        with max_queries(2):
+            await ac.get("/exchangeRate/USDEUR")
+
+    При превышении тест падает со списком выполненных выражений.
+    """
+    attach_profiler(sqlite_engine)
+
+    @contextmanager
+    def check(limit: int) -> Iterator[QueryProfile]:
+        with profile_queries() as profile:
+            yield profile
+        assert profile.count <= limit, (
+            f"Выполнено {profile.count} SQL-выражений, допустимо {limit}:\n{profile.describe()}"
+        )
+
+    return check
+
+
 @pytest.fixture
 def mock_currency_service_db_error() -> Generator[AsyncMock]:
     """
@@ -57,13 +221,15 @@ def mock_currency_service_db_error() -> Generator[AsyncMock]:
     """
     mock_service = AsyncMock(spec=CurrencyService)
     exc = OperationalError("DB connection failed", params=None, orig=BaseException())
-    mock_service.get_all_currencies.side_effect = exc
+    mock_service.get_all_currencies_json.side_effect = exc
 
     app.dependency_overrides[get_currency_service] = lambda: mock_service
+    app.dependency_overrides[get_read_currency_service] = lambda: mock_service
 
     yield mock_service
 
     del app.dependency_overrides[get_currency_service]
+    del app.dependency_overrides[get_read_currency_service]
 
 
 @pytest.fixture
@@ -74,10 +240,51 @@ def mock_currency_service() -> Generator[AsyncMock]:
     Автоматически очищает dependency_overrides после завершения теста.
     """
     mock_service = AsyncMock(spec=CurrencyService)
-    mock_service.get_all_currencies.return_value = CURRENCIES
+    mock_service.get_all_currencies_json.return_value = render_json(CURRENCY_LIST_ADAPTER, CURRENCIES)
 
     app.dependency_overrides[get_currency_service] = lambda: mock_service
+    app.dependency_overrides[get_read_currency_service] = lambda: mock_service
 
     yield mock_service
 
     del app.dependency_overrides[get_currency_service]
+    del app.dependency_overrides[get_read_currency_service]
+
+
+@pytest.fixture
+def exchange_rate_service() -> Generator[ExchangeRateService]:
+    """
+    Фикстура c настоящим ExchangeRateService поверх мокированного репозитория.
+
+    Репозиторий отдает тестовый набор курсов RATES. Автоматически очищает
+    dependency_overrides после завершения теста.
+    """
+    service = make_service(RATES)
+
+    app.dependency_overrides[get_exchange_rate_service] = lambda: service
+    app.dependency_overrides[get_read_exchange_rate_service] = lambda: service
+
+    yield service
+
+    del app.dependency_overrides[get_exchange_rate_service]
+    del app.dependency_overrides[get_read_exchange_rate_service]
+
+
+@pytest.fixture
+def mock_exchange_rate_service() -> Generator[AsyncMock]:
+    """
+    Фикстура для мокирования ExchangeRateService.
+
+    Автоматически очищает dependency_overrides после завершения теста.
+    """
+    mock_service = AsyncMock(spec=ExchangeRateService)
+    mock_service.get_rates_version.return_value = "1f2e3d4c5b6a7988"
+    mock_service.get_rates_snapshot.return_value.version = "1f2e3d4c5b6a7988"
+
+    app.dependency_overrides[get_exchange_rate_service] = lambda: mock_service
+    app.dependency_overrides[get_read_exchange_rate_service] = lambda: mock_service
+
+    yield mock_service
+
+    del app.dependency_overrides[get_exchange_rate_service]
+    del app.dependency_overrides[get_read_exchange_rate_service]
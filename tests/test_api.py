@@ -5,7 +5,8 @@ from httpx import AsyncClient
 from starlette import status
 
 from src.schemas.currency import CurrencyScheme
-from tests.conftest import CURRENCIES
+from src.services.exchange_rate_service import ExchangeRateService
+from tests.conftest import CURRENCIES, EUR, USD, make_rate
 
 
 @pytest.mark.asyncio
@@ -14,7 +15,7 @@ async def test_currencies(ac: AsyncClient, mock_currency_service: AsyncMock) ->
     response = await ac.get("/currencies")
     assert response.status_code == status.HTTP_200_OK
     assert response.json() == [currency.model_dump() for currency in CURRENCIES]
-    mock_currency_service.get_all_currencies.assert_awaited_once()
+    mock_currency_service.get_all_currencies_json.assert_awaited_once()
 
 
 @pytest.mark.asyncio
@@ -27,7 +28,7 @@ async def test_get_currencies_database_error(
     assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
     assert response.json() == {"message": "Сервис временно недоступен. Ошибка в базе данных."}
 
-    mock_currency_service_db_error.get_all_currencies.assert_called_once()
+    mock_currency_service_db_error.get_all_currencies_json.assert_called_once()
 
 
 @pytest.mark.asyncio
@@ -57,3 +58,119 @@ async def test_create_currency_success(ac: AsyncClient, mock_currency_service: A
 
     expected_payload_object = CurrencyScheme(code="JPY", name="Japanese Yen", sign="¥")
     mock_currency_service.create_currency.assert_awaited_once_with(expected_payload_object)
+
+
+@pytest.mark.asyncio
+async def test_exchange_batch_keeps_order_and_item_errors(
+        ac: AsyncClient, exchange_rate_service: ExchangeRateService,
+) -> None:
+    """Тест: пакетная конвертация возвращает результаты по порядку и ошибки по элементам."""
+    payload = [
+        {"from": "usd", "to": "EUR", "amount": "10"},
+        {"from": "EUR", "to": "EUR", "amount": "1"},
+        {"from": "EUR", "to": "RUB", "amount": "-1"},
+        {"from": "EUR", "to": "JPY", "amount": "1"},
+        {"from": "EUR", "to": "RUB", "amount": "2.5"},
+    ]
+
+    response = await ac.post("/exchange/batch", json=payload)
+
+    assert response.status_code == status.HTTP_200_OK
+    results = response.json()
+    assert [item["result"]["convertedAmount"] if item["result"] else None for item in results] == [
+        "9.00", None, None, None, "250.00",
+    ]
+    assert results[1]["message"] == "Нельзя конвертировать валюту в саму себя"
+    assert results[2]["message"] == "Поле 'amount' должно быть больше 0."
+    assert results[3]["message"] == "Обменного курса данных валют нет в БД"
+    exchange_rate_service.repository.get_all_exchange_rates.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_exchange_batch_ndjson(ac: AsyncClient, exchange_rate_service: ExchangeRateService) -> None:
+    """Тест: пакет можно передать потоком NDJSON."""
+    body = '{"from": "GBP", "to": "USD", "amount": "2"}\n\n{"from": "USD", "to": "RUB", "amount": "1"}\n'
+
+    response = await ac.post(
+        "/exchange/batch", content=body, headers={"Content-Type": "application/x-ndjson"},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [item["result"]["convertedAmount"] for item in response.json()] == ["2.50", "90.00"]
+
+
+@pytest.mark.asyncio
+async def test_exchange_batch_rejects_non_array(
+        ac: AsyncClient, exchange_rate_service: ExchangeRateService,
+) -> None:
+    """Тест: тело пакетного запроса должно быть JSON-массивом."""
+    response = await ac.post("/exchange/batch", json={"from": "USD", "to": "EUR", "amount": "1"})
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert response.json() == {"message": "Тело запроса должно быть JSON-массивом."}
+
+
+@pytest.mark.asyncio
+async def test_exchange_rates_conditional_get(ac: AsyncClient, mock_exchange_rate_service: AsyncMock) -> None:
+    """Тест: при совпадении If-None-Match возвращается 304 без чтения курсов."""
+    mock_exchange_rate_service.get_all_exchange_rates_json.return_value = b"[]"
+
+    response = await ac.get("/exchangeRates")
+    etag = response.headers["ETag"]
+    assert response.status_code == status.HTTP_200_OK
+    assert etag == 'W/"1f2e3d4c5b6a7988"'
+    assert "must-revalidate" in response.headers["Cache-Control"]
+
+    not_modified = await ac.get("/exchangeRates", headers={"If-None-Match": f'"other", {etag}'})
+    assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+    assert not_modified.headers["ETag"] == etag
+    assert not_modified.content == b""
+    mock_exchange_rate_service.get_all_exchange_rates_json.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_exchange_etag_changes_after_rate_update(
+        ac: AsyncClient, exchange_rate_service: ExchangeRateService,
+) -> None:
+    """Тест: после изменения курса старый ETag больше не дает 304."""
+    params = {"from": "USD", "to": "EUR", "amount": "10"}
+    etag = (await ac.get("/exchange", params=params)).headers["ETag"]
+
+    assert (await ac.get("/exchange", params=params, headers={"If-None-Match": etag})).status_code == (
+        status.HTTP_304_NOT_MODIFIED
+    )
+
+    exchange_rate_service.rate_cache.apply(make_rate(1, USD, EUR, "0.500000"))
+    response = await ac.get("/exchange", params=params, headers={"If-None-Match": etag})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["ETag"] != etag
+    assert response.json()["convertedAmount"] == "5.00"
+
+
+@pytest.mark.asyncio
+async def test_exchange_rate_etag_and_body_come_from_one_snapshot(
+        ac: AsyncClient, exchange_rate_service: ExchangeRateService,
+) -> None:
+    """Тест: курс пары отдается из снимка, по которому считается ETag, без запроса к БД."""
+    response = await ac.get("/exchangeRate/usdeur")
+    etag = response.headers["ETag"]
+
+    assert response.json() == {
+        "id": 1,
+        "baseCurrency": vars(USD),
+        "targetCurrency": vars(EUR),
+        "rate": "0.900000",
+    }
+    assert (await ac.get("/exchangeRate/USDEUR", headers={"If-None-Match": etag})).status_code == (
+        status.HTTP_304_NOT_MODIFIED
+    )
+
+    exchange_rate_service.rate_cache.apply(make_rate(1, USD, EUR, "0.500000"))
+    updated = await ac.get("/exchangeRate/USDEUR", headers={"If-None-Match": etag})
+    missing = await ac.get("/exchangeRate/EURRUB")
+
+    assert updated.headers["ETag"] != etag
+    assert updated.json()["rate"] == "0.500000"
+    assert missing.status_code == status.HTTP_404_NOT_FOUND
+    exchange_rate_service.repository.get_rate_by_ids.assert_not_awaited()
@@ -0,0 +1,27 @@
+from typing import Any
+
+from benchmarks.load import compare
+from benchmarks.seed import make_dataset
+
+
+def make_report(rps: float, p95_ms: float) -> dict[str, Any]:
+    return {"endpoints": {"exchange": {"rps": rps, "p95_ms": p95_ms}}}
+
+
+def test_dataset_is_deterministic_and_connected() -> None:
+    """Тест: набор данных воспроизводим, каждая валюта связана с USD, пары не повторяются."""
+    dataset = make_dataset(currencies=50, pairs=200, seed=7)
+
+    assert dataset == make_dataset(currencies=50, pairs=200, seed=7)
+    assert len(dataset.codes) == len(set(dataset.codes)) == 50
+    assert len(dataset.pairs) == 200
+    assert {target for base, target, _ in dataset.pairs if base == 1} == set(range(2, 51))
+    assert len({frozenset((base, target)) for base, target, _ in dataset.pairs}) == 200
+
+
+def test_compare_reports_regressions() -> None:
+    """Тест: падение RPS или рост p95 больше допустимого считаются регрессией."""
+    baseline = make_report(rps=1000, p95_ms=10)
+
+    assert compare(make_report(rps=950, p95_ms=10.5), baseline, max_regression=10) == []
+    assert len(compare(make_report(rps=800, p95_ms=12), baseline, max_regression=10)) == 2
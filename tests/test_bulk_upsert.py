@@ -0,0 +1,73 @@
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+
+import orjson
+import pytest
+from httpx import AsyncClient
+from starlette import status
+
+from src.repositories.exchange_rate_repository import UpsertedRates
+from src.schemas.exchange_rate import ExchangeRateCreate, ExchangeRatesBulkResult
+from tests.conftest import EUR, RATES, RUB, USD, make_rate, make_service
+
+
+def make_item(base: str, target: str, rate: str) -> ExchangeRateCreate:
+    return ExchangeRateCreate.model_validate(
+        {"baseCurrencyCode": base, "targetCurrencyCode": target, "rate": rate},
+    )
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_deduplicates_and_rejects_unknown_currencies() -> None:
+    """Тест: последний курс пары побеждает, строки с неизвестными валютами отклоняются."""
+    service = make_service(RATES)
+    service.repository.session = MagicMock()
+    service.repository.session.begin.return_value = AsyncMock()
+    service.repository.upsert_exchange_rates.return_value = UpsertedRates(
+        rates=[make_rate(1, USD, EUR, "0.950000"), make_rate(4, USD, RUB, "91.000000")], inserted=1,
+    )
+    subscription = service.rate_broadcaster.subscribe(None)
+    service.currency_service.get_ids_by_codes.return_value = {"USD": 1, "EUR": 2, "RUB": 3}
+
+    result = await service.bulk_upsert_exchange_rates([
+        (0, make_item("USD", "EUR", "0.9")),
+        (1, make_item("usd", "rub", "91")),
+        (2, make_item("USD", "XXX", "1")),
+        (3, make_item("USD", "EUR", "0.95")),
+    ])
+
+    (rows,), kwargs = service.repository.upsert_exchange_rates.await_args
+    assert rows == [(1, 2, Decimal("0.95")), (1, 3, Decimal("91"))]
+    service.history_repository.add_rates_from = MagicMock()
+    service.rollup_repository.record_ticks_from = MagicMock()
+    kwargs["journal"](written := MagicMock())
+    service.history_repository.add_rates_from.assert_called_once_with(written)
+    service.rollup_repository.record_ticks_from.assert_called_once_with(written)
+    assert (result.inserted, result.updated, result.superseded, result.rejected) == (1, 1, 1, 1)
+    assert result.errors[0].index == 2
+
+    published = [orjson.loads(await subscription.get() or b"") for _ in range(2)]
+    assert [(message["targetCurrency"]["code"], message["rate"]) for message in published] == [
+        ("EUR", "0.950000"), ("RUB", "91.000000"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_csv_collects_validation_errors(
+        ac: AsyncClient, mock_exchange_rate_service: AsyncMock,
+) -> None:
+    """Тест: CSV разбирается построчно, ошибки валидации попадают в отчет с индексом строки."""
+    mock_exchange_rate_service.bulk_upsert_exchange_rates.return_value = ExchangeRatesBulkResult(
+        inserted=1,
+    )
+    body = "baseCurrencyCode,targetCurrencyCode,rate\nUSD,EUR,0.9\nUSD,USD,1\nUSD,RUB,abc\n"
+
+    response = await ac.post("/exchangeRates/bulk", content=body, headers={"Content-Type": "text/csv"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["inserted"] == 1
+    assert response.json()["rejected"] == 2
+    assert [error["index"] for error in response.json()["errors"]] == [1, 2]
+
+    (valid_items,), _ = mock_exchange_rate_service.bulk_upsert_exchange_rates.await_args
+    assert [index for index, _ in valid_items] == [0]
@@ -0,0 +1,116 @@
+import asyncio
+from collections.abc import Callable
+from unittest.mock import AsyncMock, MagicMock
+
+import asyncpg
+import pytest
+
+from src.core.db import listener as listener_module
+from src.core.db.listener import PgListener
+from src.services.cache_invalidation import CACHE_INVALIDATION_CHANNEL, CacheInvalidator
+
+ANOTHER_OPERATION_MESSAGE = "cannot perform operation: another operation is in progress"
+
+
+def make_connection() -> MagicMock:
+    connection = MagicMock()
+    connection.add_listener = AsyncMock()
+    connection.execute = AsyncMock()
+    connection.close = AsyncMock()
+    connection.is_closed.return_value = False
+    return connection
+
+
+def test_notification_invalidates_registered_caches() -> None:
+    """Тест: уведомление сбрасывает только кэши измененной таблицы."""
+    invalidator = CacheInvalidator()
+    rates, currencies = MagicMock(), MagicMock()
+    invalidator.register("exchange_rate", rates)
+    invalidator.register("currency", currencies)
+
+    invalidator.handle_notification("exchange_rate")
+    invalidator.handle_notification("unknown")
+
+    rates.assert_called_once_with()
+    currencies.assert_not_called()
+
+
+def test_own_writes_do_not_invalidate_caches() -> None:
+    """Тест: уведомление о своей записи не сбрасывает кэши, о записи другого процесса - сбрасывает."""
+    invalidator = CacheInvalidator(origin="worker-1")
+    rates = MagicMock()
+    invalidator.register("exchange_rate", rates)
+
+    invalidator.handle_notification("exchange_rate:worker-1")
+    rates.assert_not_called()
+
+    invalidator.handle_notification("exchange_rate:worker-2")
+    invalidator.handle_notification("exchange_rate:")
+    assert rates.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_listener_reconnects_and_resynchronizes(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Тест: после обрыва listener переподключается, заново слушает канал и сбрасывает кэши."""
+    first, second = make_connection(), make_connection()
+    connect = AsyncMock(side_effect=[OSError("connection refused"), first, second])
+    monkeypatch.setattr(listener_module.asyncpg, "connect", connect)
+
+    listener = PgListener(dsn="postgresql://test", check_interval=60, reconnect_delay=0.001)
+    invalidator = CacheInvalidator()
+    cache = MagicMock()
+    invalidator.register("exchange_rate", cache)
+    invalidator.attach_listener(listener)
+
+    listener.start()
+    await wait_for(lambda: first.add_listener.await_count == 1)
+    assert cache.call_count == 1
+
+    dispatch = first.add_listener.await_args.args[1]
+    dispatch(first, 1, CACHE_INVALIDATION_CHANNEL, "exchange_rate")
+    assert cache.call_count == 2
+
+    on_terminate = first.add_termination_listener.call_args.args[0]
+    first.is_closed.return_value = True
+    on_terminate(first)
+    await wait_for(lambda: second.add_listener.await_count == 1)
+    await listener.stop()
+
+    assert connect.await_count == 3
+    second.add_listener.assert_awaited_once_with(CACHE_INVALIDATION_CHANNEL, dispatch)
+    assert cache.call_count == 3
+    second.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_notify_calls_share_connection(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Тест: одновременные NOTIFY и проверки связи выполняются в соединении по очереди."""
+    connection = make_connection()
+    in_progress = False
+
+    async def execute(*_args: object, **_kwargs: object) -> None:
+        nonlocal in_progress
+        if in_progress:
+            raise asyncpg.InterfaceError(ANOTHER_OPERATION_MESSAGE)
+        in_progress = True
+        await asyncio.sleep(0.001)
+        in_progress = False
+
+    connection.execute = AsyncMock(side_effect=execute)
+    monkeypatch.setattr(listener_module.asyncpg, "connect", AsyncMock(return_value=connection))
+    listener = PgListener(dsn="postgresql://test", check_interval=0.001)
+    listener.start()
+    await wait_for(lambda: listener.is_connected)
+
+    delivered = await asyncio.gather(*(listener.notify("channel", str(number)) for number in range(10)))
+    await listener.stop()
+
+    assert all(delivered)
+    notified = [call for call in connection.execute.await_args_list if "pg_notify" in call.args[0]]
+    assert len(notified) == 10
+
+
+async def wait_for(condition: Callable[[], bool]) -> None:
+    async with asyncio.timeout(1):
+        while not condition():
+            await asyncio.sleep(0.001)
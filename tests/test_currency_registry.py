@@ -0,0 +1,91 @@
+import asyncio
+from collections.abc import Sequence
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.exceptions.exceptions import CurrencyNotExistsError
+from src.models.currency import Currency
+from src.repositories.currency import CurrencyRepository
+from src.services.currency_registry import CurrencyRegistry
+from src.services.currency_service import CurrencyService
+from src.services.response_cache import ResponseCache
+from tests.conftest import EUR, GBP, RUB, USD
+
+
+def make_currency_service(registry: CurrencyRegistry) -> CurrencyService:
+    repository = AsyncMock(spec=CurrencyRepository)
+    repository.get_all_currencies.return_value = [USD, EUR]
+    repository.get_currencies_by_codes.return_value = []
+    return CurrencyService(repository=repository, response_cache=ResponseCache(), registry=registry)
+
+
+@pytest.mark.asyncio
+async def test_codes_resolved_without_queries_after_load() -> None:
+    """Тест: после загрузки справочника коды переводятся в id без запросов к БД."""
+    service = make_currency_service(CurrencyRegistry())
+
+    assert await service.get_codes_and_id_by_codes(["USD", "EUR"]) == {"USD": 1, "EUR": 2}
+    assert (await service.get_currency_by_code("eur")).name == "Euro"
+
+    service.repository.get_all_currencies.assert_awaited_once()
+    service.repository.get_currencies_by_codes.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_unknown_code_falls_back_to_database() -> None:
+    """Тест: валюта, созданная другим воркером, находится в БД и запоминается."""
+    service = make_currency_service(CurrencyRegistry())
+    service.repository.get_currencies_by_codes.return_value = [GBP]
+
+    assert await service.get_ids_by_codes(["USD", "GBP"]) == {"USD": 1, "GBP": 4}
+    assert await service.get_ids_by_codes(["GBP"]) == {"GBP": 4}
+    service.repository.get_currencies_by_codes.assert_awaited_once_with(["GBP"])
+
+    service.repository.get_currencies_by_codes.return_value = []
+    with pytest.raises(CurrencyNotExistsError):
+        await service.get_codes_and_id_by_codes(["USD", "XXX"])
+
+
+@pytest.mark.asyncio
+async def test_created_currency_is_added_to_registry() -> None:
+    """Тест: созданная валюта сразу доступна в справочнике, invalidate перечитывает его."""
+    registry = CurrencyRegistry()
+    service = make_currency_service(registry)
+    await service.get_ids_by_codes(["USD"])
+
+    registry.add(RUB)
+    assert await service.get_ids_by_codes(["RUB"]) == {"RUB": 3}
+
+    registry.invalidate()
+    await service.get_ids_by_codes(["USD"])
+    assert service.repository.get_all_currencies.await_count == 2
+    service.repository.get_currencies_by_codes.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_lookups_are_coalesced_only_within_one_database() -> None:
+    """Тест: поиск с основной БД не присоединяется к одновременному поиску тех же кодов на реплике."""
+    registry = CurrencyRegistry()
+    released = asyncio.Event()
+
+    async def get_currencies_by_codes(_: list[str]) -> Sequence[Currency]:
+        await released.wait()
+        return [GBP]
+
+    primary, replica = object(), object()
+    repositories = []
+    for bind in (primary, replica, replica):
+        repository = AsyncMock(spec=CurrencyRepository)
+        repository.bind = bind
+        repository.get_all_currencies.return_value = [USD, EUR]
+        repository.get_currencies_by_codes.side_effect = get_currencies_by_codes
+        repositories.append(repository)
+
+    tasks = [asyncio.create_task(registry.get_many(repository, ["GBP"])) for repository in repositories]
+    for _ in range(5):
+        await asyncio.sleep(0)
+    released.set()
+
+    assert all(currencies == {"GBP": registry.add(GBP)} for currencies in await asyncio.gather(*tasks))
+    assert [repository.get_currencies_by_codes.await_count for repository in repositories] == [1, 1, 0]
@@ -0,0 +1,65 @@
+from decimal import Decimal
+
+import pytest
+from fastapi.responses import JSONResponse
+from httpx import AsyncClient
+from starlette import status
+
+from src.api.responses import FastJSONResponse
+from src.core.config import settings
+from src.schemas.currency import CurrencyScheme
+from src.schemas.encoders import encode_currency, encode_exchange_rate, encode_exchange_result
+from src.schemas.exchange_rate import ExchangeRateSchema
+from src.services.exchange_rate_service import ExchangeRateService
+from src.services.response_cache import ResponseCache
+from tests.conftest import EUR, RATES, RUB, make_rate, make_service
+
+
+def default_body(model: object) -> bytes:
+    """Тело, которое строит стандартный путь FastAPI: Pydantic + JSONResponse."""
+    return JSONResponse(model.model_dump(mode="json", by_alias=True)).body  # type: ignore[attr-defined]
+
+
+def test_fast_response_matches_json_response() -> None:
+    """Тест: orjson дает те же байты, что и JSONResponse, включая не-ASCII символы."""
+    content = {"name": "Российский рубль", "sign": "₽", "items": [1, None, True, 'a"b']}
+
+    assert FastJSONResponse(content).body == JSONResponse(content).body
+
+
+@pytest.mark.parametrize("exchange_rate", [*RATES, make_rate(4, EUR, RUB, "0.000001")])
+def test_exchange_rate_encoder_matches_schema(exchange_rate: object) -> None:
+    """Тест: кодировщик курса совпадает с ExchangeRateSchema побайтно."""
+    expected = default_body(ExchangeRateSchema.model_validate(exchange_rate))
+
+    assert FastJSONResponse(encode_exchange_rate(exchange_rate)).body == expected
+    assert FastJSONResponse(encode_currency(EUR)).body == default_body(CurrencyScheme.model_validate(EUR))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("amount", [Decimal("10"), Decimal("0.01"), Decimal("123456.78")])
+async def test_exchange_result_encoder_matches_schema(amount: Decimal) -> None:
+    """Тест: кодировщик результата конвертации совпадает с ExchangeCurrencyResponse."""
+    result = await make_service(RATES).exchange_currencies("EUR", "RUB", amount)
+
+    assert FastJSONResponse(encode_exchange_result(result)).body == default_body(result)
+
+
+@pytest.mark.asyncio
+async def test_fast_json_endpoints_are_byte_identical(
+        ac: AsyncClient, exchange_rate_service: ExchangeRateService, monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Тест: включение fast_json_response не меняет тела ответов."""
+    params = {"from": "RUB", "to": "GBP", "amount": "1000"}
+    default_exchange = await ac.get("/exchange", params=params)
+    default_rates = await ac.get("/exchangeRates")
+
+    monkeypatch.setattr(settings, "fast_json_response", True)
+    exchange_rate_service.response_cache = ResponseCache()
+    fast_exchange = await ac.get("/exchange", params=params)
+    fast_rates = await ac.get("/exchangeRates")
+
+    assert fast_exchange.status_code == status.HTTP_200_OK
+    assert fast_exchange.content == default_exchange.content
+    assert fast_exchange.headers["ETag"] == default_exchange.headers["ETag"]
+    assert fast_rates.content == default_rates.content
@@ -0,0 +1,66 @@
+import csv
+import io
+import json
+from collections.abc import Generator
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+from starlette import status
+
+from src.core.dependencies import get_exchange_rate_exporter
+from src.main import app
+from src.repositories import exchange_rate_repository
+from src.services.exchange_rate_export import ExchangeRateExporter, ExportFormat
+
+
+@pytest.fixture
+def exporter(sqlite_engine: AsyncEngine) -> Generator[ExchangeRateExporter]:
+    """Фикстура: выгрузка из заполненной SQLite-базы, подставленная в эндпоинт."""
+    exchange_rate_exporter = ExchangeRateExporter(session_scope=async_sessionmaker(sqlite_engine))
+    app.dependency_overrides[get_exchange_rate_exporter] = lambda: exchange_rate_exporter
+
+    yield exchange_rate_exporter
+
+    del app.dependency_overrides[get_exchange_rate_exporter]
+
+
+@pytest.mark.asyncio
+async def test_export_is_streamed_in_batches(
+        exporter: ExchangeRateExporter, monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Тест: строки выгружаются пачками серверного курсора, а не одним списком."""
+    monkeypatch.setattr(exchange_rate_repository, "EXPORT_BATCH_SIZE", 4)
+
+    chunks = [chunk async for chunk in exporter.export(ExportFormat.NDJSON)]
+
+    assert [chunk.count(b"\n") for chunk in chunks] == [4, 2]
+
+
+@pytest.mark.asyncio
+async def test_export_ndjson(ac: AsyncClient, exporter: ExchangeRateExporter) -> None:
+    """Тест: NDJSON-выгрузка содержит курсы в формате ExchangeRateSchema по порядку id."""
+    response = await ac.get("/exchangeRates/export")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["id"] for line in lines] == [1, 2, 3, 4, 5, 6]
+    assert lines[2] == {
+        "id": 3,
+        "baseCurrency": {"id": 4, "code": "GBP", "name": "GBP", "sign": "GBP"},
+        "targetCurrency": {"id": 1, "code": "USD", "name": "USD", "sign": "USD"},
+        "rate": "3.000000",
+    }
+
+
+@pytest.mark.asyncio
+async def test_export_csv_matches_bulk_format(ac: AsyncClient, exporter: ExchangeRateExporter) -> None:
+    """Тест: CSV-выгрузка в формате, который принимает POST /exchangeRates/bulk."""
+    response = await ac.get("/exchangeRates/export", params={"format": "csv"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 6
+    assert rows[0] == {"id": "1", "baseCurrencyCode": "USD", "targetCurrencyCode": "EUR", "rate": "1.000000"}
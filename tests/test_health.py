@@ -0,0 +1,84 @@
+from collections.abc import Callable, Generator
+from contextlib import AbstractContextManager, contextmanager
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from src.core.db.probe import DatabaseProbe
+from src.core.db.profiling import QueryProfile
+from src.core.dependencies import get_database_probe
+from src.core.lifecycle import lifecycle
+from src.main import app
+
+
+@contextmanager
+def use_probe(probe: DatabaseProbe) -> Generator[DatabaseProbe]:
+    app.dependency_overrides[get_database_probe] = lambda: probe
+    yield probe
+    del app.dependency_overrides[get_database_probe]
+
+
+@pytest.fixture
+def sqlite_probe(sqlite_engine: AsyncEngine) -> Generator[DatabaseProbe]:
+    """Фикстура: проверка БД поверх sqlite_engine вместо основной БД."""
+    with use_probe(DatabaseProbe(sqlite_engine, check_interval=60)) as probe:
+        yield probe
+
+
+@pytest.fixture
+def started(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(lifecycle, "ready", True)
+
+
+@pytest.mark.asyncio
+async def test_liveness_does_not_touch_database(ac: AsyncClient) -> None:
+    """Тест: liveness отвечает без обращения к БД."""
+    response = await ac.get("/health/live")
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("started", "sqlite_probe")
+async def test_readiness_probe_is_cached(
+        ac: AsyncClient, max_queries: Callable[[int], AbstractContextManager[QueryProfile]],
+) -> None:
+    """Тест: готовый воркер отвечает 200, повторные пробы не обращаются к БД."""
+    with max_queries(1):
+        response = await ac.get("/health/ready")
+    with max_queries(0):
+        await ac.get("/health/ready")
+        await ac.get("/health/ready")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["ready"] is True
+    assert body["database"]["ok"] is True
+    assert body["database"]["latency"] >= 0
+    assert set(body["pool"]) == {"size", "checkedOut", "overflow", "saturation"}
+    assert set(body["caches"]) == {"rateSnapshot", "currencyRegistry"}
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("sqlite_probe")
+async def test_not_ready_until_started(ac: AsyncClient) -> None:
+    """Тест: до завершения прогрева и во время остановки воркер не готов."""
+    response = await ac.get("/health/ready")
+
+    assert response.status_code == 503
+    assert response.json()["started"] is False
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("started")
+async def test_not_ready_when_database_unavailable(ac: AsyncClient) -> None:
+    """Тест: недоступная БД делает воркер неготовым."""
+    engine = create_async_engine("sqlite+aiosqlite:////nonexistent/health.db")
+
+    with use_probe(DatabaseProbe(engine, check_interval=60)):
+        response = await ac.get("/health/ready")
+
+    assert response.status_code == 503
+    assert response.json()["database"] == {"ok": False, "latency": None, "error": "OperationalError"}
@@ -0,0 +1,85 @@
+import asyncio
+from pathlib import Path
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from src import main
+from src.core.config import settings
+from src.core.db.base import Base
+from src.core.db.profiling import attach_profiler, profile_queries
+from src.core.db.warmup import WARMUP_QUERIES, warm_up_engine
+from src.core.lifecycle import AppLifecycle, lifecycle
+from src.services.rate_broadcast import RateBroadcaster
+
+
+@pytest.mark.asyncio
+async def test_warmup_opens_pool_connections(tmp_path: Path) -> None:
+    """Тест: прогрев открывает заданное число соединений и выполняет на каждом горячие выражения."""
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'warmup.db'}", poolclass=AsyncAdaptedQueuePool, pool_size=3,
+    )
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    await engine.dispose()
+    attach_profiler(engine)
+
+    with profile_queries() as profile:
+        await warm_up_engine(engine, 3)
+
+    assert engine.pool.checkedin() == 3  # type: ignore[attr-defined]
+    assert profile.count == 3 * len(WARMUP_QUERIES)
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_drain_waits_for_in_flight_requests() -> None:
+    """Тест: drain снимает готовность и ждет завершения принятых запросов."""
+    lifecycle = AppLifecycle()
+    lifecycle.ready = True
+    lifecycle.request_started()
+
+    drain = asyncio.create_task(lifecycle.drain(timeout=1))
+    await asyncio.sleep(0)
+    assert not lifecycle.ready
+    assert not drain.done()
+
+    lifecycle.request_finished()
+    assert await drain
+
+    lifecycle.request_started()
+    assert not await lifecycle.drain(timeout=0.01)
+
+
+@pytest.mark.asyncio
+async def test_close_all_ends_subscriptions() -> None:
+    """Тест: при остановке подписки на курсы закрываются с кодом 1001."""
+    broadcaster = RateBroadcaster(queue_size=10)
+    subscription = broadcaster.subscribe(None)
+
+    broadcaster.close_all()
+
+    assert await subscription.get() is None
+    assert subscription.close_code == RateBroadcaster.SHUTDOWN_CODE
+    assert broadcaster.subscriber_count == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_startup_stays_unready_until_load_succeeds(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Тест: при неудачном прогреве воркер не готов, пока повторная загрузка данных не пройдет."""
+    load = AsyncMock(side_effect=[True, False, True])
+    monkeypatch.setattr(main, "warm_up_pools", AsyncMock(return_value=False))
+    monkeypatch.setattr(main, "load_reference_data", load)
+    monkeypatch.setattr(settings, "startup_retry_interval", 0)
+    monkeypatch.setattr(lifecycle, "ready", False)
+
+    async with main.lifespan(main.app):
+        assert not lifecycle.ready
+        async with asyncio.timeout(1):
+            while not lifecycle.ready:
+                await asyncio.sleep(0)
+        assert load.await_count == 3
+
+    assert not lifecycle.ready
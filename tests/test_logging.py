@@ -0,0 +1,53 @@
+import json
+import logging
+import queue
+
+from prometheus_client import REGISTRY
+
+from src.core.log import AsyncQueueHandler, JsonFormatter, SamplingFilter
+
+
+def make_record(
+        message: str, *args: object, level: int = logging.INFO, func: str = "handler",
+) -> logging.LogRecord:
+    return logging.LogRecord("src.api.test", level, __file__, 1, message, args, None, func=func)
+
+
+def test_json_formatter_escapes_message() -> None:
+    """Тест: кавычки и переводы строк в сообщении не ломают JSON."""
+    line = JsonFormatter().format(make_record('валюта "%s"\nне найдена', "USD"))
+
+    payload = json.loads(line)
+    assert payload["message"] == 'валюта "USD"\nне найдена'
+    assert payload["level"] == "INFO"
+    assert payload["logger"] == "src.api.test"
+
+
+def test_sampling_filter_passes_every_nth_info_record() -> None:
+    """Тест: из выбранной функции проходит каждая N-я INFO-запись, предупреждения - все."""
+    sampling = SamplingFilter({"src.api.test.handler": 3})
+
+    info = [sampling.filter(make_record("запрос")) for _ in range(6)]
+    warnings = [sampling.filter(make_record("ошибка", level=logging.WARNING)) for _ in range(3)]
+    other = [sampling.filter(make_record("запрос", func="other")) for _ in range(3)]
+
+    assert info == [True, False, False, True, False, False]
+    assert all(warnings)
+    assert all(other)
+
+
+def test_queue_handler_interpolates_and_drops_when_full() -> None:
+    """Тест: сообщение подставляется при вызове, при переполненной очереди запись отбрасывается."""
+    records: queue.Queue[logging.LogRecord] = queue.Queue(maxsize=1)
+    handler = AsyncQueueHandler(records)
+    arguments = ["USD"]
+    dropped = (REGISTRY.get_sample_value("log_records_dropped_total") or 0.0)
+
+    handler.handle(make_record("курс %s", arguments))
+    arguments.append("EUR")
+    handler.handle(make_record("курс %s", "RUB"))
+
+    record = records.get_nowait()
+    assert record.getMessage() == "курс ['USD']"
+    assert record.args is None
+    assert (REGISTRY.get_sample_value("log_records_dropped_total") or 0.0) == dropped + 1
@@ -0,0 +1,94 @@
+from decimal import Decimal
+from unittest.mock import AsyncMock
+
+import pytest
+from httpx import AsyncClient
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.core.db.instrumentation import instrument_engine
+from src.services.currency_registry import CurrencyRegistry
+from tests.conftest import CURRENCIES, RATES, USD, make_service
+
+
+def sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.mark.asyncio
+async def test_request_latency_labelled_by_route_template(
+        ac: AsyncClient, mock_currency_service: AsyncMock,
+) -> None:
+    """Тест: длительность запроса учитывается по шаблону маршрута, а не по пути."""
+    mock_currency_service.get_currency_by_code.return_value = CURRENCIES[0]
+    labels = {"method": "GET", "route": "/currency/{code}", "status": "200"}
+    before = sample("http_request_duration_seconds_count", **labels)
+    unmatched = sample("http_request_duration_seconds_count", method="GET", route="unmatched", status="404")
+
+    await ac.get("/currency/USD")
+    await ac.get("/currency/EUR")
+    await ac.get("/no-such-route")
+
+    assert sample("http_request_duration_seconds_count", **labels) == before + 2
+    assert sample("http_request_duration_seconds_count", method="GET", route="/currency/USD", status="200") == 0
+    assert sample(
+        "http_request_duration_seconds_count", method="GET", route="unmatched", status="404",
+    ) == unmatched + 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("base", "target", "path"),
+    [("USD", "EUR", "direct"), ("EUR", "USD", "reverse"), ("EUR", "RUB", "cross")],
+)
+async def test_exchange_stages_and_resolution_path(base: str, target: str, path: str) -> None:
+    """Тест: конвертация публикует длительность каждого этапа и тип маршрута."""
+    stages = ("fetch", "resolve", "quantize", "validate")
+    before = {stage: sample("exchange_stage_seconds_count", stage=stage) for stage in stages}
+    resolutions = sample("exchange_rate_resolutions_total", path=path)
+
+    await make_service(RATES).exchange_currencies(base, target, Decimal("10"))
+
+    for stage in stages:
+        assert sample("exchange_stage_seconds_count", stage=stage) == before[stage] + 1
+    assert sample("exchange_rate_resolutions_total", path=path) == resolutions + 1
+
+
+@pytest.mark.asyncio
+async def test_cache_hits_and_misses_are_counted() -> None:
+    """Тест: обращения к снимку курсов и справочнику валют делятся на попадания и промахи."""
+    service = make_service(RATES)
+    hits = sample("cache_requests_total", cache="rate_snapshot", result="hit")
+    misses = sample("cache_requests_total", cache="rate_snapshot", result="miss")
+
+    await service.rate_cache.get_snapshot(service.repository)
+    await service.rate_cache.get_snapshot(service.repository)
+
+    assert sample("cache_requests_total", cache="rate_snapshot", result="miss") == misses + 1
+    assert sample("cache_requests_total", cache="rate_snapshot", result="hit") == hits + 1
+
+    registry = CurrencyRegistry()
+    repository = AsyncMock()
+    repository.get_all_currencies.return_value = [USD]
+    repository.get_currencies_by_codes.return_value = []
+    registry_misses = sample("cache_requests_total", cache="currency_registry", result="miss")
+
+    await registry.get_many(repository, ["USD"])
+    await registry.get_many(repository, ["USD", "XXX"])
+
+    assert sample("cache_requests_total", cache="currency_registry", result="miss") == registry_misses + 1
+
+
+@pytest.mark.asyncio
+async def test_query_duration_by_operation() -> None:
+    """Тест: время SQL-выражений публикуется по движку и типу выражения."""
+    engine = create_async_engine("sqlite+aiosqlite://")
+    instrument_engine(engine, "test")
+
+    async with engine.connect() as connection:
+        await connection.execute(text("SELECT 1"))
+        await connection.execute(text("select 2"))
+    await engine.dispose()
+
+    assert sample("db_query_seconds_count", engine="test", operation="SELECT") == 2
@@ -0,0 +1,77 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from src.repositories.currency import CurrencyRepository
+from src.repositories.exchange_rate_repository import ExchangeRateRepository
+from src.services.currency_registry import CurrencyRegistry
+from src.services.currency_service import CurrencyService
+from src.services.pagination import Page
+from src.services.response_cache import ResponseCache
+from tests.conftest import RATES
+
+
+async def collect_ids(repository: ExchangeRateRepository, limit: int, **filters: str) -> list[list[int]]:
+    pages = []
+    cursor = None
+    while True:
+        rows = await repository.get_exchange_rates_page(cursor, limit, **filters)
+        if not rows:
+            return pages
+        pages.append([row.id for row in rows])
+        cursor = rows[-1].id
+
+
+@pytest.mark.asyncio
+async def test_exchange_rates_keyset_pages(db_session: AsyncSession) -> None:
+    """Тест: страницы курсов идут по id без пропусков и повторов."""
+    repository = ExchangeRateRepository(db_session)
+
+    assert await collect_ids(repository, 4) == [[1, 2, 3, 4], [5, 6]]
+
+
+@pytest.mark.asyncio
+async def test_exchange_rates_filters(db_session: AsyncSession) -> None:
+    """Тест: фильтры по базовой и целевой валюте применяются в запросе."""
+    repository = ExchangeRateRepository(db_session)
+
+    assert await collect_ids(repository, 2, base_code="EUR") == [[4, 6]]
+    assert await collect_ids(repository, 2, target_code="RUB") == [[2, 4], [5]]
+    assert await collect_ids(repository, 10, base_code="GBP", target_code="RUB") == [[5]]
+
+    rows = await repository.get_exchange_rates_page(None, 1, base_code="GBP")
+    assert rows[0].base_currency.code == "GBP"
+    assert rows[0].target_currency.code == "USD"
+
+
+@pytest.mark.asyncio
+async def test_currency_page_next_cursor(db_session: AsyncSession) -> None:
+    """Тест: курсор следующей страницы - id последней отданной валюты."""
+    service = CurrencyService(repository=CurrencyRepository(db_session), response_cache=ResponseCache(), registry=CurrencyRegistry())
+
+    first = await service.get_currencies_page(None, 3)
+    last = await service.get_currencies_page(first.next_cursor, 3)
+
+    assert [currency.code for currency in first.items] == ["USD", "EUR", "RUB"]
+    assert first.next_cursor == 3
+    assert [currency.code for currency in last.items] == ["GBP"]
+    assert last.next_cursor is None
+
+
+@pytest.mark.asyncio
+async def test_exchange_rates_page_endpoint(ac: AsyncClient, mock_exchange_rate_service: AsyncMock) -> None:
+    """Тест: параметры пагинации включают постраничный ответ с X-Next-Cursor."""
+    mock_exchange_rate_service.get_exchange_rates_page.return_value = Page(items=RATES[:2], next_cursor=2)
+
+    response = await ac.get("/exchangeRates", params={"limit": 2, "base": "usd"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["X-Next-Cursor"] == "2"
+    assert [item["id"] for item in response.json()] == [1, 2]
+    mock_exchange_rate_service.get_exchange_rates_page.assert_awaited_once_with(
+        None, 2, base_code="USD", target_code=None,
+    )
+    mock_exchange_rate_service.get_all_exchange_rates_json.assert_not_awaited()
@@ -0,0 +1,74 @@
+import logging
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.api.profiling import QueryProfilingMiddleware
+from src.core.db.profiling import QueryProfile, attach_profiler, profile_queries
+from src.main import app
+
+MaxQueries = Callable[[int], AbstractContextManager[QueryProfile]]
+
+
+@pytest.mark.asyncio
+async def test_profile_records_statements_of_current_context(sqlite_engine: AsyncEngine) -> None:
+    """Тест: пишутся только выражения внутри profile_queries, без дублей при повторном подключении."""
+    attach_profiler(sqlite_engine)
+    attach_profiler(sqlite_engine)
+
+    async with sqlite_engine.connect() as connection:
+        await connection.execute(text("SELECT 1"))
+        with profile_queries() as profile:
+            await connection.execute(text("SELECT code FROM currency WHERE id = :id"), {"id": 1})
+
+    assert profile.count == 1
+    assert profile.queries[0].parameters == (1,)
+    assert profile.duration > 0
+    assert "SELECT code FROM currency" in profile.describe()
+
+
+@pytest.mark.asyncio
+async def test_endpoint_query_budget(
+        ac: AsyncClient, sqlite_app: AsyncEngine, max_queries: MaxQueries,
+) -> None:
+    """Тест: холодное чтение курса грузит снимок курсов, прогретое отдается из снимка без запросов."""
+    with max_queries(1):
+        response = await ac.get("/exchangeRate/USDEUR")
+    assert response.status_code == 200
+
+    with max_queries(0) as profile:
+        response = await ac.get("/exchangeRate/USDRUB")
+    assert response.json()["targetCurrency"]["code"] == "RUB"
+    assert profile.count == 0
+
+
+@pytest.mark.asyncio
+async def test_max_queries_fails_over_budget(sqlite_engine: AsyncEngine, max_queries: MaxQueries) -> None:
+    """Тест: превышение бюджета роняет тест со списком выражений."""
+    with pytest.raises(AssertionError, match="Выполнено 2 SQL-выражений, допустимо 1"), max_queries(1):
+        async with sqlite_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+            await connection.execute(text("SELECT 2"))
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("sqlite_app")
+async def test_middleware_logs_requests_over_budget(
+        sqlite_engine: AsyncEngine, caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Тест: запрос сверх бюджета логируется с уровнем WARNING вместе с выражениями."""
+    attach_profiler(sqlite_engine)
+    profiled = QueryProfilingMiddleware(app, max_queries=0, max_duration=10)
+
+    async with AsyncClient(transport=ASGITransport(app=profiled), base_url="http://test") as client:
+        with caplog.at_level(logging.WARNING, logger="src.api.profiling"):
+            await client.get("/exchangeRate/USDEUR")
+
+    [record] = [record for record in caplog.records if record.name == "src.api.profiling"]
+    assert record.levelno == logging.WARNING
+    assert "GET /exchangeRate/USDEUR" in record.getMessage()
+    assert "exchange_rate" in record.getMessage()
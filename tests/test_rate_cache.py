@@ -0,0 +1,121 @@
+from decimal import Decimal
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.exceptions.exceptions import ExchangeRateNotExistsError
+from src.services.rate_cache import RateSnapshot
+from src.services.rate_graph import RateGraph, RateRoute
+from tests.conftest import EUR, GBP, RATES, USD, make_rate, make_service
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("base", "target", "expected_rate", "expected_amount"),
+    [
+        ("USD", "EUR", Decimal("0.900000"), Decimal("9.00")),
+        ("EUR", "USD", Decimal("1.111111"), Decimal("11.11")),
+        ("EUR", "RUB", Decimal("100.000000"), Decimal("1000.00")),
+    ],
+)
+async def test_exchange_resolves_rates_from_snapshot(
+        base: str, target: str, expected_rate: Decimal, expected_amount: Decimal,
+) -> None:
+    """Тест: прямой, обратный и кросс-курс считаются по снимку в памяти."""
+    service = make_service(RATES)
+
+    result = await service.exchange_currencies(base, target, Decimal("10"))
+
+    assert result.rate == expected_rate
+    assert result.converted_amount == expected_amount
+    assert result.base_currency.code == base
+    assert result.target_currency.code == target
+
+
+@pytest.mark.asyncio
+async def test_exchange_rate_not_found() -> None:
+    """Тест: отсутствие пути между валютами приводит к ExchangeRateNotExistsError."""
+    service = make_service(RATES[:1])
+
+    with pytest.raises(ExchangeRateNotExistsError):
+        await service.exchange_currencies("EUR", "RUB", Decimal("10"))
+
+
+@pytest.mark.asyncio
+async def test_snapshot_is_loaded_once_while_fresh() -> None:
+    """Тест: повторные конвертации не обращаются к БД, пока снимок свежий."""
+    service = make_service(RATES)
+
+    await service.exchange_currencies("USD", "EUR", Decimal("1"))
+    await service.exchange_currencies("USD", "RUB", Decimal("1"))
+
+    service.repository.get_all_exchange_rates.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_stale_or_invalidated_snapshot_is_reloaded() -> None:
+    """Тест: устаревший и инвалидированный снимок перечитываются из БД."""
+    service = make_service(RATES, max_staleness=0)
+
+    await service.exchange_currencies("USD", "EUR", Decimal("1"))
+    await service.exchange_currencies("USD", "EUR", Decimal("1"))
+    assert service.repository.get_all_exchange_rates.await_count == 2
+
+    service.rate_cache.max_staleness = 60
+    service.rate_cache.invalidate()
+    await service.exchange_currencies("USD", "EUR", Decimal("1"))
+    assert service.repository.get_all_exchange_rates.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_snapshot_is_loaded_from_snapshot_repository() -> None:
+    """Тест: снимок читает репозиторий основной БД, а не репозиторий реплики."""
+    service = make_service([])
+    service.snapshot_repository = AsyncMock()
+    service.snapshot_repository.get_all_exchange_rates.return_value = RATES
+
+    result = await service.exchange_currencies("USD", "EUR", Decimal("10"))
+
+    assert result.rate == Decimal("0.900000")
+    service.repository.get_all_exchange_rates.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_apply_updates_snapshot_in_place(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Тест: write-through обновляет курс в снимке без повторной загрузки и поиска маршрутов."""
+    service = make_service(RATES)
+    await service.rate_cache.get_snapshot(service.repository)
+    searched: list[int] = []
+    routes_from = RateGraph.routes_from
+
+    def spy_routes_from(graph: RateGraph, source_id: int) -> dict[int, RateRoute]:
+        searched.append(source_id)
+        return routes_from(graph, source_id)
+
+    monkeypatch.setattr(RateGraph, "routes_from", spy_routes_from)
+
+    service.rate_cache.apply(make_rate(4, USD, GBP, "0.800000"))
+    service.rate_cache.apply(make_rate(1, USD, EUR, "0.500000"))
+    assert searched == []
+    result = await service.exchange_currencies("USD", "EUR", Decimal("10"))
+
+    assert result.converted_amount == Decimal("5.00")
+    service.repository.get_all_exchange_rates.assert_awaited_once()
+
+
+def test_rate_write_copies_only_changed_row() -> None:
+    """Тест: запись курса копирует одну строку смежности, версия совпадает с полным пересчетом."""
+    snapshot = RateSnapshot.from_exchange_rates(RATES)
+
+    updated = snapshot.with_rates([make_rate(1, USD, EUR, "0.500000"), make_rate(4, USD, GBP, "0.800000")])
+    rates = [make_rate(1, USD, EUR, "0.500000"), RATES[1], RATES[2], make_rate(4, USD, GBP, "0.800000")]
+
+    assert updated.adjacency[GBP.id] is snapshot.adjacency[GBP.id]
+    assert updated.adjacency[USD.id] is not snapshot.adjacency[USD.id]
+    assert updated.version == RateSnapshot.from_exchange_rates(rates).version
+    assert updated.version != snapshot.version
+    assert updated.with_rates([RATES[0]]).version != snapshot.version
+    assert updated.with_rates([RATES[0]]).with_rates([make_rate(1, USD, EUR, "0.5")]).version == (
+        updated.version
+    )
+    assert updated.get_rate("USD", "RUB") == RATES[1].rate
@@ -0,0 +1,98 @@
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+from src.core.config import settings
+from src.services.rate_cache import RateSnapshot
+from tests.conftest import EUR, GBP, RUB, USD, make_rate
+
+CHF = SimpleNamespace(id=5, code="CHF", name="Swiss Franc", sign="Fr")
+JPY = SimpleNamespace(id=6, code="JPY", name="Yen", sign="¥")
+
+
+def route_codes(snapshot: RateSnapshot, base: str, target: str) -> list[str] | None:
+    route = snapshot.find_route(base, target)
+    if route is None:
+        return None
+    return [snapshot.currencies[currency_id].code for currency_id in route.currency_ids]
+
+
+def test_cross_rate_through_non_usd_pivot() -> None:
+    """Тест: кросс-курс находится через EUR, если пути через USD нет."""
+    snapshot = RateSnapshot.from_exchange_rates([
+        make_rate(1, EUR, CHF, "0.950000"),
+        make_rate(2, EUR, GBP, "0.850000"),
+    ])
+
+    route = snapshot.find_route("CHF", "GBP")
+
+    assert route_codes(snapshot, "CHF", "GBP") == ["CHF", "EUR", "GBP"]
+    assert route is not None
+    assert snapshot.route_rate(route) == Decimal("0.850000") / Decimal("0.950000")
+
+
+def test_direct_rate_preferred_over_reverse_and_cross() -> None:
+    """Тест: прямой курс выигрывает у обратного, кратчайший путь - у кросс-курса."""
+    snapshot = RateSnapshot.from_exchange_rates([
+        make_rate(1, USD, EUR, "0.900000"),
+        make_rate(2, EUR, USD, "1.200000"),
+        make_rate(3, USD, RUB, "90.000000"),
+        make_rate(4, EUR, RUB, "95.000000"),
+    ])
+
+    usd_eur = snapshot.find_route("USD", "EUR")
+    assert usd_eur is not None
+    assert usd_eur.hops[0].forward
+    assert route_codes(snapshot, "RUB", "EUR") == ["RUB", "EUR"]
+
+
+def test_pivot_preference_order(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Тест: при равной длине маршрута выбирается более приоритетная pivot-валюта."""
+    rates = [
+        make_rate(1, USD, CHF, "0.800000"),
+        make_rate(2, USD, JPY, "150.000000"),
+        make_rate(3, EUR, CHF, "0.950000"),
+        make_rate(4, EUR, JPY, "160.000000"),
+    ]
+
+    monkeypatch.setattr(settings, "exchange_pivot_currencies", ["USD"])
+    assert route_codes(RateSnapshot.from_exchange_rates(rates), "CHF", "JPY") == ["CHF", "USD", "JPY"]
+
+    monkeypatch.setattr(settings, "exchange_pivot_currencies", ["EUR", "USD"])
+    assert route_codes(RateSnapshot.from_exchange_rates(rates), "CHF", "JPY") == ["CHF", "EUR", "JPY"]
+
+
+def test_route_length_is_bounded(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Тест: маршрут длиннее exchange_max_hops не используется."""
+    rates = [
+        make_rate(1, CHF, EUR, "1.050000"),
+        make_rate(2, EUR, USD, "1.100000"),
+        make_rate(3, USD, JPY, "150.000000"),
+    ]
+
+    monkeypatch.setattr(settings, "exchange_max_hops", 3)
+    assert route_codes(RateSnapshot.from_exchange_rates(rates), "CHF", "JPY") == [
+        "CHF", "EUR", "USD", "JPY",
+    ]
+
+    monkeypatch.setattr(settings, "exchange_max_hops", 2)
+    assert route_codes(RateSnapshot.from_exchange_rates(rates), "CHF", "JPY") is None
+
+
+def test_rate_update_reuses_found_routes() -> None:
+    """Тест: обновление курса существующей пары не перестраивает граф маршрутов."""
+    snapshot = RateSnapshot.from_exchange_rates([
+        make_rate(1, USD, EUR, "0.900000"),
+        make_rate(2, USD, RUB, "90.000000"),
+    ])
+    assert snapshot.find_route("EUR", "RUB") is not None
+
+    updated = snapshot.with_rates([make_rate(1, USD, EUR, "0.500000")])
+    extended = updated.with_rates([make_rate(3, GBP, USD, "1.250000")])
+
+    assert updated.graph is snapshot.graph
+    assert extended.graph is not snapshot.graph
+    route = updated.find_route("EUR", "RUB")
+    assert route is not None
+    assert updated.route_rate(route) == Decimal("180")
@@ -0,0 +1,101 @@
+from datetime import UTC, datetime
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from src.core.dependencies import get_read_exchange_rate_service
+from src.exceptions.exceptions import ExchangeRateNotExistsError
+from src.main import app
+from src.models.exchange_rate_history import ExchangeRateHistory
+from src.schemas.exchange_rate import ExchangeRateUpdate
+from src.services.exchange_rate_service import ExchangeRateService
+from tests.conftest import EUR, RATES, USD, make_rate, make_service
+
+JAN = datetime(2026, 1, 1, tzinfo=UTC)
+FEB = datetime(2026, 2, 1, tzinfo=UTC)
+MAR = datetime(2026, 3, 1, tzinfo=UTC)
+
+
+@pytest_asyncio.fixture
+async def history_service(
+        db_session: AsyncSession, db_exchange_rate_service: ExchangeRateService,
+) -> ExchangeRateService:
+    """Фикстура: сервис над SQLite с историей USD/EUR (0.8 с января, 0.9 с марта) и GBP/USD."""
+    db_session.add_all([
+        ExchangeRateHistory(base_currency_id=1, target_currency_id=2, valid_from=JAN, rate=Decimal("0.8")),
+        ExchangeRateHistory(base_currency_id=1, target_currency_id=2, valid_from=MAR, rate=Decimal("0.9")),
+        ExchangeRateHistory(base_currency_id=4, target_currency_id=1, valid_from=FEB, rate=Decimal("1.25")),
+    ])
+    await db_session.commit()
+
+    return db_exchange_rate_service
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("at", "expected_rate"),
+    [
+        (datetime(2026, 1, 15, tzinfo=UTC), Decimal("0.800000")),
+        (MAR, Decimal("0.900000")),
+        (datetime.fromisoformat("2026-06-01T00:00:00"), Decimal("0.900000")),
+    ],
+)
+async def test_exchange_at_uses_rate_valid_at_moment(
+        history_service: ExchangeRateService, at: datetime, expected_rate: Decimal,
+) -> None:
+    """Тест: конвертация на момент времени берет последнее значение не позже этого момента."""
+    result = await history_service.exchange_currencies("USD", "EUR", Decimal("10"), at)
+
+    assert result.rate == expected_rate
+
+
+@pytest.mark.asyncio
+async def test_exchange_at_builds_cross_rates_from_history(history_service: ExchangeRateService) -> None:
+    """Тест: кросс-курс на момент времени строится только из существовавших тогда курсов."""
+    result = await history_service.exchange_currencies("GBP", "EUR", Decimal("10"), MAR)
+
+    assert result.rate == Decimal("1.125000")
+    with pytest.raises(ExchangeRateNotExistsError):
+        await history_service.exchange_currencies("GBP", "EUR", Decimal("10"), JAN)
+
+
+@pytest.mark.asyncio
+async def test_history_endpoint(ac: AsyncClient, history_service: ExchangeRateService) -> None:
+    """Тест: история пары отдается по порядку и фильтруется по периоду."""
+    app.dependency_overrides[get_read_exchange_rate_service] = lambda: history_service
+
+    full = await ac.get("/exchangeRate/usdeur/history")
+    since_feb = await ac.get("/exchangeRate/USDEUR/history", params={"from": "2026-02-01T00:00:00"})
+    missing = await ac.get("/exchangeRate/GBPEUR/history")
+
+    del app.dependency_overrides[get_read_exchange_rate_service]
+
+    assert full.status_code == status.HTTP_200_OK
+    assert full.json()["baseCurrency"]["code"] == "USD"
+    assert [point["rate"] for point in full.json()["history"]] == ["0.800000", "0.900000"]
+    assert [point["rate"] for point in since_feb.json()["history"]] == ["0.900000"]
+    assert missing.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_rate_update_is_recorded_in_history() -> None:
+    """Тест: изменение курса записывается в историю тем же выражением, что и сам курс."""
+    service = make_service(RATES)
+    service.repository.session = MagicMock()
+    service.repository.session.begin.return_value = AsyncMock()
+    service.repository.update_exchange_rate.return_value = make_rate(1, USD, EUR, "0.950000")
+    service.currency_service.get_codes_and_id_by_codes.return_value = {"USD": 1, "EUR": 2}
+
+    await service.update_exchange_rate("USD", "EUR", ExchangeRateUpdate(rate=Decimal("0.95")))
+
+    journal = service.repository.update_exchange_rate.await_args.kwargs["journal"]
+    service.history_repository.add_rates_from = MagicMock()
+    service.rollup_repository.record_ticks_from = MagicMock()
+    written = MagicMock()
+    journal(written)
+    service.history_repository.add_rates_from.assert_called_once_with(written)
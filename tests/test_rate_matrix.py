@@ -0,0 +1,66 @@
+import math
+from decimal import Decimal
+
+import pytest
+from httpx import AsyncClient
+from starlette import status
+
+from src.core.dependencies import get_read_exchange_rate_service
+from src.main import app
+from src.services.rate_cache import RateSnapshot
+from src.services.rate_matrix import RateMatrix
+from tests.conftest import EUR, GBP, RATES, RUB, USD, make_rate, make_service
+from tests.test_rate_graph import CHF, JPY
+
+
+def test_matrix_matches_conversion_routes() -> None:
+    """Тест: элементы матрицы равны курсам маршрутов конвертации, без маршрута - NaN."""
+    snapshot = RateSnapshot.from_exchange_rates([*RATES, make_rate(7, CHF, JPY, "160.000000")])
+
+    matrix = RateMatrix.build(snapshot)
+
+    assert matrix.codes == ("CHF", "EUR", "GBP", "JPY", "RUB", "USD")
+    for i, base in enumerate(matrix.codes):
+        for j, target in enumerate(matrix.codes):
+            route = snapshot.find_route(base, target)
+            if base == target:
+                assert matrix.rates[i, j] == 1
+            elif route is None:
+                assert math.isnan(matrix.rates[i, j])
+            else:
+                assert matrix.rates[i, j] == pytest.approx(float(snapshot.route_rate(route)))
+
+
+def test_rate_update_reuses_matrix_structure() -> None:
+    """Тест: изменение курса существующей пары пересчитывает только значения."""
+    snapshot = RateSnapshot.from_exchange_rates(RATES)
+    matrix = RateMatrix.build(snapshot)
+
+    updated = RateMatrix.build(snapshot.with_rates([make_rate(1, USD, EUR, "0.500000")]), matrix)
+    extended = RateMatrix.build(snapshot.with_rates([make_rate(7, GBP, RUB, "110.000000")]), updated)
+
+    usd, eur, rub = (matrix.codes.index(code) for code in ("USD", "EUR", "RUB"))
+    assert updated.topology is matrix.topology
+    assert extended.topology is not matrix.topology
+    assert updated.rates[eur, usd] == pytest.approx(2)
+    assert updated.rates[eur, rub] == pytest.approx(180)
+    assert updated.version != matrix.version
+
+
+@pytest.mark.asyncio
+async def test_matrix_endpoint(ac: AsyncClient) -> None:
+    """Тест: матрица отдается компактно (null вместо отсутствующих курсов) и поддерживает ETag."""
+    service = make_service(RATES[:1])
+    app.dependency_overrides[get_read_exchange_rate_service] = lambda: service
+
+    response = await ac.get("/exchangeRates/matrix")
+    cached = await ac.get("/exchangeRates/matrix", headers={"If-None-Match": response.headers["ETag"]})
+
+    del app.dependency_overrides[get_read_exchange_rate_service]
+
+    assert response.status_code == status.HTTP_200_OK
+    body = response.json()
+    assert body["currencies"] == ["EUR", "USD"]
+    assert body["rates"][1][0] == float(Decimal("0.9"))
+    assert body["rates"][0][1] == pytest.approx(1 / 0.9)
+    assert cached.status_code == status.HTTP_304_NOT_MODIFIED
@@ -0,0 +1,122 @@
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+from starlette import status
+
+from src.api.rate_stream import sse_events
+from src.core.dependencies import get_exchange_rate_service, get_rate_broadcaster
+from src.main import app
+from src.services.rate_broadcast import RateBroadcaster
+from tests.conftest import EUR, RATES, RUB, USD, make_rate, make_service
+
+
+@pytest.mark.asyncio
+async def test_broadcast_filters_pairs() -> None:
+    """Тест: подписчик получает только изменения своих пар, подписка без пар - все."""
+    broadcaster = RateBroadcaster(queue_size=10)
+    usd_eur = broadcaster.subscribe(frozenset({"USDEUR"}))
+    everything = broadcaster.subscribe(None)
+
+    broadcaster.publish("USDEUR", b"1")
+    broadcaster.publish("USDRUB", b"2")
+    broadcaster.publish("EURUSD", b"3")
+
+    assert await usd_eur.get() == b"1"
+    assert await everything.get() == b"1"
+    assert await everything.get() == b"2"
+    broadcaster.unsubscribe(usd_eur)
+    assert await usd_eur.get() is None
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_is_dropped() -> None:
+    """Тест: переполнение очереди отключает только медленного подписчика."""
+    broadcaster = RateBroadcaster(queue_size=2)
+    slow = broadcaster.subscribe(None)
+    fast = broadcaster.subscribe(None)
+
+    for message in (b"1", b"2"):
+        broadcaster.publish("USDEUR", message)
+        assert await fast.get() == message
+    broadcaster.publish("USDEUR", b"3")
+
+    assert await slow.get() is None
+    assert slow.close_code == RateBroadcaster.DROPPED_CODE
+    assert await fast.get() == b"3"
+    assert broadcaster.subscriber_count == 1
+
+
+@pytest.mark.asyncio
+async def test_sse_events() -> None:
+    """Тест: SSE отдает события rate, keepalive при простое и dropped при отключении."""
+    broadcaster = RateBroadcaster(queue_size=1)
+    subscription = broadcaster.subscribe(None)
+    events = sse_events(subscription, heartbeat=0.01)
+
+    broadcaster.publish("USDEUR", b'{"id":1}')
+    assert await anext(events) == b'event: rate\ndata: {"id":1}\n\n'
+    assert await anext(events) == b": keepalive\n\n"
+
+    broadcaster.publish("USDEUR", b"1")
+    broadcaster.publish("USDEUR", b"2")
+    assert await anext(events) == b"event: dropped\ndata: {}\n\n"
+
+
+@pytest.mark.asyncio
+async def test_sse_shutdown_is_not_reported_as_drop() -> None:
+    """Тест: при остановке воркера SSE-подписчик получает shutdown, а не dropped."""
+    broadcaster = RateBroadcaster(queue_size=1)
+    events = sse_events(broadcaster.subscribe(None), heartbeat=1)
+
+    broadcaster.close_all()
+
+    assert [event async for event in events] == [b"event: shutdown\ndata: {}\n\n"]
+
+
+def test_websocket_receives_committed_updates() -> None:
+    """Тест: изменение курса через PATCH приходит подписчикам пары по WebSocket."""
+    service = make_service(RATES)
+    service.repository.session = MagicMock()
+    service.repository.session.begin.return_value = AsyncMock()
+    service.currency_service.get_codes_and_id_by_codes.return_value = {"USD": 1, "EUR": 2, "RUB": 3}
+    app.dependency_overrides[get_exchange_rate_service] = lambda: service
+    app.dependency_overrides[get_rate_broadcaster] = lambda: service.rate_broadcaster
+
+    # Общий event loop для WebSocket и PATCH-запросов на время работы клиента.
+    with TestClient(app) as client, client.websocket_connect("/exchangeRates/ws?pairs=usdeur") as websocket:
+        service.repository.update_exchange_rate.return_value = make_rate(2, USD, RUB, "91.000000")
+        client.patch("/exchangeRate/USDRUB", data={"rate": "91"})
+        service.repository.update_exchange_rate.return_value = make_rate(1, USD, EUR, "0.950000")
+        client.patch("/exchangeRate/USDEUR", data={"rate": "0.95"})
+
+        update = websocket.receive_json()
+
+        websocket.send_json({"pairs": "USDEUR"})
+        closed = websocket.receive()
+
+    del app.dependency_overrides[get_exchange_rate_service]
+    del app.dependency_overrides[get_rate_broadcaster]
+
+    assert update["baseCurrency"]["code"] == "USD"
+    assert update["targetCurrency"]["code"] == "EUR"
+    assert Decimal(update["rate"]) == Decimal("0.95")
+    assert closed["code"] == status.WS_1008_POLICY_VIOLATION
+    assert service.rate_broadcaster.subscriber_count == 0
+
+
+@pytest.mark.asyncio
+async def test_notification_is_delivered_to_local_subscribers() -> None:
+    """Тест: NOTIFY из другого воркера раздается подписчикам пары в этом процессе."""
+    broadcaster = RateBroadcaster(queue_size=10)
+    subscription = broadcaster.subscribe(frozenset({"USDEUR"}))
+    listener = MagicMock()
+    broadcaster.attach_listener(listener)
+    handler = listener.add_handler.call_args.args[1]
+
+    payload = orjson.dumps({"baseCurrency": {"code": "USD"}, "targetCurrency": {"code": "EUR"}})
+    handler(payload.decode())
+
+    assert await subscription.get() == payload
@@ -0,0 +1,78 @@
+from collections.abc import AsyncGenerator
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from src.core.db.replica import ReplicaRouter
+
+
+@pytest_asyncio.fixture
+async def primary_engine(tmp_path: Path) -> AsyncGenerator[AsyncEngine]:
+    """Фикстура: основная БД - локальный файл SQLite."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}")
+    yield engine
+    await engine.dispose()
+
+
+async def session_database(router: ReplicaRouter) -> str:
+    session_factory = await router.get_session_factory()
+    async with session_factory() as session:
+        return str(session.bind.url.database)
+
+
+@pytest.mark.asyncio
+async def test_reads_go_to_healthy_replica(primary_engine: AsyncEngine, tmp_path: Path) -> None:
+    """Тест: доступная реплика без отставания обслуживает чтение."""
+    replica_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+    router = ReplicaRouter(primary_engine, replica_engine, max_lag=5, check_interval=60)
+
+    assert (await session_database(router)).endswith("replica.db")
+    assert router.uses_replica
+    await replica_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_unavailable_replica_falls_back_to_primary(
+        primary_engine: AsyncEngine, tmp_path: Path,
+) -> None:
+    """Тест: при недоступной реплике чтение идет в основную БД."""
+    replica_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    router = ReplicaRouter(primary_engine, replica_engine, max_lag=5, check_interval=60)
+
+    assert (await session_database(router)).endswith("primary.db")
+    assert not router.uses_replica
+
+    async with primary_engine.connect() as connection:
+        assert await connection.scalar(text("SELECT 1")) == 1
+    await replica_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_lagging_replica_falls_back_until_next_check(
+        primary_engine: AsyncEngine, tmp_path: Path, monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Тест: отстающая реплика исключается до следующей проверки, затем возвращается."""
+    replica_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+    router = ReplicaRouter(primary_engine, replica_engine, max_lag=5, check_interval=0)
+
+    async def lagging(*_: object) -> float:
+        return 30.0
+
+    monkeypatch.setattr(router, "_replication_lag", lagging)
+    assert (await session_database(router)).endswith("primary.db")
+
+    monkeypatch.undo()
+    assert (await session_database(router)).endswith("replica.db")
+    await replica_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_without_replica_primary_is_used(primary_engine: AsyncEngine) -> None:
+    """Тест: без настроенной реплики используется основная БД без проверок."""
+    router = ReplicaRouter(primary_engine, None, max_lag=5, check_interval=60)
+
+    assert (await session_database(router)).endswith("primary.db")
+    assert not router.uses_replica
@@ -0,0 +1,75 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from src.schemas.currency import CurrencyScheme
+from src.schemas.exchange_rate import ExchangeRateSchema
+from src.services.currency_registry import CurrencyRegistry
+from src.services.currency_service import CurrencyService
+from src.services.response_cache import ResponseCache
+from tests.conftest import EUR, GBP, RATES, RUB, USD, make_rate, make_service
+
+
+def fastapi_body(response_model: type, objects: object) -> bytes:
+    """Тело, которое FastAPI построил бы по response_model."""
+    adapter = TypeAdapter(response_model)
+    validated = adapter.validate_python(objects, from_attributes=True)
+    return JSONResponse(adapter.dump_python(validated, mode="json", by_alias=True)).body
+
+
+@pytest.mark.asyncio
+async def test_exchange_rates_body_matches_response_model() -> None:
+    """Тест: кэшированное тело курсов побайтно совпадает с ответом через response_model."""
+    service = make_service(RATES)
+    service.repository.get_all_exchange_rates.return_value = [
+        *RATES, make_rate(4, EUR, RUB, "0.000001"),
+    ]
+
+    body = await service.get_all_exchange_rates_json()
+
+    assert body == fastapi_body(list[ExchangeRateSchema], service.repository.get_all_exchange_rates.return_value)
+
+
+@pytest.mark.asyncio
+async def test_exchange_rates_body_rebuilt_only_on_version_change() -> None:
+    """Тест: тело списка курсов пересобирается только после изменения курсов."""
+    service = make_service(RATES)
+
+    first = await service.get_all_exchange_rates_json()
+    assert await service.get_all_exchange_rates_json() is first
+
+    service.rate_cache.apply(make_rate(1, USD, EUR, "0.500000"))
+    updated = await service.get_all_exchange_rates_json()
+
+    assert updated != first
+    assert b'"rate":"0.500000"' in updated
+    service.repository.get_all_exchange_rates.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_currencies_body_cached_by_registry_version() -> None:
+    """Тест: список валют рендерится из справочника один раз, пока справочник не изменился."""
+    currencies = [USD, EUR, GBP]
+    repository = AsyncMock()
+    repository.get_all_currencies.return_value = currencies
+    registry = CurrencyRegistry()
+    service = CurrencyService(repository=repository, response_cache=ResponseCache(), registry=registry)
+
+    body = await service.get_all_currencies_json()
+    assert await service.get_all_currencies_json() is body
+
+    assert body == fastapi_body(list[CurrencyScheme], currencies)
+    repository.get_all_currencies.assert_awaited_once()
+
+    registry.add(SimpleNamespace(id=2, code="EUR", name="Euro Area", sign="€"))
+    renamed = await service.get_all_currencies_json()
+    assert renamed != body
+    assert b'"name":"Euro Area"' in renamed
+    repository.get_all_currencies.assert_awaited_once()
+
+    registry.invalidate()
+    assert await service.get_all_currencies_json() == body
+    assert repository.get_all_currencies.await_count == 2
@@ -0,0 +1,107 @@
+from datetime import UTC, datetime
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from src.commands.backfill_rollups import iter_windows
+from src.core.dependencies import get_read_exchange_rate_service
+from src.main import app
+from src.models.exchange_rate import ExchangeRate
+from src.models.exchange_rate_ohlc import ExchangeRateOhlc
+from src.repositories.exchange_rate_rollup_repository import (
+    ExchangeRateRollupRepository,
+    OhlcResolution,
+)
+from src.services.exchange_rate_service import ExchangeRateService
+
+
+def make_bar(resolution: str, bucket_start: datetime, open_: str, close: str) -> ExchangeRateOhlc:
+    return ExchangeRateOhlc(
+        base_currency_id=1, target_currency_id=2, resolution=resolution, bucket_start=bucket_start,
+        open=Decimal(open_), high=max(Decimal(open_), Decimal(close)),
+        low=min(Decimal(open_), Decimal(close)), close=Decimal(close), ticks=2,
+    )
+
+
+@pytest_asyncio.fixture
+async def rollup_service(
+        db_session: AsyncSession, db_exchange_rate_service: ExchangeRateService,
+) -> ExchangeRateService:
+    """Фикстура: сервис над SQLite с часовыми и дневными агрегатами USD/EUR."""
+    db_session.add_all([
+        make_bar("1h", datetime(2026, 3, 1, 10, tzinfo=UTC), "0.900000", "0.910000"),
+        make_bar("1h", datetime(2026, 3, 1, 11, tzinfo=UTC), "0.910000", "0.890000"),
+        make_bar("1d", datetime(2026, 3, 1, tzinfo=UTC), "0.900000", "0.890000"),
+    ])
+    await db_session.commit()
+
+    return db_exchange_rate_service
+
+
+@pytest.mark.asyncio
+async def test_ohlc_endpoint(ac: AsyncClient, rollup_service: ExchangeRateService) -> None:
+    """Тест: агрегаты отдаются для выбранного интервала по порядку и фильтруются по периоду."""
+    app.dependency_overrides[get_read_exchange_rate_service] = lambda: rollup_service
+
+    hourly = await ac.get("/exchangeRate/usdeur/ohlc")
+    daily = await ac.get("/exchangeRate/USDEUR/ohlc", params={"resolution": "1d"})
+    late = await ac.get("/exchangeRate/USDEUR/ohlc", params={"from": "2026-03-01T11:00:00"})
+    invalid = await ac.get("/exchangeRate/USDEUR/ohlc", params={"resolution": "5m"})
+
+    del app.dependency_overrides[get_read_exchange_rate_service]
+
+    assert hourly.status_code == status.HTTP_200_OK
+    assert hourly.json()["resolution"] == "1h"
+    assert [(bar["open"], bar["close"]) for bar in hourly.json()["bars"]] == [
+        ("0.900000", "0.910000"), ("0.910000", "0.890000"),
+    ]
+    assert [bar["low"] for bar in daily.json()["bars"]] == ["0.890000"]
+    assert len(late.json()["bars"]) == 1
+    assert invalid.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_ticks_merge_into_open_interval() -> None:
+    """
+    Тест: тик в открытом интервале сохраняет open, расширяет high/low, заменяет close
+    и увеличивает ticks; новый интервал открывается значениями тика.
+    """
+    written = select(ExchangeRate.__table__).cte("written")
+    sql = " ".join(str(
+        select(written.c.id)
+        .add_cte(ExchangeRateRollupRepository.record_ticks_from(written))
+        .compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}),
+    ).split())
+
+    for resolution in OhlcResolution:
+        assert (
+            f"SELECT written.base_currency_id AS base_currency_id, written.target_currency_id AS "
+            f"target_currency_id, '{resolution.value}' AS anon_"
+        ) in sql
+    assert sql.count("written.rate AS rate, written.rate AS rate__1, written.rate AS rate__2, "
+                     "written.rate AS rate__3, 1 AS anon_") == len(OhlcResolution)
+    assert sql.endswith(
+        "ON CONFLICT (base_currency_id, target_currency_id, resolution, bucket_start) DO UPDATE SET "
+        "high = greatest(exchange_rate_ohlc.high, excluded.high), "
+        "low = least(exchange_rate_ohlc.low, excluded.low), "
+        "close = excluded.close, "
+        "ticks = (exchange_rate_ohlc.ticks + excluded.ticks)) SELECT written.id FROM written",
+    )
+
+
+def test_backfill_windows_are_day_aligned() -> None:
+    """Тест: окна пересчета выровнены по полуночи UTC и покрывают весь период."""
+    windows = list(iter_windows(
+        datetime(2026, 3, 1, 15, 30, tzinfo=UTC), datetime(2026, 3, 8, 1, tzinfo=UTC), days_per_batch=3,
+    ))
+
+    assert windows == [
+        (datetime(2026, 3, 1, tzinfo=UTC), datetime(2026, 3, 4, tzinfo=UTC)),
+        (datetime(2026, 3, 4, tzinfo=UTC), datetime(2026, 3, 7, tzinfo=UTC)),
+        (datetime(2026, 3, 7, tzinfo=UTC), datetime(2026, 3, 10, tzinfo=UTC)),
+    ]
@@ -0,0 +1,126 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.exceptions.exceptions import ExchangeRateNotExistsError
+from src.services.single_flight import SingleFlight
+from tests.conftest import EUR, USD, make_rate, make_service
+
+
+class Query:
+    """Запрос, который завершается только по release(); считает число выполнений."""
+
+    def __init__(self, result: object = None, error: Exception | None = None):
+        self.result = result
+        self.error = error
+        self.calls = 0
+        self.released = asyncio.Event()
+
+    async def __call__(self) -> object:
+        self.calls += 1
+        await self.released.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+async def settle() -> None:
+    """Дает запущенным задачам дойти до ожидания."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_query() -> None:
+    """Тест: одновременные вызовы с одним ключом выполняют запрос один раз."""
+    flights: SingleFlight[str, object] = SingleFlight("test")
+    query = Query(result="USD/EUR")
+
+    tasks = [asyncio.create_task(flights.do("USDEUR", query)) for _ in range(5)]
+    await settle()
+    query.released.set()
+
+    assert await asyncio.gather(*tasks) == ["USD/EUR"] * 5
+    assert query.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_error_is_propagated_to_all_waiters() -> None:
+    """Тест: исключение лидера получают все ожидающие, следующий вызов повторяет запрос."""
+    flights: SingleFlight[str, object] = SingleFlight("test")
+    query = Query(error=ConnectionError("нет соединения"))
+
+    tasks = [asyncio.create_task(flights.do("USDEUR", query)) for _ in range(3)]
+    await settle()
+    query.released.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert all(isinstance(result, ConnectionError) for result in results)
+    query.error = None
+    assert await flights.do("USDEUR", query) is None
+    assert query.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_hands_query_over_to_waiter() -> None:
+    """Тест: отмена лидера не отменяет ожидающих - один из них выполняет запрос заново."""
+    flights: SingleFlight[str, object] = SingleFlight("test")
+    query = Query(result="USD/EUR")
+
+    leader = asyncio.create_task(flights.do("USDEUR", query))
+    await settle()
+    waiters = [asyncio.create_task(flights.do("USDEUR", query)) for _ in range(2)]
+    await settle()
+    leader.cancel()
+    await settle()
+    query.released.set()
+
+    assert await asyncio.gather(*waiters) == ["USD/EUR"] * 2
+    assert leader.cancelled()
+    assert query.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_affect_leader() -> None:
+    """Тест: отмена ожидающего не прерывает общий запрос."""
+    flights: SingleFlight[str, object] = SingleFlight("test")
+    query = Query(result="USD/EUR")
+
+    leader = asyncio.create_task(flights.do("USDEUR", query))
+    await settle()
+    waiter = asyncio.create_task(flights.do("USDEUR", query))
+    await settle()
+    waiter.cancel()
+    await settle()
+    query.released.set()
+
+    assert await leader == "USD/EUR"
+    assert waiter.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_exchange_rate_lookups_are_coalesced() -> None:
+    """Тест: одновременные GET одной пары делают один запрос к БД, отсутствие курса - у всех."""
+    service = make_service([])
+    service.currency_service.get_ids_by_codes = AsyncMock(return_value={"USD": USD.id, "EUR": EUR.id})
+    query = Query(result=make_rate(1, USD, EUR, "0.900000"))
+
+    async def get_rate_by_ids(*_: int) -> object:
+        return await query()
+
+    service.repository.get_rate_by_ids = AsyncMock(side_effect=get_rate_by_ids)
+
+    tasks = [
+        asyncio.create_task(service.get_exchange_rate_by_codes("USD", "EUR")) for _ in range(10)
+    ]
+    await settle()
+    query.released.set()
+    rates = await asyncio.gather(*tasks)
+
+    assert {rate.rate for rate in rates} == {query.result.rate}
+    service.repository.get_rate_by_ids.assert_awaited_once_with(USD.id, EUR.id)
+
+    query.result = None
+    with pytest.raises(ExchangeRateNotExistsError):
+        await service.get_exchange_rate_by_codes("USD", "EUR")
@@ -0,0 +1,108 @@
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import CTE
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.core.db.profiling import QueryProfile
+from src.exceptions.exceptions import ExchangeRateNotExistsError
+from src.repositories.exchange_rate_history_repository import ExchangeRateHistoryRepository
+from src.repositories.exchange_rate_repository import (
+    MAX_QUERY_PARAMS,
+    UPSERT_CHUNK_SIZE,
+    ExchangeRateRepository,
+)
+from src.repositories.exchange_rate_rollup_repository import ExchangeRateRollupRepository
+
+MaxQueries = Callable[[int], AbstractContextManager[QueryProfile]]
+
+
+def journal(written: CTE) -> list[CTE]:
+    return [
+        ExchangeRateHistoryRepository.add_rates_from(written),
+        ExchangeRateRollupRepository.record_ticks_from(written),
+    ]
+
+
+def make_repository(written_rate: object) -> ExchangeRateRepository:
+    session = MagicMock()
+    session.execute = AsyncMock(return_value=MagicMock())
+    session.execute.return_value.scalar_one.return_value = written_rate
+    session.execute.return_value.scalar_one_or_none.return_value = written_rate
+    return ExchangeRateRepository(session)
+
+
+def executed_sql(repository: ExchangeRateRepository) -> str:
+    [call] = repository.session.execute.await_args_list
+    return " ".join(str(call.args[0].compile(dialect=postgresql.dialect())).split())
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("method", "write"),
+    [
+        ("create_exchange_rate", "WITH written AS (INSERT INTO exchange_rate"),
+        ("update_exchange_rate", "WITH written AS (UPDATE exchange_rate SET rate="),
+    ],
+)
+async def test_rate_write_is_one_statement(method: str, write: str) -> None:
+    """Тест: запись курса, журнала и агрегатов и чтение валют пары - одно выражение."""
+    written_rate = object()
+    repository = make_repository(written_rate)
+
+    result = await getattr(repository, method)(1, 2, Decimal("0.95"), journal=journal)
+
+    assert result is written_rate
+    sql = executed_sql(repository)
+    assert sql.startswith(write)
+    assert "written_history AS (INSERT INTO exchange_rate_history" in sql
+    assert "clock_timestamp() AS clock_timestamp_1, written.rate AS rate FROM written)" in sql
+    assert "ON CONFLICT (base_currency_id, target_currency_id, valid_from)" not in sql
+    assert "written_ohlc AS (INSERT INTO exchange_rate_ohlc" in sql
+    assert "FROM written JOIN currency AS currency_1" in sql
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_chunk_fits_parameter_limit() -> None:
+    """Тест: пачка upsert с журналом - одно выражение в пределах лимита параметров asyncpg."""
+    repository = make_repository(None)
+    repository.session.execute.return_value.all.return_value = []
+    rates = [(base_id, base_id + 1, Decimal("1.5")) for base_id in range(UPSERT_CHUNK_SIZE + 1)]
+
+    await repository.upsert_exchange_rates(rates, journal=journal)
+
+    full_chunk, tail = (call.args[0] for call in repository.session.execute.await_args_list)
+    sql = " ".join(str(tail.compile(dialect=postgresql.dialect())).split())
+    assert sql.startswith("WITH written AS (INSERT INTO exchange_rate")
+    assert "written_history AS (INSERT INTO exchange_rate_history" in sql
+    assert "written_ohlc AS (INSERT INTO exchange_rate_ohlc" in sql
+    assert len(full_chunk.compile(dialect=postgresql.asyncpg.dialect()).params) <= MAX_QUERY_PARAMS
+
+
+@pytest.mark.asyncio
+async def test_update_of_missing_rate() -> None:
+    """Тест: обновление несуществующей пары не находит строку и ничего не журналирует."""
+    repository = make_repository(None)
+
+    with pytest.raises(ExchangeRateNotExistsError):
+        await repository.update_exchange_rate(1, 2, Decimal("0.95"), journal=journal)
+    repository.session.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("sqlite_app")
+async def test_create_currency_single_query(
+        ac: AsyncClient, sqlite_engine: AsyncEngine, max_queries: MaxQueries,
+) -> None:
+    """Тест: создание валюты - один INSERT ... RETURNING без повторного чтения строки."""
+    with max_queries(1) as profile:
+        response = await ac.post("/currencies", data={"code": "CHF", "name": "Swiss Franc", "sign": "Fr"})
+
+    assert response.status_code == 201
+    assert response.json() == {"id": 5, "code": "CHF", "name": "Swiss Franc", "sign": "Fr"}
+    assert profile.queries[0].statement.startswith("INSERT INTO currency")